@@ -0,0 +1,94 @@
+"""Compare ``dropnoti.build_message`` with the old jq/sed/sort workflow step.
+
+    python benchmarks/bench_build_message.py [--cards 100000] [--repeat 3]
+
+The shell side needs ``bash`` and ``jq`` on ``PATH``; it is skipped otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from dropnoti import build_message  # noqa: E402
+
+SHELL_STEP = r"""
+set -e
+COUNT=$(jq -r '.count // 0' latest_r6.json)
+SCRAPED=$(jq -r '.scraped_at // empty' latest_r6.json)
+ASOF=$(date -u -d "$SCRAPED" +"%m-%d" 2>/dev/null || echo "${SCRAPED:5:5}")
+jq -r '.cards[] | "\(.title // "Untitled") — \(.timeframe // "Time N/A")"' latest_r6.json \
+| sed 's/[[:space:]]\{1,\}/ /g' \
+| sed 's/ —  — / — Time N\/A/' \
+| LC_ALL=C sort -u > lines.txt
+PREVIEW=$(head -n 8 lines.txt | sed 's/^/• /')
+TOTAL=$(wc -l < lines.txt)
+printf "R6 Drops: %s campaigns\nas of %s (UTC)\n\n%s\n" "$COUNT" "$ASOF" "$PREVIEW"
+"""
+
+
+def make_snapshot(cards: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    items = []
+    for _ in range(cards):
+        n = rng.randrange(cards // 2 or 1)
+        items.append(
+            {
+                "title": f"Campaign  {n}",
+                "timeframe": f"Jan {n % 28 + 1} - Feb {n % 28 + 1}",
+            }
+        )
+    return {"scraped_at": "2026-01-06T14:52:40Z", "count": cards, "cards": items}
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "latest_r6.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(make_snapshot(args.cards), fh, ensure_ascii=False)
+
+        py = best_of(args.repeat, lambda: build_message(path))
+        print(f"build_message   {args.cards:>9} cards  {py * 1000:9.1f} ms")
+
+        if shutil.which("bash") and shutil.which("jq"):
+            sh = best_of(
+                args.repeat,
+                lambda: subprocess.run(
+                    ["bash", "-c", SHELL_STEP],
+                    cwd=tmp,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                ),
+            )
+            print(f"jq/sed/sort     {args.cards:>9} cards  {sh * 1000:9.1f} ms")
+            print(f"speedup         {sh / py:.1f}x")
+        else:
+            print("jq/sed/sort     skipped (bash or jq not found)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
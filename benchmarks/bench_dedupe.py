@@ -0,0 +1,113 @@
+"""Compare ``dropnoti.dedupe`` with ``sort -u`` on lines full of near-duplicates.
+
+    python benchmarks/bench_dedupe.py [--lines 1000000] [--unique 20000]
+
+Each synthetic line is one of ``--unique`` campaigns, written with random
+case, full-width letters, non-breaking spaces, extra spacing and a random
+dash style.  ``sort -u`` needs ``sort`` on ``PATH``; it is skipped otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from dropnoti.dedupe import dedupe  # noqa: E402
+
+DASHES = ("-", "–", "—", "−", "‐")
+SPACES = (" ", "  ", " ", "  ")
+
+
+def fullwidth(text: str) -> str:
+    return "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in text)
+
+
+def variant(rng: random.Random, n: int) -> str:
+    title = f"Campaign {n} Operation Drop"
+    roll = rng.random()
+    if roll < 0.2:
+        title = title.upper()
+    elif roll < 0.3:
+        title = fullwidth(title)
+    elif roll < 0.4:
+        title = title.lower()
+    space = rng.choice(SPACES)
+    dash = rng.choice(DASHES)
+    day = n % 28 + 1
+    return f"{title}{space}{dash}{space}Jan {day} {dash} Feb {day}"
+
+
+def make_lines(count: int, unique: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [variant(rng, rng.randrange(unique)) for _ in range(count)]
+
+
+def best_of(repeat: int, fn) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--unique", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines, args.unique)
+    print(f"{args.lines} lines, {args.unique} distinct campaigns")
+
+    def run_dedupe() -> int:
+        return sum(1 for _ in dedupe(lines))
+
+    def run_dedupe_exact() -> int:
+        return sum(1 for _ in dedupe(lines, key=str))
+
+    def run_sorted_set() -> int:
+        return len(sorted(set(lines)))
+
+    for name, fn in (
+        ("dedupe", run_dedupe),
+        ("dedupe (exact)", run_dedupe_exact),
+        ("sorted(set())", run_sorted_set),
+    ):
+        elapsed, unique = best_of(args.repeat, fn)
+        print(f"{name:<15} {elapsed * 1000:9.1f} ms  {unique:>9} lines left")
+
+    if shutil.which("sort"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lines.txt")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+
+            def run_sort() -> int:
+                out = subprocess.run(
+                    ["sort", "-u", path],
+                    env={**os.environ, "LC_ALL": "C"},
+                    check=True,
+                    capture_output=True,
+                ).stdout
+                return out.count(b"\n")
+
+            elapsed, unique = best_of(args.repeat, run_sort)
+            print(f"{'sort -u':<15} {elapsed * 1000:9.1f} ms  {unique:>9} lines left")
+    else:
+        print("sort -u         skipped (sort not found)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
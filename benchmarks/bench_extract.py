@@ -0,0 +1,141 @@
+"""Compare ``dropnoti.extract`` with a naive BeautifulSoup extractor.
+
+    python benchmarks/bench_extract.py [--cards 1000 10000] [--repeat 3]
+
+Every extractor first has to reproduce ``fixtures/drops_page.json`` from
+``fixtures/drops_page.html``.  Then each is timed on generated pages of
+``--cards`` cards built from the fixture's card markup.  selectolax and
+BeautifulSoup are optional; missing ones are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from dropnoti import extract  # noqa: E402
+from dropnoti.extract import CardExtractor  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # pragma: no cover - depends on the environment
+    BeautifulSoup = None
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+CARD = """\
+      <article class="drop-card" data-campaign="{n}">
+        <img src="/img/{n}.png" alt="">
+        <div class="drop-card__body">
+          <h3 class="drop-card__title"><a href="/c/{n}">{title}</a></h3>
+          <div class="drop-card__meta">
+            <p class="drop-card__timeframe"><time>{timeframe}</time></p>
+            <span class="drop-card__reward">{reward}</span>
+          </div>
+        </div>
+      </article>
+"""
+
+
+def make_page(cards: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Drops</title>'
+        "<script>window.__STATE__ = {};</script></head><body>"
+        '<main><section class="drop-list">\n'
+    ]
+    for n in range(cards):
+        parts.append(
+            CARD.format(
+                n=n,
+                title=f"Siege Pro League &ndash; Stage {n % 4 + 1} Charm #{n}",
+                timeframe=f"Jan {rng.randint(1, 28)} - Feb {rng.randint(1, 28)}",
+                reward="Watch " + "&nbsp;".join(["2", "hours"]),
+            )
+        )
+    parts.append("</section></main></body></html>\n")
+    return "".join(parts).encode("utf-8")
+
+
+def naive_soup(body: bytes) -> list[dict[str, Any]]:
+    """The obvious BeautifulSoup version: build the whole tree, then select."""
+    soup = BeautifulSoup(body, "html.parser")
+
+    def text(node: Any) -> str | None:
+        return " ".join(node.get_text().split()) or None if node else None
+
+    return [
+        {
+            "title": text(node.select_one(extract.TITLE_SELECTOR)),
+            "timeframe": text(node.select_one(extract.TIMEFRAME_SELECTOR)),
+        }
+        for node in soup.select(extract.CARD_SELECTOR)
+    ]
+
+
+def extractors() -> list[tuple[str, Callable[[bytes], list[dict[str, Any]]]]]:
+    found = []
+    if extract.HAVE_SELECTOLAX:
+        found.append(("selectolax", CardExtractor(use_selectolax=True).extract))
+    found.append(("html.parser", CardExtractor(use_selectolax=False).extract))
+    if BeautifulSoup is not None:
+        found.append(("bs4 (naive)", naive_soup))
+    return found
+
+
+def best_of(repeat: int, fn: Callable[[bytes], object], body: bytes) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "drops_page.html"), "rb") as fh:
+        fixture = fh.read()
+    with open(os.path.join(FIXTURES, "drops_page.json"), encoding="utf-8") as fh:
+        expected = json.load(fh)
+    candidates = extractors()
+    for name, fn in candidates:
+        if fn(fixture) != expected:
+            print(f"{name} does not reproduce drops_page.json", file=sys.stderr)
+            return 1
+    if BeautifulSoup is None:
+        print("BeautifulSoup not installed; skipping the naive baseline")
+    if not extract.HAVE_SELECTOLAX:
+        print("selectolax not installed; skipping it")
+
+    for cards in args.cards:
+        page = make_page(cards)
+        reference = None
+        for name, fn in candidates:
+            result = fn(page)
+            if reference is None:
+                reference = result
+            elif result != reference:
+                print(f"{name} disagrees on {cards} cards", file=sys.stderr)
+                return 1
+            seconds = best_of(args.repeat, fn, page)
+            print(
+                f"{name:12} {cards:>7} cards  {len(page) / 2**20:6.1f} MiB"
+                f"  {seconds * 1000:9.1f} ms  {cards / seconds:>10,.0f} cards/s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
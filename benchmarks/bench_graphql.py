@@ -0,0 +1,111 @@
+"""Compare batched, persisted GraphQL fetching with one query per campaign.
+
+    python benchmarks/bench_graphql.py [--campaigns 500] [--delay 0.02]
+
+Every strategy fetches the same campaigns (with a few ids repeated, as when
+several pages list the same campaign) from a :class:`StubGraphQLServer` that
+takes ``--delay`` seconds per request, and reports requests, request bytes
+and wall time.  "cold" is a server that has not seen the query yet, so the
+first batch registers it; "warm" one that has.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from dropnoti.fakegql import StubGraphQLServer  # noqa: E402
+from dropnoti.graphql import (  # noqa: E402
+    CAMPAIGN_QUERY,
+    GraphQLClient,
+    campaign_operation,
+    fetch_campaign_cards,
+)
+
+
+def make_recordings(campaigns: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "operationName": "DropCampaignDetails",
+            "variables": {"id": str(n)},
+            "query": CAMPAIGN_QUERY,
+            "response": {
+                "data": {
+                    "dropCampaign": {
+                        "id": str(n),
+                        "name": f"Siege Pro League Charm #{n}",
+                        "game": {"displayName": "Rainbow Six Siege"},
+                        "startAt": "2026-01-06T17:00:00Z",
+                        "endAt": "2026-01-19T23:59:00Z",
+                    }
+                }
+            },
+        }
+        for n in range(campaigns)
+    ]
+
+
+async def one_by_one(url: str, ids: list[str]) -> GraphQLClient:
+    async with GraphQLClient(url, max_batch=1, window=0, persisted=False) as client:
+        for campaign_id in ids:
+            await client.execute(campaign_operation(campaign_id))
+    return client
+
+
+async def concurrent(url: str, ids: list[str]) -> GraphQLClient:
+    async with GraphQLClient(url, max_batch=1, window=0, persisted=False) as client:
+        await fetch_campaign_cards(client, ids)
+    return client
+
+
+async def batched(url: str, ids: list[str]) -> GraphQLClient:
+    async with GraphQLClient(url) as client:
+        await fetch_campaign_cards(client, ids)
+    return client
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(0)
+    ids = [str(n) for n in range(args.campaigns)]
+    ids += rng.sample(ids, args.campaigns // 10)
+    rng.shuffle(ids)
+    strategies = (
+        ("one by one", one_by_one, False),
+        ("concurrent", concurrent, False),
+        ("APQ cold", batched, False),
+        ("APQ warm", batched, True),
+    )
+    print(f"{len(ids)} lookups of {args.campaigns} campaigns, {args.delay}s/request")
+    for name, strategy, warm in strategies:
+        server = StubGraphQLServer(
+            make_recordings(args.campaigns), delay=args.delay, preload=warm
+        )
+        async with server:
+            start = time.perf_counter()
+            client = await strategy(server.url, ids)
+            elapsed = time.perf_counter() - start
+        print(
+            f"{name:12} {client.requests:>6} requests"
+            f"  {client.bytes_sent / 1024:8.1f} KiB sent"
+            f"  {client.deduplicated:>4} deduplicated"
+            f"  {elapsed * 1000:9.1f} ms"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--campaigns", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=0.02)
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
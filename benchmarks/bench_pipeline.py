@@ -0,0 +1,341 @@
+"""Load-test the notify pipeline stage by stage on synthetic snapshots.
+
+    python benchmarks/bench_pipeline.py [--sizes 10,10000,1000000]
+        [--chats 1,10,100] [--output results.json] [--compare old.json]
+
+For every size a ``latest_r6.json``-shaped snapshot is generated with
+realistic noise: about a fifth of the cards repeat an earlier one, a tenth
+are near-duplicates (case, full-width letters, non-breaking spaces, dash
+style), and timeframes come in the shapes :mod:`dropnoti.timeframe` parses,
+some missing.  Each size is then measured in a fresh process:
+
+``parse``   stream the cards out of the file (:func:`dropnoti.stream.iter_cards`)
+``dedupe``  render and deduplicate every line (:class:`LineCollector`)
+``render``  split the message into Telegram-sized pages
+``send xN`` send up to ``--max-pages`` pages to N chats through
+            :class:`TelegramClient` against :class:`FakeBotServer`, with rate
+            limits off
+
+Throughput is items per second at the median run.  p50/p99 are over the
+``--repeat`` runs for the first three stages and over single requests for
+``send``.  Peak RSS is the process's high-water mark once the stage is done,
+so it includes the stages before it.  ``--output`` writes everything, plus
+the git revision and Python version, as JSON; ``--compare`` prints the
+throughput ratio against such a file from another version.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from dropnoti.fakebot import FakeBotServer  # noqa: E402
+from dropnoti.message import LineCollector, Message  # noqa: E402
+from dropnoti.ratelimit import RateLimiter  # noqa: E402
+from dropnoti.stream import iter_cards  # noqa: E402
+from dropnoti.telegram import TelegramClient  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+GAMES = ("Siege", "Rainbow Six", "R6")
+EVENTS = ("Pro League", "Major", "Invitational", "Six Invitational", "Twitch")
+ITEMS = ("Charm", "Headgear", "Uniform", "Weapon Skin", "Bundle", "Alpha Pack")
+MONTHS = "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split()
+DASHES = ("-", "–", "—")
+
+
+def timeframe(rng: random.Random) -> str | None:
+    """A timeframe in one of the shapes drop pages use, or ``None``."""
+    month = rng.randrange(12)
+    day = rng.randint(1, 28)
+    length = rng.choice((1, 3, 7, 7, 14, 28))
+    end_month, end_day = (month + (day + length > 28)) % 12, (day + length) % 28 + 1
+    dash = rng.choice(DASHES)
+    roll = rng.random()
+    if roll < 0.40:
+        return f"{MONTHS[month]} {day} {dash} {MONTHS[end_month]} {end_day}"
+    if roll < 0.60:
+        return (
+            f"Fri, {MONTHS[month]} {day}, 6:00 PM {dash} "
+            f"Sun, {MONTHS[end_month]} {end_day}, 2026, 11:59 PM UTC"
+        )
+    if roll < 0.70:
+        return f"{day} January 2026 {dash} {end_day} February 2026"
+    if roll < 0.80:
+        return (
+            f"2026-{month + 1:02d}-{day:02d}T18:00:00Z - "
+            f"2026-{end_month + 1:02d}-{end_day:02d}T17:59:00Z"
+        )
+    if roll < 0.85:
+        return f"{month + 1:02d}/{day:02d} - {end_month + 1:02d}/{end_day:02d}"
+    if roll < 0.95:
+        return f"Ends {MONTHS[end_month]} {end_day}"
+    return None
+
+
+def near_duplicate(rng: random.Random, card: dict[str, Any]) -> dict[str, Any]:
+    title = card.get("title") or ""
+    roll = rng.random()
+    if roll < 0.3:
+        title = title.upper()
+    elif roll < 0.5:
+        title = "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in title)
+    elif roll < 0.8:
+        title = title.replace(" ", " ", 1)
+    else:
+        title = f"  {title}  "
+    frame = card.get("timeframe")
+    if frame:
+        for dash in DASHES:
+            frame = frame.replace(dash, rng.choice(DASHES))
+    return {"title": title, "timeframe": frame}
+
+
+def generate_cards(count: int, seed: int = 0) -> Iterator[dict[str, Any]]:
+    rng = random.Random(seed)
+    recent: list[dict[str, Any]] = []
+    for n in range(count):
+        roll = rng.random()
+        if recent and roll < 0.2:
+            card = dict(rng.choice(recent))
+        elif recent and roll < 0.3:
+            card = near_duplicate(rng, rng.choice(recent))
+        else:
+            title = (
+                f"{rng.choice(GAMES)} {rng.choice(EVENTS)} "
+                f"{rng.choice(ITEMS)} #{n}"
+            )
+            card = {"title": title if rng.random() > 0.03 else None}
+            card["timeframe"] = timeframe(rng)
+            recent.append(card)
+            if len(recent) > 1000:
+                recent.pop(rng.randrange(len(recent)))
+        yield card
+
+
+def write_snapshot(path: str, count: int, seed: int = 0) -> None:
+    """Stream a snapshot with ``count`` cards to ``path``."""
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write('{"scraped_at": "2026-01-06T14:52:40Z", ')
+        fh.write(f'"count": {count}, "cards": [\n')
+        for i, card in enumerate(generate_cards(count, seed)):
+            fh.write(",\n" if i else "")
+            fh.write(json.dumps(card, ensure_ascii=False))
+        fh.write("\n]}\n")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def stage(name: str, items: int, seconds: list[float]) -> dict[str, Any]:
+    median = statistics.median(seconds)
+    return {
+        "stage": name,
+        "items": items,
+        "throughput": items / median if median else None,
+        "p50_ms": percentile(seconds, 50) * 1000,
+        "p99_ms": percentile(seconds, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def timed(repeat: int, fn: Callable[[], Any]) -> tuple[list[float], Any]:
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    return seconds, result
+
+
+async def send_pages(pages: list[str], chats: int) -> tuple[list[float], float, int]:
+    unlimited = RateLimiter(math.inf, math.inf)
+    async with FakeBotServer() as server:
+        client = TelegramClient("bench", server.base_url, limiter=unlimited)
+        async with client:
+            chat_ids = [str(1000 + i) for i in range(chats)]
+            start = time.perf_counter()
+            results = await client.send_pages_many(chat_ids, pages)
+            elapsed = time.perf_counter() - start
+    failed = sum(not r.ok for r in results)
+    return [r.latency for r in results], elapsed, failed
+
+
+def measure(path: str, repeat: int, chats: list[int], max_pages: int) -> list[dict]:
+    """Run every stage on the snapshot at ``path``; called in a fresh process."""
+    rows = []
+
+    def parse() -> list[Any]:
+        with open(path, encoding="utf-8") as fh:
+            return list(iter_cards(fh))
+
+    seconds, cards = timed(repeat, parse)
+    rows.append(stage("parse", len(cards), seconds))
+
+    def dedupe() -> LineCollector:
+        collector = LineCollector(limit=None)
+        for card in cards:
+            collector.add_card(card)
+        return collector
+
+    seconds, collector = timed(repeat, dedupe)
+    rows.append(stage("dedupe", len(cards), seconds))
+
+    message = Message(len(cards), "01-06", collector.lines(), collector.total)
+    seconds, pages = timed(repeat, message.pages)
+    rows.append(stage("render", collector.total, seconds))
+
+    pages = pages[:max_pages]
+    for count in chats:
+        latencies, elapsed, failed = asyncio.run(send_pages(pages, count))
+        row = stage(f"send x{count}", len(latencies), latencies)
+        row["throughput"] = len(latencies) / elapsed if elapsed else None
+        row["failed"] = failed
+        rows.append(row)
+    return rows
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def print_rows(size: int, rows: list[dict], old: dict[tuple[int, str], dict]) -> None:
+    for row in rows:
+        rss = row["peak_rss_mb"]
+        line = (
+            f"{size:>9} {row['stage']:<10} {row['items']:>9} "
+            f"{row['throughput'] or 0:>13,.0f}/s {row['p50_ms']:>10.2f} "
+            f"{row['p99_ms']:>10.2f} {rss if rss is not None else float('nan'):>9.1f}"
+        )
+        before = old.get((size, row["stage"]))
+        if before and before.get("throughput") and row["throughput"]:
+            line += f"  {row['throughput'] / before['throughput']:5.2f}x"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,10000,1000000")
+    parser.add_argument("--chats", default="1,10,100")
+    parser.add_argument("--max-pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="results file of another version")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    chats = [int(c) for c in args.chats.split(",") if c]
+
+    if args.measure:
+        rows = measure(args.measure, args.repeat, chats, args.max_pages)
+        json.dump(rows, sys.stdout)
+        return 0
+
+    old: dict[tuple[int, str], dict] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            for result in json.load(fh)["results"]:
+                for row in result["stages"]:
+                    old[(result["cards"], row["stage"])] = row
+
+    print(
+        f"{'cards':>9} {'stage':<10} {'items':>9} {'throughput':>15} "
+        f"{'p50 ms':>10} {'p99 ms':>10} {'RSS MB':>9}"
+        + ("  vs old" if old else "")
+    )
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",") if s):
+            path = os.path.join(tmp, f"latest_r6_{size}.json")
+            start = time.perf_counter()
+            write_snapshot(path, size, args.seed)
+            generated = time.perf_counter() - start
+            # A fresh process per size keeps peak RSS comparable.
+            repeat = args.repeat if size < 1_000_000 else min(args.repeat, 3)
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--measure",
+                    path,
+                    "--repeat",
+                    str(repeat),
+                    "--chats",
+                    args.chats,
+                    "--max-pages",
+                    str(args.max_pages),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            rows = json.loads(out.stdout)
+            print_rows(size, rows, old)
+            results.append(
+                {
+                    "cards": size,
+                    "bytes": os.path.getsize(path),
+                    "generate_s": generated,
+                    "stages": rows,
+                }
+            )
+
+    if args.output:
+        report = {
+            "benchmark": "pipeline",
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "max_pages": args.max_pages,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+        print(f"results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
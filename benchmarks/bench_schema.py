@@ -0,0 +1,74 @@
+"""Compare ``dropnoti.schema.load`` with plain ``json.load``.
+
+    python benchmarks/bench_schema.py [--cards 100000 1000000] [--repeat 3]
+
+Reports decode time and the memory retained by the decoded result.  The
+schema path decodes with ``json.loads`` and then builds ``__slots__``
+objects, so it trades decode time for retained memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from bench_build_message import make_snapshot  # noqa: E402
+
+from dropnoti import schema  # noqa: E402
+
+
+def plain_load(path: str) -> object:
+    with open(path, "rb") as fh:
+        return json.load(fh)
+
+
+def best_of(repeat: int, fn, path: str) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained(fn, path: str) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = fn(path)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for cards in args.cards:
+            path = os.path.join(tmp, f"latest_{cards}.json")
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(make_snapshot(cards), fh, ensure_ascii=False)
+            for name, fn in (("json.load", plain_load), ("schema.load", schema.load)):
+                seconds = best_of(args.repeat, fn, path)
+                memory = retained(fn, path)
+                print(
+                    f"{name:12} {cards:>9} cards  {seconds * 1000:9.1f} ms"
+                    f"  {memory / 2**20:8.1f} MiB retained"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
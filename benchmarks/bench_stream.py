@@ -0,0 +1,104 @@
+"""Compare scrape-then-build with building while the scrape runs.
+
+    python benchmarks/bench_stream.py [--pages 200] [--cards 500] [--delay 0.02]
+
+A :class:`FixtureServer` serves ``--pages`` JSON pages of ``--cards`` cards
+each, taking ``--delay`` seconds per request.  It runs on its own event loop
+in a thread, like a remote site; on the benchmark's loop its delays would
+only start once the builder yields.  "sequential" scrapes into
+``latest_r6.json`` and then runs :func:`build_message` on it; "pipelined"
+runs :func:`scrape_and_build`, which deduplicates and renders each page
+while later ones download.  Both must produce the same message.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from bench_pipeline import generate_cards  # noqa: E402
+
+from dropnoti.fakesite import FixtureServer  # noqa: E402
+from dropnoti.message import build_message  # noqa: E402
+from dropnoti.ndjson import scrape_and_build  # noqa: E402
+from dropnoti.scrape import scrape_to  # noqa: E402
+
+
+def make_pages(pages: int, cards: int) -> dict[str, bytes]:
+    generated = generate_cards(pages * cards)
+    return {
+        f"/drops/{n}.json": json.dumps(
+            {"cards": [next(generated) for _ in range(cards)]}, ensure_ascii=False
+        ).encode("utf-8")
+        for n in range(pages)
+    }
+
+
+@contextmanager
+def serving(server: FixtureServer) -> Iterator[FixtureServer]:
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+async def run(args: argparse.Namespace, tmp: str) -> int:
+    pages = make_pages(args.pages, args.cards)
+    messages = {}
+    with serving(FixtureServer(pages, delay=args.delay)) as server:
+        urls = [server.url(path) for path in pages]
+        for name in ("sequential", "pipelined"):
+            output = os.path.join(tmp, f"{name}.json")
+            start = time.perf_counter()
+            if name == "sequential":
+                await scrape_to(urls, output, per_host=args.per_host)
+                scraped = time.perf_counter()
+                message = build_message(output, limit=None)
+            else:
+                _, message = await scrape_and_build(
+                    urls, output, per_host=args.per_host, limit=None
+                )
+                scraped = time.perf_counter()
+            done = time.perf_counter()
+            messages[name] = message.pages()
+            print(
+                f"{name:10}  scrape {(scraped - start) * 1000:8.1f} ms"
+                f"  message ready after {(done - start) * 1000:8.1f} ms"
+                f"  ({message.total} unique of {message.count} cards)"
+            )
+    if messages["sequential"] != messages["pipelined"]:
+        print("the two messages differ", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--cards", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--per-host", type=int, default=4)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        return asyncio.run(run(args, tmp))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
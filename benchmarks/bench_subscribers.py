@@ -0,0 +1,136 @@
+"""Match card titles to subscribers: inverted index, bitsets and one by one.
+
+    python benchmarks/bench_subscribers.py [--subscribers 100000] [--cards 1000]
+
+Every subscriber gets one to three keywords of one or two words, drawn from
+the vocabulary titles are written in, a fifth exclude a keyword and 1%
+subscribe to everything.  :class:`RuleSet` runs with Python integers and,
+when NumPy is installed, once more with ``use_numpy=True``.  The naive loop calls
+:meth:`Subscriber.matches` for every (card, subscriber) pair; it runs on
+``--sample`` subscribers and is extrapolated.  Every result is checked
+against the index's.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from dropnoti.rules import HAVE_NUMPY, RuleSet  # noqa: E402
+from dropnoti.subscribers import Subscriber, SubscriberIndex  # noqa: E402
+
+GAMES = ("Rainbow Six", "Siege", "Apex", "Valorant", "Rocket League", "Halo")
+WORDS = (
+    "twitch drops operation charm skin bundle pack headgear uniform weapon "
+    "esports major league finals invitational season pass alpha bravo "
+    "charlie delta echo frost ember shadow storm"
+).split()
+
+
+def vocabulary(size: int = 2000) -> list[str]:
+    extra = [f"w{n}" for n in range(size - len(WORDS))]
+    return [*WORDS, *extra]
+
+
+def pick(rng: random.Random, words: list[str]) -> str:
+    # Titles share the handful of common words; keywords mostly do not.
+    if rng.random() < 0.05:
+        return rng.choice(WORDS)
+    return rng.choice(words)
+
+
+def make_subscribers(
+    count: int, words: list[str], rng: random.Random
+) -> list[Subscriber]:
+    subscribers = []
+    for n in range(count):
+        if rng.random() < 0.01:
+            keywords: tuple[str, ...] = ()
+        else:
+            keywords = tuple(
+                " ".join(pick(rng, words) for _ in range(rng.choice((1, 1, 2))))
+                for _ in range(rng.randint(1, 3))
+            )
+        excludes = (pick(rng, words),) if rng.random() < 0.2 else ()
+        subscribers.append(Subscriber(str(n), keywords, (), excludes))
+    return subscribers
+
+
+def make_titles(count: int, words: list[str], rng: random.Random) -> list[str]:
+    return [
+        f"{rng.choice(GAMES)} {' '.join(pick(rng, words) for _ in range(4))} "
+        f"{rng.choice(WORDS).title()} #{n}"
+        for n in range(count)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=100_000)
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--sample", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary()
+    subscribers = make_subscribers(args.subscribers, words, rng)
+    titles = make_titles(args.cards, words, rng)
+    print(f"{args.subscribers} subscribers, {args.cards} cards")
+
+    start = time.perf_counter()
+    index = SubscriberIndex(subscribers)
+    built = time.perf_counter()
+    matched = index.match(titles)
+    done = time.perf_counter()
+    pairs = sum(len(positions) for positions in matched.values())
+    print(f"{'index build':<24} {(built - start) * 1000:9.1f} ms")
+    print(
+        f"{'index match':<24} {(done - built) * 1000:9.1f} ms  "
+        f"{len(matched)} subscribers, {pairs} (card, subscriber) matches"
+    )
+
+    runs = [("bitsets (int)", False)]
+    if HAVE_NUMPY:
+        runs.append(("bitsets (numpy)", True))
+    else:
+        print("bitsets (numpy) skipped (numpy not installed)")
+    for name, use_numpy in runs:
+        start = time.perf_counter()
+        rules = RuleSet(subscribers, use_numpy=use_numpy)
+        built = time.perf_counter()
+        result = rules.match(titles)
+        done = time.perf_counter()
+        print(f"{name + ' build':<24} {(built - start) * 1000:9.1f} ms")
+        print(f"{name + ' match':<24} {(done - built) * 1000:9.1f} ms")
+        if result != matched:
+            print(f"{name} and index disagree", file=sys.stderr)
+            return 1
+
+    sample = subscribers[: args.sample]
+    start = time.perf_counter()
+    naive = {
+        s.chat_id: positions
+        for s in sample
+        if (positions := [i for i, t in enumerate(titles) if s.matches(t)])
+    }
+    elapsed = time.perf_counter() - start
+    scale = args.subscribers / max(len(sample), 1)
+    print(
+        f"{'naive loop':<24} {elapsed * scale * 1000:9.1f} ms  "
+        f"(extrapolated from {len(sample)} subscribers)"
+    )
+    expected = {c: matched[c] for c in (s.chat_id for s in sample) if c in matched}
+    if naive != expected:
+        print("index and naive loop disagree", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""DropNoti: turn scraped drop campaign snapshots into Telegram notifications."""
+
+from .message import (
+    Message,
+    build_message,
+    format_line,
+    message_from_snapshot,
+    paginate,
+)
+
+__all__ = [
+    "Message",
+    "build_message",
+    "format_line",
+    "message_from_snapshot",
+    "paginate",
+]
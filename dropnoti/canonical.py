@@ -0,0 +1,161 @@
+"""Canonical on-disk form of a drops snapshot.
+
+The scraper emits cards and keys in whatever order it found them, so two
+snapshots with the same content can differ byte for byte.  The canonical form
+fixes that:
+
+* every string has its whitespace collapsed (see :func:`normalize_space`),
+* object keys are sorted,
+* cards are ordered by end time (see :mod:`dropnoti.timeframe`), then
+  title, then their own encoding,
+* each card sits on its own line, so a changed campaign is a one-line diff.
+
+Two canonical snapshots are equal exactly when their bytes are equal.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import Any, Mapping
+
+from .files import write_atomic
+from .message import normalize_space
+from .timeframe import parse as parse_timeframe
+from .timeframe import scrape_date
+
+
+class NotCanonicalError(ValueError):
+    """A snapshot file is valid JSON but not in canonical form."""
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return normalize_space(value)
+    if isinstance(value, Mapping):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def _epoch(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        return stamp.timestamp()
+    return None
+
+
+def card_end_time(card: Mapping[str, Any], today: date | None = None) -> float | None:
+    """The card's end as a UTC epoch.
+
+    An explicit ``ends_at``/``end`` field wins; otherwise the ``timeframe``
+    text is parsed, completing dates without a year relative to ``today``.
+    """
+    for key in ("ends_at", "end"):
+        end = _epoch(card.get(key))
+        if end is not None:
+            return end
+    timeframe = card.get("timeframe")
+    if isinstance(timeframe, str):
+        end = parse_timeframe(timeframe, today).end
+        if end is not None:
+            return float(end)
+    return None
+
+
+def card_sort_key(card: Any, today: date | None = None) -> tuple:
+    """Order by end time (unknown last), then title, then the full card."""
+    if not isinstance(card, Mapping):
+        return (True, 0.0, "", _encode(card))
+    end = card_end_time(card, today)
+    title = card.get("title")
+    return (
+        end is None,
+        end or 0.0,
+        title if isinstance(title, str) else "",
+        _encode(card),
+    )
+
+
+def canonicalize(snapshot: Mapping[str, Any]) -> dict[str, Any]:
+    """Return a normalized copy of ``snapshot`` with its cards sorted."""
+    result = _normalize(snapshot)
+    cards = result.get("cards")
+    if isinstance(cards, list):
+        scraped_at = result.get("scraped_at")
+        today = scrape_date(scraped_at if isinstance(scraped_at, str) else None)
+        result["cards"] = sorted(cards, key=lambda card: card_sort_key(card, today))
+    return result
+
+
+def dumps(snapshot: Mapping[str, Any]) -> bytes:
+    """Serialize ``snapshot`` in canonical form."""
+    snapshot = canonicalize(snapshot)
+    lines = ["{"]
+    keys = sorted(snapshot)
+    for i, key in enumerate(keys):
+        comma = "," if i < len(keys) - 1 else ""
+        value = snapshot[key]
+        if isinstance(value, list) and value:
+            lines.append(f"  {_encode(key)}: [")
+            lines.extend(f"    {_encode(item)}," for item in value[:-1])
+            lines.append(f"    {_encode(value[-1])}")
+            lines.append(f"  ]{comma}")
+        else:
+            lines.append(f"  {_encode(key)}: {_encode(value)}{comma}")
+    lines.append("}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def write(snapshot: Mapping[str, Any], path: str | os.PathLike[str]) -> bytes:
+    """Atomically write ``snapshot`` to ``path`` in canonical form."""
+    data = dumps(snapshot)
+    write_atomic(path, data)
+    return data
+
+
+def read(path: str | os.PathLike[str], verify: bool = True) -> dict[str, Any]:
+    """Load a snapshot from ``path``.
+
+    With ``verify`` set, raise :class:`NotCanonicalError` unless the file is
+    byte-identical to its canonical form.
+    """
+    with open(path, "rb") as fh:
+        data = fh.read()
+    snapshot = json.loads(data)
+    if not isinstance(snapshot, dict):
+        raise NotCanonicalError(f"{os.fspath(path)}: top level is not an object")
+    if verify and dumps(snapshot) != data:
+        raise NotCanonicalError(f"{os.fspath(path)} is not in canonical form")
+    return snapshot
+
+
+def is_canonical(path: str | os.PathLike[str]) -> bool:
+    try:
+        read(path)
+    except ValueError:
+        return False
+    return True
+
+
+def same_content(a: str | os.PathLike[str], b: str | os.PathLike[str]) -> bool:
+    """Compare two canonical snapshots by their bytes."""
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        return fa.read() == fb.read()
@@ -0,0 +1,1280 @@
+"""Command line entry point: ``python -m dropnoti <command>``."""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import secrets
+import sys
+import time
+from typing import TYPE_CHECKING, Sequence
+
+from .message import build_message, paginate
+from .notify import UNCHANGED, plan
+from .state import save_state
+
+if TYPE_CHECKING:
+    from .feeds import Feed, FeedPlan
+    from .posts import PostStore
+    from .schedule import AdaptiveScheduler
+    from .telegram import ApiResult, TelegramClient
+
+
+def write_github_output(name: str, value: str) -> None:
+    """Append a (possibly multi-line) step output to ``$GITHUB_OUTPUT``."""
+    path = os.environ.get("GITHUB_OUTPUT")
+    if not path:
+        raise SystemExit("GITHUB_OUTPUT is not set")
+    delimiter = f"EOF_{secrets.token_hex(8)}"
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(f"{name}<<{delimiter}\n{value}\n{delimiter}\n")
+
+
+def _use_feed(args: argparse.Namespace) -> Feed:
+    """Look up ``--game`` and fill in the defaults its feed provides."""
+    from .feeds import find_feed
+
+    try:
+        feed = find_feed(args.game, args.registry)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    if args.snapshot is None:
+        args.snapshot = feed.snapshot
+    args.template = feed.template
+    return feed
+
+
+def _cmd_build(args: argparse.Namespace) -> int:
+    _use_feed(args)
+    if args.ndjson:
+        from .ndjson import iter_ndjson, message_from_cards
+
+        fh = sys.stdin if args.ndjson == "-" else open(args.ndjson, encoding="utf-8")
+        try:
+            with fh:
+                message = message_from_cards(
+                    iter_ndjson(fh), args.limit, template=args.template
+                )
+        except ValueError as exc:
+            raise SystemExit(f"{args.ndjson}: {exc}") from None
+    else:
+        message = build_message(
+            args.snapshot, limit=args.limit, template=args.template
+        )
+    pages = message.pages()
+    if args.github_output:
+        write_github_output("TEXT", message.text)
+        write_github_output("PAGES", json.dumps(pages, ensure_ascii=False))
+    else:
+        sys.stdout.write("\n\n".join(pages) + "\n")
+    return 0
+
+
+def _require_env(name: str) -> str:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        raise SystemExit(f"{name} is not set")
+    return value
+
+
+def _chat_ids() -> list[str]:
+    from .telegram import parse_chat_ids
+
+    return parse_chat_ids(_require_env("TELEGRAM_CHAT_ID"))
+
+
+def _send(args: argparse.Namespace, pages: list[str], digest: str | None = None) -> int:
+    # Imported here so that runs which skip sending never load asyncio or ssl.
+    import asyncio
+
+    return asyncio.run(_send_async(args, pages, digest))
+
+
+async def _send_async(
+    args: argparse.Namespace, pages: list[str], digest: str | None
+) -> int:
+    from .telegram import API_URL, TelegramClient
+
+    token = _require_env("TELEGRAM_BOT_TOKEN")
+    chat_ids = _chat_ids()
+    async with TelegramClient(token, args.api_url or API_URL) as client:
+        if args.outbox:
+            assert digest is not None
+            return await _deliver(args, client, chat_ids, pages, digest)
+        results = await client.send_pages_many(chat_ids, pages)
+    failed = 0
+    for result in results:
+        status = "ok" if result.ok else f"failed ({result.status}) {result.description}"
+        print(
+            f"chat {result.chat_id}: {status} in {result.latency * 1000:.0f} ms",
+            file=sys.stderr,
+        )
+        failed += not result.ok
+    return 1 if failed else 0
+
+
+async def _deliver(
+    args: argparse.Namespace,
+    client: TelegramClient,
+    chat_ids: list[str],
+    pages: list[str],
+    digest: str,
+) -> int:
+    from .outbox import Outbox
+
+    with Outbox(args.outbox) as outbox:
+        new = outbox.enqueue(digest, chat_ids, pages)
+        planned = len(chat_ids) * len(pages)
+        if new < planned:
+            print(
+                f"{planned - new} of {planned} message(s) were already planned "
+                f"under digest {digest[:12]}",
+                file=sys.stderr,
+            )
+        report = await outbox.deliver(client, digest, wait=args.max_wait)
+    print(
+        f"outbox: {report.delivered} delivered, {report.pending} pending, "
+        f"{report.failed} failed for good",
+        file=sys.stderr,
+    )
+    # Permanent failures (say, a chat that blocked the bot) are reported but
+    # do not hold back the state; pending retries do.
+    return 1 if report.pending else 0
+
+
+def _message_digest(args: argparse.Namespace) -> str | None:
+    """The outbox digest of what ``send`` is about to post."""
+    if not args.outbox:
+        return None
+    if args.text is not None:
+        return hashlib.sha256(args.text.encode("utf-8")).hexdigest()
+    from .fingerprint import content_hash
+
+    return content_hash(args.snapshot)
+
+
+def _edit(args: argparse.Namespace, pages: list[str]) -> int:
+    from .posts import PostStore, today
+
+    chat_ids = _chat_ids()
+    store = PostStore(args.posts)
+    day = today()
+    if all(
+        (post := store.get(chat_id)) is not None
+        and post.day == day
+        and post.pages == pages
+        and not post.orphans
+        for chat_id in chat_ids
+    ):
+        print("today's post is already up to date in every chat", file=sys.stderr)
+        return 0
+    import asyncio
+
+    return asyncio.run(_edit_async(args, store, chat_ids, pages, day))
+
+
+async def _edit_async(
+    args: argparse.Namespace,
+    store: PostStore,
+    chat_ids: list[str],
+    pages: list[str],
+    day: str,
+) -> int:
+    from .posts import publish
+    from .telegram import API_URL, TelegramClient
+
+    token = _require_env("TELEGRAM_BOT_TOKEN")
+    async with TelegramClient(token, args.api_url or API_URL) as client:
+        results = await publish(client, store, chat_ids, pages, day)
+    store.save()
+    for r in results:
+        status = "ok" if r.ok else f"failed ({r.failed[0].status}) "
+        if not r.ok:
+            status += r.failed[0].description
+        print(
+            f"chat {r.chat_id}: {status}; {r.sent} sent, {r.edited} edited, "
+            f"{r.deleted} deleted, {r.unchanged} unchanged",
+            file=sys.stderr,
+        )
+    return 0 if all(r.ok for r in results) else 1
+
+
+def _send_each(args: argparse.Namespace, pages: dict[str, list[str]]) -> int:
+    import asyncio
+
+    from .telegram import API_URL, TelegramClient
+
+    async def send() -> list[ApiResult]:
+        token = _require_env("TELEGRAM_BOT_TOKEN")
+        async with TelegramClient(token, args.api_url or API_URL) as client:
+            per_chat = await asyncio.gather(
+                *(client.send_pages(chat, texts) for chat, texts in pages.items())
+            )
+        return [result for results in per_chat for result in results]
+
+    results = asyncio.run(send()) if pages else []
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        print(f"chat {r.chat_id}: failed ({r.status}) {r.description}", file=sys.stderr)
+    print(
+        f"{len(results) - len(failed)} message(s) sent to {len(pages)} subscriber(s)",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def _send_to_subscribers(args: argparse.Namespace) -> int:
+    from .message import format_as_of
+    from .state import read_snapshot_index
+    from .subscribers import SubscriberStore, fan_out
+
+    if args.edit or args.outbox or args.text is not None:
+        raise SystemExit(
+            "--subscribers cannot be combined with --edit, --outbox or --text"
+        )
+    start = time.perf_counter()
+    index = SubscriberStore(args.subscribers).rules(args.game)
+    result = None
+    if args.state:
+        result = plan(args.snapshot, args.state, args.limit, template=args.template)
+        if result.message is None or result.changes is None:
+            print(f"nothing to send ({result.skipped})", file=sys.stderr)
+            return 0
+        items = result.changes.items()
+        as_of = result.message.as_of
+    else:
+        header, campaigns = read_snapshot_index(args.snapshot)
+        items = [(c, str(c)) for c in campaigns]
+        as_of = format_as_of(header.get("scraped_at"))
+    messages = fan_out(index, items, as_of, args.limit, args.template)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(
+        f"{len(items)} campaign(s) matched {len(messages)} of {len(index)} "
+        f"subscriber(s) in {elapsed:.1f} ms",
+        file=sys.stderr,
+    )
+    status = _send_each(args, {chat: m.pages() for chat, m in messages.items()})
+    if status == 0 and result is not None:
+        save_state(result.state, args.state)
+    return status
+
+
+def _cmd_send(args: argparse.Namespace) -> int:
+    _use_feed(args)
+    if args.subscribers:
+        return _send_to_subscribers(args)
+    if args.edit:
+        if args.state or args.outbox:
+            raise SystemExit("--edit cannot be combined with --state or --outbox")
+        if args.text is not None:
+            return _edit(args, paginate(args.text.split("\n")))
+        message = build_message(args.snapshot, limit=args.limit, template=args.template)
+        return _edit(args, message.pages())
+    if args.text is not None:
+        return _send(args, paginate(args.text.split("\n")), _message_digest(args))
+    if not args.state:
+        message = build_message(args.snapshot, limit=args.limit, template=args.template)
+        return _send(args, message.pages(), _message_digest(args))
+
+    start = time.perf_counter()
+    result = plan(args.snapshot, args.state, args.limit, template=args.template)
+    if result.skipped == UNCHANGED:
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"{args.snapshot} unchanged since the last send "
+            f"(content hash {result.digest[:12]}); skipping in {elapsed:.1f} ms",
+            file=sys.stderr,
+        )
+        return 0
+    if result.message is None:
+        print("no campaign changes since the last run; not sending", file=sys.stderr)
+        return 0
+    status = _send(args, result.message.pages(), result.transition)
+    if status == 0:
+        save_state(result.state, args.state)
+    return status
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    import asyncio
+    import logging
+    import signal
+
+    from .daemon import Daemon, FileSource, HTTPSource, PollInterval
+    from .outbox import Outbox
+    from .posts import PostStore
+    from .telegram import API_URL, TelegramClient
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    if args.edit and args.outbox:
+        raise SystemExit("--edit cannot be combined with --outbox")
+    feed = _use_feed(args)
+    if args.state is None:
+        args.state = feed.state
+    token = _require_env("TELEGRAM_BOT_TOKEN")
+    chat_ids = _chat_ids()
+    source = args.source or args.snapshot
+    if args.adaptive:
+        interval = _adaptive_scheduler(args)
+    else:
+        interval = PollInterval(
+            args.min_interval or 10.0, args.max_interval or 60.0
+        )
+
+    async def serve() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        outbox = Outbox(args.outbox) if args.outbox else None
+        posts = PostStore(args.posts) if args.edit else None
+        async with TelegramClient(token, args.api_url or API_URL) as client:
+            daemon = Daemon(
+                HTTPSource(source) if "://" in source else FileSource(source),
+                client,
+                chat_ids,
+                snapshot_path=args.snapshot,
+                state_path=args.state,
+                interval=interval,
+                limit=args.limit,
+                history_dir=args.history,
+                outbox=outbox,
+                posts=posts,
+                template=feed.template,
+            )
+            try:
+                await daemon.run(stop)
+            finally:
+                if outbox is not None:
+                    outbox.close()
+        if args.adaptive:
+            logging.info("poll intervals: %s", interval.metrics.as_dict())
+
+    asyncio.run(serve())
+    return 0
+
+
+def _cmd_feeds(args: argparse.Namespace) -> int:
+    from .feeds import load_feeds, prepare_all
+
+    try:
+        feeds = load_feeds(args.registry)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    if args.action == "list":
+        for feed in feeds:
+            print(f"{feed.game}\t{feed.template.name}\t{feed.snapshot}\t{feed.state}")
+        return 0
+    if args.game:
+        unknown = set(args.game) - {feed.game for feed in feeds}
+        if unknown:
+            raise SystemExit(f"not in {args.registry}: {', '.join(sorted(unknown))}")
+        feeds = [feed for feed in feeds if feed.game in args.game]
+
+    start = time.perf_counter()
+    plans = prepare_all(
+        feeds,
+        args.workers,
+        processes=not args.threads,
+        limit=args.limit,
+        use_state=not args.no_state,
+        record_history=args.history,
+        dry_run=args.dry_run,
+    )
+    prepared = time.perf_counter() - start
+    sent: dict[str, tuple[bool, float]] = {}
+    if args.dry_run:
+        for p in plans:
+            if p.pages:
+                sys.stdout.write(f"# {p.feed.game}\n" + "\n\n".join(p.pages) + "\n")
+    elif any(p.pages for p in plans):
+        import asyncio
+
+        sent = asyncio.run(_send_feeds(args, plans))
+    failed = 0
+    for p in plans:
+        ok, seconds = sent.get(p.feed.game, (True, 0.0))
+        if p.error:
+            status = f"failed: {p.error}"
+        elif not p.pages:
+            status = f"nothing to send ({p.skipped})"
+        elif args.dry_run:
+            status = f"{len(p.pages)} page(s) not sent (dry run)"
+        elif ok:
+            status = f"sent {len(p.pages)} page(s)"
+        else:
+            status = "send failed"
+        failed += bool(p.error) or not ok
+        if ok and not p.error and p.state is not None and not args.dry_run:
+            save_state(p.state, p.feed.state)
+        print(
+            f"{p.feed.game:<10} prepare {p.seconds * 1000:8.1f} ms  "
+            f"send {seconds * 1000:8.1f} ms  {status}",
+            file=sys.stderr,
+        )
+    pool = "thread(s)" if args.threads else "process(es)"
+    workers = args.workers or min(len(feeds), os.cpu_count() or 1)
+    print(
+        f"{len(plans)} feed(s) prepared in {prepared * 1000:.1f} ms "
+        f"on {workers} {pool}, {time.perf_counter() - start:.2f} s in total",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+async def _send_feeds(
+    args: argparse.Namespace, plans: list[FeedPlan]
+) -> dict[str, tuple[bool, float]]:
+    """Send every feed's pages through one client; per game, success and time."""
+    import asyncio
+
+    from .telegram import API_URL, TelegramClient
+
+    token = _require_env("TELEGRAM_BOT_TOKEN")
+    chat_ids = _chat_ids()
+    due = [p for p in plans if p.pages]
+    async with TelegramClient(token, args.api_url or API_URL) as client:
+        if args.outbox:
+            from .outbox import Outbox
+
+            with Outbox(args.outbox) as outbox:
+                # Keys are per game, so two feeds with equal content both go out.
+                digests = {p.feed.game: f"{p.feed.game}:{p.digest}" for p in due}
+                for p in due:
+                    outbox.enqueue(digests[p.feed.game], chat_ids, p.pages)
+                start = time.perf_counter()
+                await outbox.deliver(client, wait=args.max_wait)
+                elapsed = time.perf_counter() - start
+                return {
+                    game: (not outbox.report(digest).pending, elapsed)
+                    for game, digest in digests.items()
+                }
+
+        async def send(p: FeedPlan) -> tuple[bool, float]:
+            start = time.perf_counter()
+            results = await client.send_pages_many(chat_ids, p.pages)
+            for r in results:
+                if not r.ok:
+                    print(
+                        f"{p.feed.game} chat {r.chat_id}: failed ({r.status}) "
+                        f"{r.description}",
+                        file=sys.stderr,
+                    )
+            return all(r.ok for r in results), time.perf_counter() - start
+
+        outcomes = await asyncio.gather(*(send(p) for p in due))
+    return {p.feed.game: outcome for p, outcome in zip(due, outcomes)}
+
+
+def _adaptive_scheduler(args: argparse.Namespace) -> AdaptiveScheduler:
+    from . import schedule
+    from .history import SnapshotHistory
+
+    model = schedule.ReleaseModel()
+    if args.history:
+        with SnapshotHistory(args.history) as history:
+            model = schedule.ReleaseModel.from_history(history)
+    return schedule.AdaptiveScheduler(
+        model,
+        args.min_interval or schedule.MIN_INTERVAL,
+        args.max_interval or schedule.MAX_INTERVAL,
+    )
+
+
+def _cmd_schedule(args: argparse.Namespace) -> int:
+    from . import schedule
+    from .history import SnapshotHistory
+
+    if args.history:
+        with SnapshotHistory(args.history) as history:
+            releases = schedule.release_times(history)
+        if len(releases) < 2:
+            print(f"not enough releases in {args.history}", file=sys.stderr)
+            return 1
+        # Train on the first half, replay the second half.
+        split = releases[len(releases) // 2 - 1] + 1
+        end = releases[-1] + max(args.max_interval, *args.fixed)
+    else:
+        start = schedule.SIMULATION_START
+        releases = schedule.synthetic_releases(
+            args.train_weeks + args.weeks, start, seed=args.seed
+        )
+        split = start + args.train_weeks * schedule.WEEK
+        end = split + args.weeks * schedule.WEEK
+    train = [r for r in releases if r < split]
+    adaptive = None
+
+    def make_adaptive(clock: schedule.FakeClock) -> schedule.AdaptiveScheduler:
+        nonlocal adaptive
+        adaptive = schedule.AdaptiveScheduler(
+            schedule.ReleaseModel.from_releases(train),
+            args.min_interval,
+            args.max_interval,
+            clock=clock,
+        )
+        return adaptive
+
+    results = [
+        schedule.simulate(
+            f"fixed {interval:g}s",
+            lambda clock, interval=interval: schedule.FixedInterval(interval),
+            releases,
+            split,
+            end,
+        )
+        for interval in args.fixed
+    ]
+    results.append(schedule.simulate("adaptive", make_adaptive, releases, split, end))
+    print(f"{len(train)} releases learned, {len(results[-1].latencies)} replayed")
+    print(f"{'policy':<12} {'polls':>8} {'mean':>8} {'p50':>8} {'p95':>8}")
+    for r in results:
+        print(
+            f"{r.name:<12} {r.polls:>8} {r.mean_latency:>7.1f}s "
+            f"{r.percentile(0.5):>7.1f}s {r.percentile(0.95):>7.1f}s"
+        )
+    assert adaptive is not None
+    print(json.dumps(adaptive.metrics.as_dict()))
+    return 0
+
+
+def _cmd_subscribers(args: argparse.Namespace) -> int:
+    from .subscribers import Subscriber, SubscriberStore
+
+    store = SubscriberStore(args.file)
+    if args.action == "add":
+        store.add(
+            Subscriber(
+                args.chat_id,
+                tuple(args.keyword),
+                tuple(args.game),
+                tuple(args.exclude),
+            )
+        )
+        store.save()
+        print(f"{len(store)} subscriber(s) in {args.file}", file=sys.stderr)
+        return 0
+    if args.action == "remove":
+        if not store.remove(args.chat_id):
+            print(f"{args.chat_id} is not subscribed", file=sys.stderr)
+            return 1
+        store.save()
+        return 0
+    if args.action == "list":
+        for subscriber in store:
+            keywords = ", ".join(subscriber.keywords) or "everything"
+            games = ", ".join(subscriber.games) or "all games"
+            excludes = ", ".join(subscriber.excludes) or "-"
+            print(f"{subscriber.chat_id}\t{keywords}\t{games}\t{excludes}")
+        return 0
+    from .state import read_snapshot_index
+
+    start = time.perf_counter()
+    index = store.rules(args.game)
+    built = time.perf_counter()
+    _, campaigns = read_snapshot_index(args.snapshot)
+    matched = index.match([c.title for c in campaigns])
+    done = time.perf_counter()
+    for chat_id, positions in matched.items():
+        print(f"{chat_id}\t{len(positions)}")
+    print(
+        f"{len(campaigns)} campaign(s), {len(index)} subscriber(s): "
+        f"index built in {(built - start) * 1000:.1f} ms, "
+        f"{len(matched)} matched in {(done - built) * 1000:.1f} ms",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _cmd_canonicalize(args: argparse.Namespace) -> int:
+    from . import canonical
+
+    status = 0
+    for path in args.snapshots:
+        if args.check:
+            if not canonical.is_canonical(path):
+                print(f"{path} is not in canonical form", file=sys.stderr)
+                status = 1
+            continue
+        with open(path, "rb") as fh:
+            snapshot = json.load(fh)
+        canonical.write(snapshot, args.output or path)
+    return status
+
+
+def _cmd_history(args: argparse.Namespace) -> int:
+    from datetime import datetime, timezone
+
+    from .history import SnapshotHistory
+
+    with SnapshotHistory(args.dir) as history:
+        if args.action == "append":
+            with open(args.snapshot, "rb") as fh:
+                history.append(json.load(fh))
+            print(f"{len(history)} snapshots in {args.dir}", file=sys.stderr)
+            return 0
+        if args.action == "at":
+            snapshot = history.at(args.when)
+            if snapshot is None:
+                print(f"no snapshot at or before {args.when}", file=sys.stderr)
+                return 1
+            json.dump(snapshot, sys.stdout, ensure_ascii=False, indent=2)
+            sys.stdout.write("\n")
+            return 0
+        seen = history.first_seen(args.title, args.timeframe)
+        if seen is None:
+            print(f"{args.title!r} never appeared", file=sys.stderr)
+            return 1
+        stamp = datetime.fromtimestamp(seen, timezone.utc)
+        print(stamp.isoformat().replace("+00:00", "Z"))
+        return 0
+
+
+def _cmd_timeframes(args: argparse.Namespace) -> int:
+    from datetime import datetime, timezone
+
+    from . import schema, timeframe
+
+    def fmt(epoch: int | None) -> str:
+        if epoch is None:
+            return "?"
+        return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+    snapshot = schema.load(args.snapshot)
+    today = timeframe.scrape_date(snapshot.scraped_at)
+    unparseable = 0
+    for text in dict.fromkeys(card.timeframe for card in snapshot.cards):
+        parsed = timeframe.parse(text, today)
+        if parsed.ok:
+            print(f"{fmt(parsed.start)} .. {fmt(parsed.end)} UTC  {text}")
+        elif timeframe.is_unparseable(text, today):
+            unparseable += 1
+            print(f"UNPARSEABLE                           {text}")
+    if unparseable:
+        print(f"{unparseable} unparseable timeframe(s)", file=sys.stderr)
+    return 1 if unparseable and args.strict else 0
+
+
+def _cmd_scrape(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .extract import CardExtractor
+    from .ndjson import scrape_and_build
+    from .scrape import ScrapeError, ValidatorCache, page_parser
+
+    if args.ndjson == "-" and args.message:
+        raise SystemExit("--ndjson - and --message both write to stdout")
+    args.snapshot = args.output
+    _use_feed(args)
+    try:
+        extractor = CardExtractor(args.card, args.title, args.timeframe)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    cache = None if args.no_cache else ValidatorCache(args.cache)
+    existed = os.path.exists(args.snapshot)
+    if args.ndjson is None:
+        stream = None
+    elif args.ndjson == "-":
+        stream = sys.stdout
+    else:
+        stream = open(args.ndjson, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        result, message = asyncio.run(
+            scrape_and_build(
+                args.urls,
+                args.snapshot,
+                cache,
+                page_parser(extractor),
+                per_host=args.per_host,
+                limit=args.limit,
+                template=args.template,
+                ndjson=stream,
+            )
+        )
+    except ScrapeError as exc:
+        print(f"scrape failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not None and stream is not sys.stdout:
+            stream.close()
+    elapsed = time.perf_counter() - start
+    if args.message:
+        sys.stdout.write("\n\n".join(message.pages()) + "\n")
+    for page in result.pages:
+        status = page.status if page.error is None else f"failed ({page.error})"
+        print(
+            f"{page.url}: {status}, {len(page.cards)} card(s) "
+            f"in {page.seconds * 1000:.1f} ms",
+            file=sys.stderr,
+        )
+    unchanged = sum(page.not_modified for page in result.pages)
+    written = "written to" if result.changed or not existed else "unchanged in"
+    print(
+        f"{len(result.cards)} card(s) from {len(result.pages)} page(s) "
+        f"({unchanged} not modified) {written} {args.snapshot} "
+        f"in {elapsed * 1000:.1f} ms",
+        file=sys.stderr,
+    )
+    return 1 if result.failed else 0
+
+
+def _parse_workers(text: str | None) -> dict[str, int]:
+    workers = {}
+    for part in (text or "").replace(",", " ").split():
+        name, _, count = part.partition("=")
+        if not count.isdigit() or int(count) < 1:
+            raise SystemExit(f"--workers: expected STAGE=N, got {part!r}")
+        workers[name] = int(count)
+    return workers
+
+
+def _cmd_pipeline(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .pipeline import (
+        NotifyOutcome,
+        Pipeline,
+        StageMetrics,
+        format_progress,
+        notify_stages,
+    )
+    from .scrape import ScrapeError, Scraper, ValidatorCache
+    from .state import load_state
+    from .subscribers import SubscriberStore
+    from .telegram import API_URL, TelegramClient
+
+    args.snapshot = args.output
+    _use_feed(args)
+    workers = _parse_workers(args.workers)
+    subscribers = None
+    if args.subscribers:
+        subscribers = SubscriberStore(args.subscribers).rules(args.game)
+        chat_ids = []
+    elif args.dry_run and not os.environ.get("TELEGRAM_CHAT_ID", "").strip():
+        chat_ids = ["dry-run"]
+    else:
+        chat_ids = _chat_ids()
+    token = None if args.dry_run else _require_env("TELEGRAM_BOT_TOKEN")
+    previous = load_state(args.state) if args.state else None
+    cache = None if args.no_cache else ValidatorCache(args.cache)
+    outcome = NotifyOutcome()
+
+    def progress(metrics: list[StageMetrics]) -> None:
+        print(format_progress(metrics), file=sys.stderr)
+
+    async def run() -> Pipeline:
+        async with contextlib.AsyncExitStack() as stack:
+            scraper = await stack.enter_async_context(
+                Scraper(cache=cache, per_host=args.per_host)
+            )
+            client = None
+            if token is not None:
+                client = await stack.enter_async_context(
+                    TelegramClient(token, args.api_url or API_URL)
+                )
+            stages = notify_stages(
+                scraper,
+                outcome,
+                chat_ids,
+                client,
+                previous,
+                subscribers,
+                args.snapshot,
+                args.limit,
+                args.template,
+                workers,
+                args.queue_size,
+            )
+            unknown = set(workers) - {stage.name for stage in stages}
+            if unknown:
+                raise SystemExit(f"--workers: unknown stage(s) {sorted(unknown)}")
+            pipeline = Pipeline(
+                stages, progress if args.progress else None, args.progress or 1.0
+            )
+            return await pipeline.run(enumerate(args.urls))
+
+    try:
+        report = asyncio.run(run())
+    except ScrapeError as exc:
+        print(f"scrape failed: {exc}", file=sys.stderr)
+        return 1
+    for line in report.format():
+        print(line, file=sys.stderr)
+    changes = len(outcome.changes or ())
+    print(
+        f"{outcome.cards} card(s) from {len(outcome.pages)} page(s), "
+        f"{changes} change(s), {len(outcome.results)} chat(s) "
+        + ("planned (dry run)" if args.dry_run else "sent"),
+        file=sys.stderr,
+    )
+    failed = outcome.failed
+    for chat_id in failed:
+        result = outcome.results[chat_id][-1]
+        print(
+            f"chat {chat_id}: failed ({result.status}) {result.description}",
+            file=sys.stderr,
+        )
+    if failed:
+        return 1
+    if args.state and not args.dry_run and (state := outcome.state()) is not None:
+        save_state(state, args.state)
+    return 0
+
+
+def _cmd_fakesite(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .fakesite import FixtureServer
+
+    async def serve() -> None:
+        server = FixtureServer.from_directory(
+            args.directory, host=args.host, port=args.port
+        )
+        await server.start()
+        for path in sorted(server.pages):
+            print(server.url(path), file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _cmd_fakegql(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .fakegql import StubGraphQLServer, load_recordings
+
+    async def serve() -> None:
+        server = StubGraphQLServer(
+            load_recordings(args.recordings),
+            args.host,
+            args.port,
+            preload=args.preload,
+        )
+        await server.start()
+        print(f"stub GraphQL endpoint listening on {server.url}", file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _cmd_fakebot(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .fakebot import FakeBotServer
+
+    async def serve() -> None:
+        server = FakeBotServer(args.host, args.port)
+        await server.start()
+        print(f"fake Bot API listening on {server.base_url}", file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _add_limit(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--limit",
+        type=int,
+        metavar="N",
+        help="list only the first N campaigns and an '… and N more' line "
+        "(default: all of them, split across as few messages as fit)",
+    )
+
+
+def _add_game(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--game",
+        default="r6",
+        help="game whose snapshot, wording and subscribers to use (default: r6)",
+    )
+    _add_registry(parser)
+
+
+def _add_registry(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--registry",
+        default="feeds.json",
+        help="feed registry listing each game (default: %(default)s)",
+    )
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dropnoti")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="render the drops message")
+    build.add_argument(
+        "snapshot", nargs="?", help="default: the game's latest_<game>.json"
+    )
+    _add_limit(build)
+    _add_game(build)
+    build.add_argument(
+        "--github-output",
+        action="store_true",
+        help="write the message to $GITHUB_OUTPUT as TEXT",
+    )
+    build.add_argument(
+        "--ndjson",
+        metavar="PATH",
+        help="build from an NDJSON card stream (e.g. scrape --ndjson) instead "
+        "of the snapshot; '-' reads stdin",
+    )
+    build.set_defaults(func=_cmd_build)
+
+    send = sub.add_parser(
+        "send",
+        help="send the drops message to every chat in $TELEGRAM_CHAT_ID",
+    )
+    send.add_argument(
+        "snapshot", nargs="?", help="default: the game's latest_<game>.json"
+    )
+    _add_limit(send)
+    _add_game(send)
+    send.add_argument("--text", help="send this text instead of building it")
+    send.add_argument("--api-url", help="Bot API base URL (default: Telegram)")
+    send.add_argument(
+        "--state",
+        help="only send campaigns added, removed or changed since the index "
+        "saved at this path, and update it after a successful send",
+    )
+    send.add_argument(
+        "--outbox",
+        help="record planned messages in this SQLite outbox so reruns for the "
+        "same snapshot do not send them twice",
+    )
+    send.add_argument(
+        "--max-wait",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="with --outbox, how long to keep retrying failed sends",
+    )
+    send.add_argument(
+        "--edit",
+        action="store_true",
+        help="keep one post per chat per day and edit it when the list changes",
+    )
+    send.add_argument(
+        "--posts",
+        default=".dropnoti/posts.json",
+        help="where --edit remembers each chat's post (default: %(default)s)",
+    )
+    send.add_argument(
+        "--subscribers",
+        metavar="PATH",
+        help="send each subscriber in this registry only the campaigns matching "
+        "their filters, instead of everything to $TELEGRAM_CHAT_ID",
+    )
+    send.set_defaults(func=_cmd_send)
+
+    serve = sub.add_parser(
+        "serve", help="poll for new snapshots and notify as they appear"
+    )
+    serve.add_argument(
+        "--source",
+        help="snapshot URL or file to poll (default: the snapshot file itself)",
+    )
+    serve.add_argument("--snapshot", help="default: the game's latest_<game>.json")
+    serve.add_argument("--state", help="default: the game's state file")
+    _add_game(serve)
+    serve.add_argument("--history", help="also record snapshots in this directory")
+    serve.add_argument(
+        "--outbox", help="deliver through this SQLite outbox (see send --outbox)"
+    )
+    serve.add_argument(
+        "--edit",
+        action="store_true",
+        help="keep one post per chat per day up to date (see send --edit)",
+    )
+    serve.add_argument("--posts", default=".dropnoti/posts.json")
+    _add_limit(serve)
+    serve.add_argument("--api-url", help="Bot API base URL (default: Telegram)")
+    serve.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="poll often when drops usually appear (learned from --history) "
+        "and rarely otherwise",
+    )
+    serve.add_argument("--min-interval", type=float)
+    serve.add_argument("--max-interval", type=float)
+    serve.set_defaults(func=_cmd_serve)
+
+    feeds = sub.add_parser("feeds", help="process every game in the feed registry")
+    _add_registry(feeds)
+    feeds_actions = feeds.add_subparsers(dest="action", required=True)
+    feeds_actions.add_parser("list", help="print the registered feeds")
+    run = feeds_actions.add_parser(
+        "run",
+        help="diff, render and send every feed, preparing them in parallel",
+    )
+    run.add_argument(
+        "--game", action="append", help="only this game (repeatable; default: all)"
+    )
+    run.add_argument(
+        "--workers", type=int, help="pool size (default: one per feed, up to CPUs)"
+    )
+    run.add_argument(
+        "--threads",
+        action="store_true",
+        help="prepare feeds on threads instead of processes",
+    )
+    run.add_argument(
+        "--no-state",
+        action="store_true",
+        help="send every campaign instead of only the changes since each "
+        "feed's state file",
+    )
+    run.add_argument(
+        "--history",
+        action="store_true",
+        help="append each snapshot to its feed's history first",
+    )
+    run.add_argument(
+        "--outbox", help="deliver through this SQLite outbox (see send --outbox)"
+    )
+    run.add_argument("--max-wait", type=float, default=60.0, metavar="SECONDS")
+    run.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the pages instead of sending them",
+    )
+    _add_limit(run)
+    run.add_argument("--api-url", help="Bot API base URL (default: Telegram)")
+    feeds.set_defaults(func=_cmd_feeds)
+
+    sched = sub.add_parser(
+        "schedule", help="simulate adaptive against fixed-interval polling"
+    )
+    sched.add_argument(
+        "--history", help="replay releases from this history (default: synthetic)"
+    )
+    sched.add_argument("--weeks", type=int, default=4, help="synthetic weeks to replay")
+    sched.add_argument("--train-weeks", type=int, default=8)
+    sched.add_argument("--seed", type=int, default=0)
+    sched.add_argument(
+        "--fixed", type=float, nargs="+", default=[60.0], metavar="SECONDS"
+    )
+    sched.add_argument("--min-interval", type=float, default=15.0)
+    sched.add_argument("--max-interval", type=float, default=180.0)
+    sched.set_defaults(func=_cmd_schedule)
+
+    subs = sub.add_parser("subscribers", help="manage per-chat campaign filters")
+    subs.add_argument("--file", default=".dropnoti/subscribers.json")
+    subs_actions = subs.add_subparsers(dest="action", required=True)
+    add = subs_actions.add_parser(
+        "add", help="subscribe a chat (or replace its filters)"
+    )
+    add.add_argument("chat_id")
+    add.add_argument(
+        "--keyword",
+        action="append",
+        default=[],
+        help="only campaigns whose title has all these words (repeatable)",
+    )
+    add.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="never campaigns whose title has all these words (repeatable)",
+    )
+    add.add_argument(
+        "--game", action="append", default=[], help="only this game (repeatable)"
+    )
+    remove = subs_actions.add_parser("remove", help="unsubscribe a chat")
+    remove.add_argument("chat_id")
+    subs_actions.add_parser("list", help="print every subscriber and its filters")
+    match = subs_actions.add_parser(
+        "match", help="print how many campaigns each subscriber would get"
+    )
+    match.add_argument("snapshot", nargs="?", default="latest_r6.json")
+    match.add_argument("--game", default="r6")
+    subs.set_defaults(func=_cmd_subscribers)
+
+    canon = sub.add_parser(
+        "canonicalize", help="rewrite snapshots in canonical form"
+    )
+    canon.add_argument("snapshots", nargs="+")
+    canon.add_argument(
+        "--check",
+        action="store_true",
+        help="only report files that are not canonical (exit status 1)",
+    )
+    canon.add_argument("-o", "--output", help="write here instead of in place")
+    canon.set_defaults(func=_cmd_canonicalize)
+
+    history = sub.add_parser("history", help="append-only snapshot history")
+    history.add_argument("--dir", default=".dropnoti/history")
+    actions = history.add_subparsers(dest="action", required=True)
+    append = actions.add_parser("append", help="record a scraped snapshot")
+    append.add_argument("snapshot", nargs="?", default="latest_r6.json")
+    at = actions.add_parser("at", help="print the snapshot current at a time")
+    at.add_argument("when", help="ISO 8601 timestamp")
+    first = actions.add_parser(
+        "first-seen", help="print when a campaign first appeared"
+    )
+    first.add_argument("title")
+    first.add_argument("--timeframe")
+    history.set_defaults(func=_cmd_history)
+
+    timeframes = sub.add_parser(
+        "timeframes", help="show how each card timeframe is parsed"
+    )
+    timeframes.add_argument("snapshot", nargs="?", default="latest_r6.json")
+    timeframes.add_argument(
+        "--strict",
+        action="store_true",
+        help="exit with status 1 if any timeframe cannot be parsed",
+    )
+    timeframes.set_defaults(func=_cmd_timeframes)
+
+    scrape = sub.add_parser(
+        "scrape", help="fetch drop pages into the game's snapshot"
+    )
+    scrape.add_argument("urls", nargs="+", metavar="URL", help="pages to fetch")
+    scrape.add_argument(
+        "-o", "--output", help="snapshot to write (default: latest_<game>.json)"
+    )
+    _add_game(scrape)
+    scrape.add_argument(
+        "--cache",
+        default=".dropnoti/scrape-cache.json",
+        help="validators and cards of each page for conditional requests "
+        "(default: %(default)s)",
+    )
+    scrape.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="fetch and parse every page in full",
+    )
+    scrape.add_argument(
+        "--per-host",
+        type=int,
+        default=4,
+        metavar="N",
+        help="connections per host (default: %(default)s)",
+    )
+    scrape.add_argument(
+        "--card",
+        default=".drop-card",
+        metavar="SELECTOR",
+        help="CSS selector of a campaign card on HTML pages (default: %(default)s)",
+    )
+    scrape.add_argument("--title", default=".drop-card__title", metavar="SELECTOR")
+    scrape.add_argument(
+        "--timeframe", default=".drop-card__timeframe", metavar="SELECTOR"
+    )
+    scrape.add_argument(
+        "--ndjson",
+        metavar="PATH",
+        help="also write the cards here as NDJSON while scraping ('-' for stdout)",
+    )
+    scrape.add_argument(
+        "--message",
+        action="store_true",
+        help="print the drops message, built while the pages download",
+    )
+    _add_limit(scrape)
+    scrape.set_defaults(func=_cmd_scrape)
+
+    pipe = sub.add_parser(
+        "pipeline",
+        help="scrape, diff and send as bounded stages, reporting each stage's load",
+    )
+    pipe.add_argument("urls", nargs="+", metavar="URL", help="pages to fetch")
+    pipe.add_argument(
+        "-o", "--output", help="snapshot to write (default: latest_<game>.json)"
+    )
+    _add_game(pipe)
+    _add_limit(pipe)
+    pipe.add_argument(
+        "--state",
+        help="only send changes since the index saved here, and update it "
+        "once every chat got its messages",
+    )
+    pipe.add_argument(
+        "--subscribers",
+        metavar="PATH",
+        help="send each subscriber in this registry only its matches",
+    )
+    pipe.add_argument("--api-url", help="Bot API base URL (default: Telegram)")
+    pipe.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="run every stage but send nothing and leave --state alone",
+    )
+    pipe.add_argument(
+        "--cache",
+        default=".dropnoti/scrape-cache.json",
+        help="validators and cards of each page (default: %(default)s)",
+    )
+    pipe.add_argument("--no-cache", action="store_true")
+    pipe.add_argument("--per-host", type=int, default=4, metavar="N")
+    pipe.add_argument(
+        "--workers",
+        metavar="STAGE=N,...",
+        help="workers per stage, e.g. send=64,render=4 (defaults: scrape "
+        "--per-host, render 2, send 32, the rest 1; diff always 1)",
+    )
+    pipe.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        metavar="N",
+        help="items each stage's input queue holds (default: %(default)s)",
+    )
+    pipe.add_argument(
+        "--progress",
+        type=float,
+        metavar="SECONDS",
+        help="print queue depths every SECONDS while running",
+    )
+    pipe.set_defaults(func=_cmd_pipeline)
+
+    fakesite = sub.add_parser(
+        "fakesite", help="serve a directory of fixture pages with validators"
+    )
+    fakesite.add_argument("directory")
+    fakesite.add_argument("--host", default="127.0.0.1")
+    fakesite.add_argument("--port", type=int, default=8082)
+    fakesite.set_defaults(func=_cmd_fakesite)
+
+    fakegql = sub.add_parser(
+        "fakegql", help="replay recorded GraphQL responses on a local endpoint"
+    )
+    fakegql.add_argument("recordings", help="JSON list of recorded operations")
+    fakegql.add_argument("--host", default="127.0.0.1")
+    fakegql.add_argument("--port", type=int, default=8083)
+    fakegql.add_argument(
+        "--preload",
+        action="store_true",
+        help="know the recorded queries' hashes before they are first sent",
+    )
+    fakegql.set_defaults(func=_cmd_fakegql)
+
+    fakebot = sub.add_parser("fakebot", help="run a local fake Bot API server")
+    fakebot.add_argument("--host", default="127.0.0.1")
+    fakebot.add_argument("--port", type=int, default=8081)
+    fakebot.set_defaults(func=_cmd_fakebot)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = make_parser().parse_args(argv)
+    return args.func(args)
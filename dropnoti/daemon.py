@@ -0,0 +1,374 @@
+"""Long-running poll → diff → send loop (``python -m dropnoti serve``).
+
+Instead of a fresh job twice a day, one process polls the snapshot source on
+an adaptive interval and hands every new snapshot to the notifier through a
+one-slot queue.  A snapshot still waiting there when a newer one arrives is
+replaced by it, since the diff against the saved state covers both, so a
+slow send never delays the next poll.  After a failed send only the latest
+snapshot is retried.  The Telegram client and its connection pool stay open
+between sends, and an unchanged source costs a ``stat`` call or a
+conditional ``304`` request per poll.  With an
+:class:`~dropnoti.outbox.Outbox`, failed pages are retried from the outbox
+on idle polls instead of resending the whole snapshot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Protocol, Sequence
+from urllib.parse import urlsplit
+
+from .files import write_atomic
+from .history import SnapshotHistory
+from .message import DEFAULT_TEMPLATE, Template, build_message
+from .http import ConnectionPool, HTTPError
+from .notify import UNCHANGED, Plan, plan
+from .outbox import Outbox
+from .posts import PostStore, publish
+from .state import save_state
+from .telegram import TelegramClient
+
+log = logging.getLogger(__name__)
+
+MIN_INTERVAL = 10.0
+MAX_INTERVAL = 60.0
+
+
+class Source(Protocol):
+    """Where snapshots come from."""
+
+    name: str
+
+    async def fetch(self) -> bytes | None:
+        """Return the snapshot, or ``None`` if it has not changed."""
+
+    async def close(self) -> None: ...
+
+
+class Interval(Protocol):
+    """Chooses how long to wait before the next poll."""
+
+    def next(self, changed: bool) -> float: ...
+
+    def observe_release(self, ts: float | None = None) -> None: ...
+
+
+class FileSource:
+    """A snapshot file written by some other process."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = os.fspath(path)
+        self.name = self.path
+        self._signature: tuple[int, int] | None = None
+
+    async def fetch(self) -> bytes | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPSource:
+    """A snapshot served over HTTP, fetched with conditional requests."""
+
+    def __init__(self, url: str, timeout: float = 30.0) -> None:
+        parts = urlsplit(url)
+        self.name = url
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.pool = ConnectionPool(
+            f"{parts.scheme}://{parts.netloc}", max_connections=1, timeout=timeout
+        )
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+
+    async def fetch(self) -> bytes | None:
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        response = await self.pool.request("GET", self.path, headers=headers)
+        if response.status == 304:
+            return None
+        if response.status != 200:
+            raise OSError(f"GET {self.name}: HTTP {response.status}")
+        self._etag = response.headers.get("etag")
+        self._last_modified = response.headers.get("last-modified")
+        return response.body
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+class PollInterval:
+    """Poll fast right after a change and back off while nothing changes."""
+
+    def __init__(
+        self,
+        minimum: float = MIN_INTERVAL,
+        maximum: float = MAX_INTERVAL,
+        factor: float = 1.5,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.current = minimum
+
+    def next(self, changed: bool) -> float:
+        if changed:
+            self.current = self.minimum
+        else:
+            self.current = min(self.maximum, self.current * self.factor)
+        return self.current
+
+    def observe_release(self, ts: float | None = None) -> None:
+        pass
+
+
+@dataclass(slots=True)
+class DaemonStats:
+    polls: int = 0
+    poll_errors: int = 0
+    snapshots: int = 0
+    sends: int = 0
+    failed_sends: int = 0
+    last_interval: float = 0.0
+    last_detect_to_send: float | None = None
+
+
+class Daemon:
+    """Poll ``source`` and notify ``chat_ids`` about campaign changes."""
+
+    def __init__(
+        self,
+        source: Source,
+        client: TelegramClient,
+        chat_ids: Sequence[str],
+        snapshot_path: str | os.PathLike[str] = "latest_r6.json",
+        state_path: str | os.PathLike[str] = ".dropnoti/state.json",
+        interval: Interval | None = None,
+        limit: int | None = None,
+        history_dir: str | os.PathLike[str] | None = None,
+        outbox: Outbox | None = None,
+        posts: PostStore | None = None,
+        template: Template = DEFAULT_TEMPLATE,
+    ) -> None:
+        self.source = source
+        self.client = client
+        self.chat_ids = list(chat_ids)
+        self.snapshot_path = os.fspath(snapshot_path)
+        self.state_path = os.fspath(state_path)
+        self.interval = interval or PollInterval()
+        self.limit = limit
+        self.history_dir = history_dir
+        self.outbox = outbox
+        self.posts = posts
+        self.template = template
+        self.stats = DaemonStats()
+        self._queue: asyncio.Queue[tuple[float, bytes]] = asyncio.Queue(maxsize=1)
+        self._retry: tuple[float, bytes] | None = None
+        self._latest = 0.0
+        self._released: str | None = None
+        source_path = getattr(source, "path", None)
+        self._write_snapshot = not (
+            isinstance(source, FileSource)
+            and os.path.abspath(source_path) == os.path.abspath(self.snapshot_path)
+        )
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        """Run until ``stop`` is set."""
+        stop = stop or asyncio.Event()
+        notifier = asyncio.create_task(self._notify_loop())
+        try:
+            await self._poll_loop(stop)
+        finally:
+            notifier.cancel()
+            await asyncio.gather(notifier, return_exceptions=True)
+            await self.source.close()
+
+    async def _poll_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            self.stats.polls += 1
+            try:
+                data = await self.source.fetch()
+            except (OSError, HTTPError, asyncio.TimeoutError) as exc:
+                self.stats.poll_errors += 1
+                log.warning("polling %s failed: %s", self.source.name, exc)
+                data = None
+            if data is not None:
+                self.stats.snapshots += 1
+                # A newer snapshot supersedes any failed one.
+                self._retry = None
+                self._latest = time.monotonic()
+                self._submit((self._latest, data))
+            elif self._retry is not None:
+                item, self._retry = self._retry, None
+                self._submit(item)
+            elif self.outbox is not None and self._queue.empty():
+                await self._flush_outbox()
+            delay = self.stats.last_interval = self.interval.next(
+                changed=data is not None
+            )
+            log.debug("next poll in %.1f s", delay)
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        await self._queue.join()
+
+    def _submit(self, item: tuple[float, bytes]) -> None:
+        """Queue ``item`` for the notifier in place of one still waiting."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self._queue.task_done()
+        self._queue.put_nowait(item)
+
+    def _retry_later(self, detected: float, data: bytes) -> None:
+        """Retry ``data`` on the next idle poll unless a newer snapshot came in."""
+        if detected == self._latest:
+            self._retry = (detected, data)
+
+    async def _notify_loop(self) -> None:
+        while True:
+            detected, data = await self._queue.get()
+            try:
+                await self._process(detected, data)
+            except Exception:
+                log.exception("processing snapshot from %s failed", self.source.name)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, detected: float, data: bytes) -> None:
+        if self._write_snapshot:
+            write_atomic(self.snapshot_path, data)
+        result = plan(
+            self.snapshot_path, self.state_path, self.limit, template=self.template
+        )
+        if self.history_dir is not None and result.skipped != UNCHANGED:
+            try:
+                with SnapshotHistory(self.history_dir) as history:
+                    history.append(json.loads(data))
+            except ValueError as exc:
+                log.warning("not recorded in history: %s", exc)
+        if self.posts is not None:
+            if result.skipped != UNCHANGED:
+                await self._publish(detected, data, result)
+            return
+        if result.message is None:
+            log.info(
+                "snapshot %s: %s, nothing to send", result.digest[:12], result.skipped
+            )
+            return
+        if result.digest != self._released:
+            # Retries of a failed send are the same release.
+            self._released = result.digest
+            self.interval.observe_release()
+        pages = result.message.pages()
+        if self.outbox is not None:
+            await self._send_via_outbox(detected, result, pages)
+            return
+        results = await self.client.send_pages_many(self.chat_ids, pages)
+        failed = [r for r in results if not r.ok]
+        self.stats.last_detect_to_send = time.monotonic() - detected
+        if failed:
+            # Keep the snapshot so the next idle poll retries the delivery.
+            self.stats.failed_sends += 1
+            self._retry_later(detected, data)
+            for r in failed:
+                log.warning(
+                    "chat %s: failed (%s) %s", r.chat_id, r.status, r.description
+                )
+            return
+        self.stats.sends += 1
+        save_state(result.state, self.state_path)
+        log.info(
+            "sent %d change(s) in %d message(s) to %d chat(s) %.1f s after detection",
+            result.message.total,
+            len(pages),
+            len(self.chat_ids),
+            self.stats.last_detect_to_send,
+        )
+
+    async def _send_via_outbox(
+        self, detected: float, result: Plan, pages: list[str]
+    ) -> None:
+        assert self.outbox is not None and result.message is not None
+        self.outbox.enqueue(result.transition, self.chat_ids, pages)
+        # The outbox owns delivery from here on, retries included.
+        save_state(result.state, self.state_path)
+        report = await self.outbox.deliver(self.client, result.transition)
+        self.stats.last_detect_to_send = time.monotonic() - detected
+        if report.pending:
+            self.stats.failed_sends += 1
+            log.warning(
+                "%d message(s) pending in the outbox, retrying later", report.pending
+            )
+            return
+        self.stats.sends += 1
+        log.info(
+            "sent %d change(s) in %d message(s) to %d chat(s) %.1f s after detection",
+            result.message.total,
+            len(pages),
+            len(self.chat_ids),
+            self.stats.last_detect_to_send,
+        )
+
+    async def _publish(self, detected: float, data: bytes, result: Plan) -> None:
+        assert self.posts is not None
+        pages = build_message(
+            self.snapshot_path, limit=self.limit, template=self.template
+        ).pages()
+        results = await publish(self.client, self.posts, self.chat_ids, pages)
+        self.posts.save()
+        self.stats.last_detect_to_send = time.monotonic() - detected
+        failed = [r for r in results if not r.ok]
+        if failed:
+            self.stats.failed_sends += 1
+            self._retry_later(detected, data)
+            for r in failed:
+                log.warning(
+                    "chat %s: failed (%s) %s",
+                    r.chat_id,
+                    r.failed[0].status,
+                    r.failed[0].description,
+                )
+            return
+        self.stats.sends += 1
+        save_state(result.state, self.state_path)
+        log.info(
+            "today's post: %d call(s) for %d chat(s) %.1f s after detection",
+            sum(r.calls for r in results),
+            len(results),
+            self.stats.last_detect_to_send,
+        )
+
+    async def _flush_outbox(self) -> None:
+        assert self.outbox is not None
+        due = self.outbox.next_due()
+        if due is None or due > self.outbox.clock():
+            return
+        before = self.outbox.report()
+        after = await self.outbox.deliver(self.client)
+        log.info(
+            "outbox retry: %d delivered, %d still pending",
+            after.delivered - before.delivered,
+            after.pending,
+        )
+
+
@@ -0,0 +1,73 @@
+"""Drop near-duplicate lines in one pass, keeping first-seen order.
+
+The workflow deduplicated with ``sort -u``, which sorts every line and only
+merges exact copies.  Scraped titles repeat with different case, Unicode
+forms (full-width letters, non-breaking spaces) and dash styles, so lines
+are compared by :func:`normalize_key` instead: NFKC, casefolded, with
+whitespace collapsed and every dash turned into ``-``.  Seen keys live in a
+hash set, so deduplicating ``n`` lines is ``O(n)``.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from typing import Callable, Iterable, Iterator
+
+# Hyphens, dashes and minus signs that NFKC leaves alone.
+_DASHES = "‐‑‒–—―⁃−⸺⸻"
+
+
+def normalize_key(text: str) -> str:
+    """The form two lines must share to count as duplicates."""
+    if not text.isascii():
+        text = _unify_dashes(text)
+        # Most lines are ASCII apart from the " — " separator.
+        if not text.isascii():
+            text = _unify_dashes(unicodedata.normalize("NFKC", text))
+    return " ".join(text.casefold().split())
+
+
+def _unify_dashes(text: str) -> str:
+    # Faster than str.translate for a handful of characters.
+    for dash in _DASHES:
+        if dash in text:
+            text = text.replace(dash, "-")
+    return text
+
+
+class Deduper:
+    """Remember normalized keys and report whether a line is new.
+
+    Exact repeats are recognized by the line itself, so each distinct
+    spelling is normalized once.  Keys are kept whole rather than as hashes,
+    since two distinct lines whose hashes collide must not merge.
+    """
+
+    __slots__ = ("key", "_seen", "_spellings")
+
+    def __init__(self, key: Callable[[str], str] = normalize_key) -> None:
+        self.key = key
+        self._seen: set[str] = set()
+        self._spellings: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def add(self, line: str) -> bool:
+        """Record ``line``; true if no equivalent line was seen before."""
+        if line in self._spellings:
+            return False
+        self._spellings.add(line)
+        key = self.key(line)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+
+def dedupe(
+    lines: Iterable[str], key: Callable[[str], str] = normalize_key
+) -> Iterator[str]:
+    """Yield the first of each group of equivalent ``lines``, lazily."""
+    add = Deduper(key).add
+    return (line for line in lines if add(line))
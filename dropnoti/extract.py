@@ -0,0 +1,238 @@
+"""Extract ``{title, timeframe}`` cards from a drops page.
+
+A :class:`CardExtractor` is built once from three CSS selectors: one for a
+campaign card, and two matched inside it for the title and the timeframe.
+With selectolax_ installed the page is parsed by its C backend (lexbor);
+otherwise :mod:`html.parser` streams over the document, and cards are yielded
+as soon as their element closes, so :meth:`CardExtractor.iter_cards` can
+start on the first chunk of a download.  Both give the same cards for the
+selectors the fallback understands: compound selectors made of a tag name,
+``#id``, ``.class`` and ``[attr]``/``[attr=value]`` parts.
+
+Text is whitespace-collapsed; a missing or empty field is ``None`` and left
+to the builder's ``Untitled``/``Time N/A`` fallbacks.
+
+.. _selectolax: https://github.com/rushter/selectolax
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, Iterable, Iterator
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - depends on the environment
+    LexborHTMLParser = None
+
+HAVE_SELECTOLAX = LexborHTMLParser is not None
+
+CARD_SELECTOR = ".drop-card"
+TITLE_SELECTOR = ".drop-card__title"
+TIMEFRAME_SELECTOR = ".drop-card__timeframe"
+
+Card = dict[str, Any]
+
+# Elements that never have an end tag, so never go on the open-element stack.
+_VOID = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+_SKIP_TEXT = frozenset(("script", "style", "template"))
+_SIMPLE = re.compile(
+    r"""
+    (?P<tag>[a-zA-Z][\w-]*|\*)?
+    (?P<parts>(?:\#[\w-]+|\.[\w-]+|\[[\w-]+(?:=(?:"[^"]*"|'[^']*'|[^\]]*))?\])*)
+    """,
+    re.VERBOSE,
+)
+_PART = re.compile(
+    r"""\#([\w-]+) | \.([\w-]+) | \[([\w-]+)(?:=("[^"]*"|'[^']*'|[^\]]*))?\]""",
+    re.VERBOSE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Selector:
+    """A compound CSS selector, precompiled for matching start tags."""
+
+    text: str
+    tag: str | None
+    classes: frozenset[str]
+    attrs: tuple[tuple[str, str | None], ...]
+
+    @classmethod
+    def compile(cls, text: str) -> "Selector":
+        """Raises :class:`ValueError` for selectors the fallback cannot match."""
+        text = text.strip()
+        match = _SIMPLE.fullmatch(text)
+        if not text or match is None:
+            raise ValueError(f"unsupported selector: {text!r}")
+        tag = match["tag"]
+        classes = set()
+        attrs = []
+        for ident, cls_name, attr, value in _PART.findall(match["parts"]):
+            if ident:
+                attrs.append(("id", ident))
+            elif cls_name:
+                classes.add(cls_name)
+            else:
+                attrs.append((attr.lower(), value.strip("\"'") if value else None))
+        return cls(
+            text,
+            None if tag in (None, "*") else tag.lower(),
+            frozenset(classes),
+            tuple(attrs),
+        )
+
+    def matches(self, tag: str, attrs: dict[str, str | None]) -> bool:
+        if self.tag is not None and tag != self.tag:
+            return False
+        if self.classes and not self.classes.issubset(
+            (attrs.get("class") or "").split()
+        ):
+            return False
+        for name, value in self.attrs:
+            if name not in attrs or (value is not None and attrs[name] != value):
+                return False
+        return True
+
+
+class CardExtractor:
+    """Turn drops pages into cards; usable as a :data:`dropnoti.scrape.Parser`."""
+
+    def __init__(
+        self,
+        card: str = CARD_SELECTOR,
+        title: str = TITLE_SELECTOR,
+        timeframe: str = TIMEFRAME_SELECTOR,
+        use_selectolax: bool | None = None,
+    ) -> None:
+        if use_selectolax is None:
+            use_selectolax = HAVE_SELECTOLAX
+        elif use_selectolax and not HAVE_SELECTOLAX:
+            raise RuntimeError("selectolax is not installed")
+        self.use_selectolax = use_selectolax
+        self.card = Selector.compile(card)
+        self.title = Selector.compile(title)
+        self.timeframe = Selector.compile(timeframe)
+
+    def __call__(self, body: bytes | str) -> list[Card]:
+        return self.extract(body)
+
+    def extract(self, body: bytes | str) -> list[Card]:
+        """Every card of the page ``body``, in document order."""
+        if self.use_selectolax:
+            return self._extract_selectolax(body)
+        return list(self.iter_cards((body,)))
+
+    def iter_cards(self, chunks: Iterable[bytes | str]) -> Iterator[Card]:
+        """Yield cards while feeding the page in ``chunks`` through html.parser."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parser = _CardParser(self.card, self.title, self.timeframe)
+        for chunk in chunks:
+            parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+            yield from parser.drain()
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        yield from parser.drain()
+
+    def _extract_selectolax(self, body: bytes | str) -> list[Card]:
+        assert LexborHTMLParser is not None
+        tree = LexborHTMLParser(body)
+        title, timeframe = self.title.text, self.timeframe.text
+        cards = []
+        for node in tree.css(self.card.text):
+            found = node.css_first(title)
+            text = found.text() if found is not None else ""
+            found = node.css_first(timeframe)
+            frame = found.text() if found is not None else ""
+            cards.append(
+                {
+                    "title": " ".join(text.split()) or None,
+                    "timeframe": " ".join(frame.split()) or None,
+                }
+            )
+        return cards
+
+
+class _CardParser(HTMLParser):
+    """Collect cards from start/end tag events with an open-element stack."""
+
+    def __init__(self, card: Selector, title: Selector, timeframe: Selector) -> None:
+        super().__init__(convert_charrefs=True)
+        self._card = card
+        self._fields = (("title", title), ("timeframe", timeframe))
+        self._stack: list[str] = []
+        self._card_depth: int | None = None
+        self._current: dict[str, list[str]] = {}
+        # Field being captured and the stack depth its element opened at.
+        self._capture: tuple[str, int] | None = None
+        self._skip_depth: int | None = None
+        self._done: list[Card] = []
+
+    def drain(self) -> list[Card]:
+        done, self._done = self._done, []
+        return done
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _VOID:
+            return
+        self._stack.append(tag)
+        depth = len(self._stack)
+        if tag in _SKIP_TEXT and self._skip_depth is None:
+            self._skip_depth = depth
+        attributes = dict(attrs)
+        if self._card_depth is None:
+            if self._card.matches(tag, attributes):
+                self._card_depth = depth
+                self._current = {}
+            return
+        if self._capture is None:
+            for name, selector in self._fields:
+                if name not in self._current and selector.matches(tag, attributes):
+                    self._current[name] = []
+                    self._capture = name, depth
+                    break
+
+    def handle_startendtag(
+        self, tag: str, attrs: list[tuple[str, str | None]]
+    ) -> None:
+        if tag not in _VOID:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in self._stack:
+            return
+        # Pop up to the matching element, closing anything left open inside.
+        while self._stack:
+            depth = len(self._stack)
+            if self._skip_depth == depth:
+                self._skip_depth = None
+            if self._capture is not None and self._capture[1] == depth:
+                self._capture = None
+            if self._card_depth == depth:
+                self._finish_card()
+            if self._stack.pop() == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if self._capture is not None and self._skip_depth is None:
+            self._current[self._capture[0]].append(data)
+
+    def close(self) -> None:
+        super().close()
+        if self._card_depth is not None:
+            self._finish_card()
+
+    def _finish_card(self) -> None:
+        card: Card = {}
+        for name, _ in self._fields:
+            text = " ".join("".join(self._current.get(name, ())).split())
+            card[name] = text or None
+        self._done.append(card)
+        self._card_depth = None
+        self._capture = None
@@ -0,0 +1,239 @@
+"""A local stand-in for the Telegram Bot API.
+
+:class:`FakeBotServer` speaks just enough HTTP/1.1 (with keep-alive) to
+exercise :class:`~dropnoti.telegram.TelegramClient` without a network.  It
+records every call and lets a ``handler`` override the canned responses,
+e.g. to inject errors.  With ``per_chat_interval`` set it also enforces a
+per-chat flood limit and answers ``429`` with ``retry_after`` like Telegram.
+Sent messages are kept in :attr:`FakeBotServer.messages`, so
+``editMessageText`` and ``deleteMessage`` behave like the real API,
+including the ``message is not modified`` error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qsl
+
+Reply = tuple[int, dict[str, Any]]
+Handler = Callable[["FakeCall"], "Awaitable[Reply | None] | Reply | None"]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests"}
+
+
+@dataclass(frozen=True, slots=True)
+class FakeCall:
+    token: str
+    method: str
+    params: dict[str, Any]
+    received: float
+
+
+class FakeBotServer:
+    """Serve ``/bot<token>/<method>`` on ``host:port`` (``0`` picks a port)."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        handler: Handler | None = None,
+        delay: float = 0.0,
+        per_chat_interval: float = 0.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.handler = handler
+        self.delay = delay
+        self.per_chat_interval = per_chat_interval
+        self.rejected = 0
+        self._last_sent: dict[str, float] = {}
+        self.calls: list[FakeCall] = []
+        self.connections = 0
+        self._next_message_id = 1
+        self.messages: dict[tuple[str, int], str] = {}
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self) -> "FakeBotServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    def sent(self, method: str = "sendMessage") -> list[FakeCall]:
+        return [call for call in self.calls if call.method == method]
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                path = request_line.decode("latin-1").split()[1]
+                status, payload = await self._dispatch(path, headers, body)
+                data = json.dumps(payload).encode("utf-8")
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(
+        self, path: str, headers: dict[str, str], body: bytes
+    ) -> Reply:
+        _, _, rest = path.partition("/bot")
+        token, _, method = rest.partition("/")
+        if not token or not method:
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        if headers.get("content-type", "").startswith("application/json"):
+            params = json.loads(body or b"{}")
+        else:
+            params = dict(parse_qsl(body.decode("utf-8")))
+        call = FakeCall(token, method, params, time.monotonic())
+        self.calls.append(call)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.handler is not None:
+            reply = self.handler(call)
+            if asyncio.iscoroutine(reply):
+                reply = await reply
+            if reply is not None:
+                return reply
+        return self._default_reply(call)
+
+    def _check_flood(self, call: FakeCall) -> Reply | None:
+        if not self.per_chat_interval:
+            return None
+        chat_id = str(call.params.get("chat_id"))
+        last = self._last_sent.get(chat_id)
+        if last is not None and call.received - last < self.per_chat_interval:
+            self.rejected += 1
+            wait = self.per_chat_interval - (call.received - last)
+            retry_after = max(1, math.ceil(wait))
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            }
+        self._last_sent[chat_id] = call.received
+        return None
+
+    def _default_reply(self, call: FakeCall) -> Reply:
+        if call.method == "getMe":
+            return 200, {
+                "ok": True,
+                "result": {"id": 1, "is_bot": True, "username": "fake_bot"},
+            }
+        if call.method == "sendMessage":
+            flood = self._check_flood(call)
+            if flood is not None:
+                return flood
+            if "chat_id" not in call.params or not call.params.get("text"):
+                return _bad_request("message text is empty")
+            message_id = self._next_message_id
+            self._next_message_id += 1
+            chat_id = str(call.params["chat_id"])
+            self.messages[chat_id, message_id] = call.params["text"]
+            return 200, _message(chat_id, message_id, call.params["text"])
+        if call.method == "editMessageText":
+            return self._edit(call)
+        if call.method == "deleteMessage":
+            key = _message_key(call)
+            if key not in self.messages:
+                return _bad_request("message to delete not found")
+            del self.messages[key]
+            return 200, {"ok": True, "result": True}
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+
+    def _edit(self, call: FakeCall) -> Reply:
+        key = _message_key(call)
+        text = call.params.get("text")
+        if not text:
+            return _bad_request("message text is empty")
+        if key not in self.messages:
+            return _bad_request("message to edit not found")
+        if self.messages[key] == text:
+            return _bad_request(
+                "message is not modified: specified new message content and reply "
+                "markup are exactly the same as a current content and reply markup "
+                "of the message"
+            )
+        self.messages[key] = text
+        return 200, _message(key[0], key[1], text)
+
+
+def _message_key(call: FakeCall) -> tuple[str, int]:
+    try:
+        message_id = int(call.params.get("message_id"))  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        message_id = 0
+    return str(call.params.get("chat_id")), message_id
+
+
+def _message(chat_id: str, message_id: int, text: str) -> dict[str, Any]:
+    return {
+        "ok": True,
+        "result": {
+            "message_id": message_id,
+            "chat": {"id": chat_id},
+            "date": int(time.time()),
+            "text": text,
+        },
+    }
+
+
+def _bad_request(description: str) -> Reply:
+    return 400, {
+        "ok": False,
+        "error_code": 400,
+        "description": f"Bad Request: {description}",
+    }
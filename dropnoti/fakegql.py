@@ -0,0 +1,176 @@
+"""A local GraphQL endpoint that replays recorded responses.
+
+:class:`StubGraphQLServer` answers ``POST`` requests holding one operation
+or a batch of them from a list of recordings, matched on operation name and
+variables::
+
+    [{"operationName": "DropCampaignDetails", "variables": {"id": "1"},
+      "query": "query DropCampaignDetails...", "response": {"data": {...}}}]
+
+Persisted queries work like on a real server: a request carrying only
+``sha256Hash`` gets ``PersistedQueryNotFound`` until the full query has been
+sent once (or was preloaded from the recordings).  Every request is counted
+with its size and batch size, for tests and benchmarks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Iterable, Mapping
+
+from .graphql import PERSISTED_QUERY_NOT_FOUND
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+
+def load_recordings(path: str | os.PathLike[str]) -> list[dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        recordings = json.load(fh)
+    if not isinstance(recordings, list):
+        raise ValueError(f"{os.fspath(path)}: expected a list of recordings")
+    return recordings
+
+
+def _variables_key(variables: Any) -> str:
+    return json.dumps(variables or {}, sort_keys=True)
+
+
+class StubGraphQLServer:
+    """Replay ``recordings`` at ``path`` on ``host:port`` (``0`` picks a port)."""
+
+    def __init__(
+        self,
+        recordings: Iterable[Mapping[str, Any]],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: str = "/gql",
+        delay: float = 0.0,
+        preload: bool = False,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.path = path
+        self.delay = delay
+        self.responses: dict[tuple[str, str], Any] = {}
+        self.queries: dict[str, str] = {}
+        for recording in recordings:
+            key = recording["operationName"], _variables_key(recording.get("variables"))
+            self.responses[key] = recording["response"]
+            if preload and recording.get("query"):
+                query = recording["query"]
+                self.queries[hashlib.sha256(query.encode("utf-8")).hexdigest()] = query
+        self.requests = 0
+        self.operations = 0
+        self.bytes_received = 0
+        self.batch_sizes: list[int] = []
+        self.connections = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}{self.path}"
+
+    async def __aenter__(self) -> "StubGraphQLServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path = request_line.decode("latin-1").split()[:2]
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                status, payload = self._dispatch(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _dispatch(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        if method != "POST" or path.split("?", 1)[0] != self.path:
+            return 404, {"errors": [{"message": "Not Found"}]}
+        self.requests += 1
+        self.bytes_received += len(body)
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return 400, {"errors": [{"message": "body is not JSON"}]}
+        if isinstance(request, list):
+            self.batch_sizes.append(len(request))
+            self.operations += len(request)
+            return 200, [self._execute(operation) for operation in request]
+        self.batch_sizes.append(1)
+        self.operations += 1
+        return 200, self._execute(request)
+
+    def _execute(self, operation: Any) -> Any:
+        if not isinstance(operation, dict):
+            return _error("operation is not an object")
+        persisted = (operation.get("extensions") or {}).get("persistedQuery") or {}
+        sha = persisted.get("sha256Hash")
+        query = operation.get("query")
+        if query:
+            digest = hashlib.sha256(query.encode("utf-8")).hexdigest()
+            if sha and sha != digest:
+                return _error("provided sha does not match query")
+            self.queries[digest] = query
+        elif sha not in self.queries:
+            return _error(PERSISTED_QUERY_NOT_FOUND)
+        key = operation.get("operationName"), _variables_key(operation.get("variables"))
+        if key not in self.responses:
+            return _error(f"no recording for {key[0]} {key[1]}")
+        return self.responses[key]
+
+
+def _error(message: str) -> dict[str, Any]:
+    return {"data": None, "errors": [{"message": message}]}
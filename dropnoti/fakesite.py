@@ -0,0 +1,188 @@
+"""A local stand-in for the sites drops are scraped from.
+
+:class:`FixtureServer` serves fixed pages over HTTP/1.1 with keep-alive,
+each with an ``ETag`` and ``Last-Modified``, and answers conditional
+requests with ``304`` like a real site, so :class:`~dropnoti.scrape.Scraper`
+can be exercised without a network.  Every request is recorded, and
+:attr:`FixtureServer.max_in_flight` shows how many it handled at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping
+
+_REASONS = {200: "OK", 304: "Not Modified", 404: "Not Found"}
+
+
+@dataclass(frozen=True, slots=True)
+class FixturePage:
+    body: bytes
+    content_type: str
+    etag: str
+    last_modified: float
+
+
+@dataclass(frozen=True, slots=True)
+class FixtureRequest:
+    path: str
+    headers: dict[str, str]
+    status: int
+    received: float
+
+
+class FixtureServer:
+    """Serve ``pages`` (path → body) on ``host:port`` (``0`` picks a port)."""
+
+    def __init__(
+        self,
+        pages: Mapping[str, bytes] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay: float = 0.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.pages: dict[str, FixturePage] = {}
+        self.requests: list[FixtureRequest] = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server: asyncio.base_events.Server | None = None
+        for path, body in (pages or {}).items():
+            self.set_page(path, body)
+
+    @classmethod
+    def from_directory(cls, directory: str, **kwargs: object) -> "FixtureServer":
+        """Serve every file under ``directory`` at its relative path."""
+        pages = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                url = "/" + os.path.relpath(path, directory).replace(os.sep, "/")
+                with open(path, "rb") as fh:
+                    pages[url] = fh.read()
+        return cls(pages, **kwargs)  # type: ignore[arg-type]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def set_page(
+        self, path: str, body: bytes, content_type: str | None = None
+    ) -> None:
+        """Serve ``body`` at ``path`` with fresh validators."""
+        if content_type is None:
+            content_type = mimetypes.guess_type(path)[0] or "text/html"
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        self.pages[path] = FixturePage(body, content_type, etag, time.time())
+
+    def served(self, status: int = 200) -> list[FixtureRequest]:
+        return [request for request in self.requests if request.status == status]
+
+    async def __aenter__(self) -> "FixtureServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path = request_line.decode("latin-1").split()[:2]
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    status, head, body = self._respond(path, headers)
+                finally:
+                    self.in_flight -= 1
+                self.requests.append(
+                    FixtureRequest(path, headers, status, time.monotonic())
+                )
+                close = headers.get("connection", "").lower() == "close"
+                head["Content-Length"] = str(len(body))
+                head["Connection"] = "close" if close else "keep-alive"
+                lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}"]
+                lines.extend(f"{k}: {v}" for k, v in head.items())
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(
+        self, path: str, headers: dict[str, str]
+    ) -> tuple[int, dict[str, str], bytes]:
+        page = self.pages.get(path)
+        if page is None:
+            return 404, {"Content-Type": "text/plain"}, b"not found"
+        head = {
+            "ETag": page.etag,
+            "Last-Modified": formatdate(page.last_modified, usegmt=True),
+        }
+        if _not_modified(page, headers):
+            return 304, head, b""
+        head["Content-Type"] = page.content_type
+        return 200, head, page.body
+
+
+def _not_modified(page: FixturePage, headers: Mapping[str, str]) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    if "if-none-match" in headers:
+        tags = [tag.strip() for tag in headers["if-none-match"].split(",")]
+        return "*" in tags or page.etag in tags
+    since = headers.get("if-modified-since")
+    if since:
+        try:
+            return int(page.last_modified) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
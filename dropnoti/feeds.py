@@ -0,0 +1,199 @@
+"""Registry of game feeds, and preparing every feed of a run in parallel.
+
+Each game has its own ``latest_<game>.json`` snapshot, state file, history
+and message :class:`~dropnoti.message.Template`, listed in ``feeds.json``::
+
+    {"version": 1, "feeds": [
+        {"game": "apex", "name": "Apex Legends", "short": "Apex"}
+    ]}
+
+Only ``game`` is required; paths default to ``latest_<game>.json`` and
+``.dropnoti/<game>/``.  Without a registry file the original Rainbow Six
+feed is the only one.
+
+:func:`prepare_all` reads, diffs and renders every feed on a process pool,
+because parsing is pure Python and holds the GIL.  Sending is left to the
+caller so every feed shares one Bot API client and its rate limits.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
+
+from .fingerprint import content_hash
+from .history import HISTORY_DIR, SnapshotHistory
+from .message import PREVIEW_LIMIT, Template, build_message
+from .notify import plan
+from .state import STATE_PATH, State
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+log = logging.getLogger(__name__)
+
+FEEDS_PATH = "feeds.json"
+FEEDS_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class Feed:
+    game: str
+    template: Template
+    snapshot: str
+    state: str
+    history: str
+
+    @classmethod
+    def from_json(cls, item: Mapping[str, Any]) -> "Feed":
+        game = item.get("game")
+        if not isinstance(game, str) or not game:
+            raise ValueError(f"feed without a game: {item!r}")
+        name = item.get("name") or game.upper()
+        template = Template(
+            name=name,
+            short=item.get("short") or name,
+            **{k: item[k] for k in ("title", "empty", "as_of") if k in item},
+        )
+        return cls(
+            game,
+            template,
+            item.get("snapshot") or f"latest_{game}.json",
+            item.get("state") or os.path.join(".dropnoti", game, "state.json"),
+            item.get("history") or os.path.join(".dropnoti", game, "history"),
+        )
+
+
+DEFAULT_FEEDS = (
+    Feed.from_json(
+        {
+            "game": "r6",
+            "name": "Rainbow Six",
+            "short": "R6",
+            "snapshot": "latest_r6.json",
+            "state": STATE_PATH,
+            "history": HISTORY_DIR,
+        }
+    ),
+)
+
+
+def load_feeds(path: str | os.PathLike[str] = FEEDS_PATH) -> list[Feed]:
+    """The feeds registered at ``path``, or :data:`DEFAULT_FEEDS` without one.
+
+    Raises :class:`ValueError` for a file this version cannot use.
+    """
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return list(DEFAULT_FEEDS)
+    if not isinstance(data, dict) or data.get("version") != FEEDS_VERSION:
+        raise ValueError(f"{os.fspath(path)}: not a version {FEEDS_VERSION} registry")
+    feeds = [Feed.from_json(item) for item in data.get("feeds", ())]
+    games = [feed.game for feed in feeds]
+    duplicates = sorted({game for game in games if games.count(game) > 1})
+    if duplicates:
+        raise ValueError(f"{os.fspath(path)}: duplicate games {', '.join(duplicates)}")
+    return feeds
+
+
+def find_feed(game: str, path: str | os.PathLike[str] = FEEDS_PATH) -> Feed:
+    """The registered feed of ``game``, or one with default paths and wording."""
+    for feed in load_feeds(path):
+        if feed.game == game:
+            return feed
+    return Feed.from_json({"game": game})
+
+
+@dataclass(slots=True)
+class FeedPlan:
+    """What one feed needs sent, and how long preparing it took.
+
+    ``pages`` is empty when there is nothing to send; ``skipped`` then says
+    why, or ``error`` says what went wrong.  ``state`` is what to save once
+    the pages were delivered.
+    """
+
+    feed: Feed
+    pages: list[str] = field(default_factory=list)
+    digest: str = ""
+    state: State | None = None
+    skipped: str | None = None
+    error: str | None = None
+    seconds: float = 0.0
+
+
+def prepare(
+    feed: Feed,
+    limit: int | None = PREVIEW_LIMIT,
+    use_state: bool = True,
+    record_history: bool = False,
+    dry_run: bool = False,
+) -> FeedPlan:
+    """Record, diff and render one feed's snapshot.
+
+    With ``dry_run`` nothing is written: no history, and no state even when
+    nothing changed.  A snapshot the history refuses (an older or malformed
+    ``scraped_at``) is logged and still planned.
+    """
+    start = time.perf_counter()
+    if record_history and not dry_run and os.path.exists(feed.snapshot):
+        with open(feed.snapshot, "rb") as fh:
+            snapshot = json.load(fh)
+        try:
+            with SnapshotHistory(feed.history) as history:
+                history.append(snapshot)
+        except ValueError as exc:
+            log.warning("%s: not recorded in history: %s", feed.game, exc)
+    if use_state:
+        result = plan(
+            feed.snapshot, feed.state, limit, template=feed.template, dry_run=dry_run
+        )
+        pages = result.message.pages() if result.message is not None else []
+        found = FeedPlan(
+            feed, pages, result.transition, result.state, result.skipped
+        )
+    else:
+        message = build_message(feed.snapshot, limit, template=feed.template)
+        found = FeedPlan(feed, message.pages(), content_hash(feed.snapshot))
+    found.seconds = time.perf_counter() - start
+    return found
+
+
+def prepare_all(
+    feeds: Sequence[Feed],
+    workers: int | None = None,
+    processes: bool = True,
+    **options: Any,
+) -> list[FeedPlan]:
+    """:func:`prepare` every feed on a pool, in ``feeds`` order.
+
+    A feed that fails comes back with ``error`` set instead of stopping the
+    others.  A single feed, or ``workers=1``, runs in this process.
+    """
+    workers = workers or min(len(feeds), os.cpu_count() or 1)
+    if workers <= 1 or len(feeds) <= 1:
+        return [_prepare_safely(feed, options) for feed in feeds]
+    # Imported here so single-feed commands do not load multiprocessing.
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    pool: Executor
+    if processes:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    with pool:
+        futures = [pool.submit(_prepare_safely, feed, options) for feed in feeds]
+        return [future.result() for future in futures]
+
+
+def _prepare_safely(feed: Feed, options: Mapping[str, Any]) -> FeedPlan:
+    try:
+        return prepare(feed, **options)
+    except Exception as exc:
+        return FeedPlan(feed, error=f"{type(exc).__name__}: {exc}")
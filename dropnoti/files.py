@@ -0,0 +1,34 @@
+"""Atomic replacement of the files dropnoti keeps on disk.
+
+Every writer goes through :func:`write_atomic`: the data is written to a
+temporary file in the target's directory and renamed over the target, so a
+reader, or the next run after a crash, sees either the old file or the new
+one and never a partial write.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def write_atomic(path: str | os.PathLike[str], data: bytes) -> None:
+    """Replace ``path`` with ``data``, creating its directory if needed."""
+    directory = os.path.dirname(os.fspath(path)) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_json(path: str | os.PathLike[str], data: Any) -> None:
+    """Atomically replace ``path`` with ``data`` as compact UTF-8 JSON."""
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    write_atomic(path, text.encode("utf-8"))
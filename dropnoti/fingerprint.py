@@ -0,0 +1,52 @@
+"""Canonical content hash of a snapshot, ignoring volatile fields.
+
+Two scrapes that found the same cards hash the same even though their
+``scraped_at`` differs, which lets a run that has nothing new stop before
+building or sending anything.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Collection
+
+from .stream import iter_events
+
+VOLATILE_KEYS = frozenset({"scraped_at"})
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def content_hash(
+    path: str | os.PathLike[str],
+    volatile: Collection[str] = VOLATILE_KEYS,
+) -> str:
+    """Return a hex SHA-256 over every non-volatile member of ``path``.
+
+    Top-level members are hashed independently and combined in key order, so
+    the result does not depend on how the scraper ordered them.  The cards
+    are streamed into their own digest.  A missing file hashes like ``{}``.
+    """
+    members: dict[str, Any] = {}
+    cards = hashlib.sha256(b"[")
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for key, value in iter_events(fh):
+                if key == "cards.item":
+                    cards.update(_canonical(value) + b",")
+                elif key == "cards.end":
+                    members["cards"] = cards
+                elif key not in volatile:
+                    members[key] = hashlib.sha256(_canonical(value))
+    except FileNotFoundError:
+        pass
+    combined = hashlib.sha256()
+    for key in sorted(members):
+        combined.update(_canonical(key) + b":" + members[key].digest())
+    return combined.hexdigest()
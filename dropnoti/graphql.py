@@ -0,0 +1,281 @@
+"""Batched GraphQL client for drop campaign endpoints.
+
+:class:`GraphQLClient` collects the operations issued within a short window
+(``window`` seconds, or until ``max_batch`` are waiting) and posts them as
+one JSON array, so fetching a hundred campaigns costs a handful of requests
+instead of a hundred.  Queries are sent as persisted-query hashes
+(``extensions.persistedQuery.sha256Hash``); only when the server answers
+``PersistedQueryNotFound`` is the full text sent, once, for it to cache.
+While a batch is registering a query, other batches using it wait for it
+rather than all missing at once.  Identical operations already in flight
+share one result instead of being sent again.
+
+:func:`fetch_campaign_cards` turns campaign ids into ``{title, timeframe}``
+cards with one ``DropCampaignDetails`` operation per id.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping
+from urllib.parse import urlsplit
+
+from .http import ConnectionPool, HTTPError
+
+DEFAULT_MAX_BATCH = 50
+DEFAULT_WINDOW = 0.005
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+
+CAMPAIGN_QUERY = """\
+query DropCampaignDetails($id: ID!) {
+  dropCampaign(id: $id) {
+    id
+    name
+    game { displayName }
+    startAt
+    endAt
+  }
+}
+"""
+
+
+class GraphQLError(Exception):
+    """The server answered an operation with errors and no data."""
+
+    def __init__(self, errors: list[Any]) -> None:
+        messages = [
+            error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            for error in errors
+        ]
+        super().__init__("; ".join(messages) or "unknown GraphQL error")
+        self.errors = errors
+
+
+@dataclass(frozen=True, slots=True)
+class Operation:
+    name: str
+    query: str
+    variables: Mapping[str, Any] = field(default_factory=dict)
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.query.encode("utf-8")).hexdigest()
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """Identifies operations that must get the same answer."""
+        return self.sha256, json.dumps(self.variables, sort_keys=True)
+
+    def payload(self, include_query: bool) -> dict[str, Any]:
+        body: dict[str, Any] = {
+            "operationName": self.name,
+            "variables": dict(self.variables),
+            "extensions": {
+                "persistedQuery": {"version": 1, "sha256Hash": self.sha256}
+            },
+        }
+        if include_query:
+            body["query"] = self.query
+        return body
+
+
+def campaign_operation(campaign_id: str) -> Operation:
+    return Operation("DropCampaignDetails", CAMPAIGN_QUERY, {"id": campaign_id})
+
+
+class GraphQLClient:
+    """Post operations to ``url`` in batches over a keep-alive pool."""
+
+    def __init__(
+        self,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        window: float = DEFAULT_WINDOW,
+        persisted: bool = True,
+        max_connections: int = 4,
+        timeout: float = 30.0,
+    ) -> None:
+        parts = urlsplit(url)
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.pool = ConnectionPool(
+            f"{parts.scheme}://{parts.netloc}",
+            max_connections=max_connections,
+            timeout=timeout,
+        )
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.max_batch = max_batch
+        self.window = window
+        self.persisted = persisted
+        self.requests = 0
+        self.operations = 0
+        self.deduplicated = 0
+        self.bytes_sent = 0
+        self._pending: list[tuple[Operation, asyncio.Future[Any]]] = []
+        self._in_flight: dict[tuple[str, str], asyncio.Future[Any]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        # Query hashes the server is known to have, and batches probing others.
+        self._confirmed: set[str] = set()
+        self._probes: dict[str, asyncio.Future[None]] = {}
+
+    async def __aenter__(self) -> "GraphQLClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.pool.close()
+
+    async def execute(self, operation: Operation) -> Any:
+        """The ``data`` of ``operation``, sent with whatever else is waiting.
+
+        Raises :class:`GraphQLError` when the server returned only errors.
+        """
+        key = operation.key
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(future)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[key] = future
+        self._pending.append((operation, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    async def execute_many(self, operations: Iterable[Operation]) -> list[Any]:
+        return list(await asyncio.gather(*(self.execute(op) for op in operations)))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[Operation, asyncio.Future[Any]]]) -> None:
+        operations = [operation for operation, _ in batch]
+        unknown = {operation.sha256 for operation in operations} - self._confirmed
+        waits = [self._probes[sha] for sha in unknown if sha in self._probes]
+        probing = [sha for sha in unknown if sha not in self._probes]
+        loop = asyncio.get_running_loop()
+        for sha in probing:
+            self._probes[sha] = loop.create_future()
+        try:
+            if waits and self.persisted:
+                await asyncio.wait(waits)
+            results = await self._post(operations, not self.persisted)
+            missing = [
+                i for i, result in enumerate(results) if _persisted_miss(result)
+            ]
+            if missing:
+                retried = await self._post([operations[i] for i in missing], True)
+                for i, result in zip(missing, retried):
+                    results[i] = result
+            self._confirmed.update(operation.sha256 for operation in operations)
+        except Exception as exc:
+            for operation, future in batch:
+                self._settle(operation, future, exception=exc)
+            return
+        finally:
+            for sha in probing:
+                self._probes.pop(sha).set_result(None)
+        for (operation, future), result in zip(batch, results):
+            if not isinstance(result, dict):
+                error: Exception = GraphQLError([f"malformed result: {result!r}"])
+                self._settle(operation, future, exception=error)
+            elif result.get("data") is None and result.get("errors"):
+                self._settle(
+                    operation, future, exception=GraphQLError(result["errors"])
+                )
+            else:
+                self._settle(operation, future, result.get("data"))
+
+    def _settle(
+        self,
+        operation: Operation,
+        future: asyncio.Future[Any],
+        result: Any = None,
+        exception: Exception | None = None,
+    ) -> None:
+        self._in_flight.pop(operation.key, None)
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+            # Callers awaiting it retrieve it; don't warn if all of them left.
+            future.exception()
+        else:
+            future.set_result(result)
+
+    async def _post(
+        self, operations: list[Operation], include_query: bool
+    ) -> list[Any]:
+        body = json.dumps(
+            [operation.payload(include_query) for operation in operations],
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self.requests += 1
+        self.operations += len(operations)
+        self.bytes_sent += len(body)
+        response = await self.pool.request(
+            "POST", self.path, body=body, headers=self.headers
+        )
+        if response.status != 200:
+            raise HTTPError(f"POST {self.path}: HTTP {response.status}")
+        results = response.json()
+        if isinstance(results, dict):
+            results = [results]
+        if not isinstance(results, list) or len(results) != len(operations):
+            raise HTTPError(
+                f"expected {len(operations)} results, got {len(results)}"
+                if isinstance(results, list)
+                else "expected a JSON array of results"
+            )
+        return results
+
+
+def _persisted_miss(result: Any) -> bool:
+    if not isinstance(result, dict):
+        return False
+    return any(
+        isinstance(error, dict)
+        and PERSISTED_QUERY_NOT_FOUND in str(error.get("message", ""))
+        for error in result.get("errors") or ()
+    )
+
+
+def campaign_card(data: Mapping[str, Any] | None) -> dict[str, Any] | None:
+    """The card of a ``DropCampaignDetails`` result, or ``None`` if unknown."""
+    campaign = (data or {}).get("dropCampaign")
+    if not campaign:
+        return None
+    start, end = campaign.get("startAt"), campaign.get("endAt")
+    timeframe = f"{start} - {end}" if start and end else end and f"Ends {end}"
+    return {"title": campaign.get("name"), "timeframe": timeframe or None}
+
+
+async def fetch_campaign_cards(
+    client: GraphQLClient, campaign_ids: Iterable[str]
+) -> list[dict[str, Any]]:
+    """Cards for ``campaign_ids`` in order, skipping unknown campaigns."""
+    results = await client.execute_many(
+        campaign_operation(campaign_id) for campaign_id in campaign_ids
+    )
+    cards = (campaign_card(data) for data in results)
+    return [card for card in cards if card is not None]
@@ -0,0 +1,249 @@
+"""Append-only history of scraped snapshots.
+
+Every scrape is appended as one line of compact canonical JSON to
+``snapshots.ndjson``; nothing is ever rewritten.  Next to it,
+``snapshots.idx`` holds one fixed-size record per snapshot::
+
+    <d  scraped_at as a UTC epoch
+    <Q  byte offset of the line in the log
+    <Q  length of the line, without its newline
+
+Timestamps never decrease, so :meth:`SnapshotHistory.at` finds a snapshot by
+binary search over the index and decodes only that one line.  Both files are
+read through ``mmap``, so large histories are paged in on demand rather than
+read up front.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, Iterator, Mapping, NamedTuple, Sequence
+
+from .canonical import canonicalize
+from .message import NO_TIMEFRAME, UNTITLED, card_field
+
+HISTORY_DIR = ".dropnoti/history"
+LOG_NAME = "snapshots.ndjson"
+INDEX_NAME = "snapshots.idx"
+
+_RECORD = struct.Struct("<dQQ")
+
+
+class IndexEntry(NamedTuple):
+    timestamp: float
+    offset: int
+    length: int
+
+
+def to_epoch(value: float | datetime | str | None) -> float:
+    """Convert an epoch, ``datetime`` or ISO 8601 string to a UTC epoch."""
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class _Timestamps(Sequence[float]):
+    """Lazy view of the index timestamps, for :func:`bisect.bisect_right`."""
+
+    def __init__(self, index: "SnapshotHistory") -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, i: int) -> float:  # type: ignore[override]
+        return self._index.entry(i).timestamp
+
+
+class SnapshotHistory:
+    """Read and append snapshots under ``directory``."""
+
+    def __init__(self, directory: str | os.PathLike[str] = HISTORY_DIR) -> None:
+        self.directory = os.fspath(directory)
+        self.log_path = os.path.join(self.directory, LOG_NAME)
+        self.index_path = os.path.join(self.directory, INDEX_NAME)
+        self._log_map: mmap.mmap | None = None
+        self._index_map: mmap.mmap | None = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+
+    def __enter__(self) -> "SnapshotHistory":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for m in (self._log_map, self._index_map):
+            if m is not None:
+                m.close()
+        self._log_map = self._index_map = None
+
+    def __len__(self) -> int:
+        return _size(self.index_path) // _RECORD.size
+
+    # Writing
+
+    def append(self, snapshot: Mapping[str, Any]) -> IndexEntry:
+        """Append ``snapshot`` and return its index entry.
+
+        Appending the newest snapshot again is a no-op, so re-running on an
+        unchanged ``latest_r6.json`` does not duplicate it.  Raises
+        :class:`ValueError` if ``scraped_at`` is older than the newest
+        snapshot already stored.
+        """
+        timestamp = to_epoch(snapshot.get("scraped_at"))
+        line = json.dumps(
+            canonicalize(snapshot),
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        n = len(self)
+        if n:
+            last = self.entry(n - 1)
+            if timestamp < last.timestamp:
+                raise ValueError(
+                    "snapshot is older than the newest one in the history"
+                )
+            if timestamp == last.timestamp and self.raw(n - 1) == line:
+                return last
+        self.close()
+        with open(self.log_path, "ab") as log:
+            offset = log.tell()
+            log.write(line + b"\n")
+            log.flush()
+            os.fsync(log.fileno())
+        entry = IndexEntry(timestamp, offset, len(line))
+        with open(self.index_path, "ab") as index:
+            index.write(_RECORD.pack(*entry))
+        return entry
+
+    def _recover(self) -> None:
+        """Repair the files after a crash between the log and index writes."""
+        index_size = _size(self.index_path)
+        if index_size % _RECORD.size:
+            with open(self.index_path, "r+b") as index:
+                index.truncate(index_size - index_size % _RECORD.size)
+        n = len(self)
+        end = 0
+        if n:
+            last = self.entry(n - 1)
+            end = last.offset + last.length + 1
+        log_size = _size(self.log_path)
+        if log_size <= end:
+            return
+        self.close()
+        with open(self.log_path, "r+b") as log, open(self.index_path, "ab") as index:
+            log.seek(end)
+            offset = end
+            for raw in log:
+                if not raw.endswith(b"\n"):
+                    break
+                line = raw[:-1]
+                snapshot = json.loads(line)
+                timestamp = to_epoch(snapshot.get("scraped_at"))
+                index.write(_RECORD.pack(timestamp, offset, len(line)))
+                offset += len(raw)
+            log.truncate(offset)
+
+    # Reading
+
+    def _maps(
+        self, index_end: int = 0, log_end: int = 0
+    ) -> tuple[mmap.mmap, mmap.mmap]:
+        """Map both files, remapping if they grew past what is mapped."""
+        if (
+            self._index_map is None
+            or self._log_map is None
+            or len(self._index_map) < index_end
+            or len(self._log_map) < log_end
+        ):
+            self.close()
+            self._index_map = _map(self.index_path)
+            self._log_map = _map(self.log_path)
+        return self._index_map, self._log_map
+
+    def entry(self, i: int) -> IndexEntry:
+        if i < 0:
+            i += len(self)
+        end = (i + 1) * _RECORD.size
+        index, _ = self._maps(index_end=end)
+        if i < 0 or len(index) < end:
+            raise IndexError(i)
+        return IndexEntry(*_RECORD.unpack_from(index, i * _RECORD.size))
+
+    def entries(self) -> Iterator[IndexEntry]:
+        for i in range(len(self)):
+            yield self.entry(i)
+
+    def raw(self, i: int) -> bytes:
+        """The stored line of snapshot ``i`` (without decoding it)."""
+        entry = self.entry(i)
+        end = entry.offset + entry.length
+        _, log = self._maps(log_end=end)
+        return log[entry.offset : end]
+
+    def load(self, i: int) -> dict[str, Any]:
+        return json.loads(self.raw(i))
+
+    def find(self, when: float | datetime | str) -> int | None:
+        """Position of the newest snapshot taken at or before ``when``."""
+        i = bisect_right(_Timestamps(self), to_epoch(when))
+        return i - 1 if i else None
+
+    def at(self, when: float | datetime | str) -> dict[str, Any] | None:
+        """The newest snapshot taken at or before ``when``, if any."""
+        i = self.find(when)
+        return None if i is None else self.load(i)
+
+    def first_seen(self, title: str, timeframe: str | None = None) -> float | None:
+        """When a campaign with ``title`` (and ``timeframe``) first appeared.
+
+        Snapshots are scanned oldest first; a cheap byte search skips every
+        line that cannot contain the title before any JSON is decoded.
+        """
+        title = " ".join(title.split())
+        needle = json.dumps(title, ensure_ascii=False).encode("utf-8")
+        for i, entry in enumerate(self.entries()):
+            raw = self.raw(i)
+            if title != UNTITLED and needle not in raw:
+                continue
+            for card in json.loads(raw).get("cards") or ():
+                if not isinstance(card, Mapping):
+                    continue
+                if card_field(card, "title", UNTITLED) != title:
+                    continue
+                if timeframe is None or (
+                    card_field(card, "timeframe", NO_TIMEFRAME)
+                    == " ".join(timeframe.split())
+                ):
+                    return entry.timestamp
+        return None
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _map(path: str) -> mmap.mmap:
+    with open(path, "ab+") as fh:
+        if not os.fstat(fh.fileno()).st_size:
+            # An empty file cannot be mapped; an anonymous page stands in.
+            return mmap.mmap(-1, 1)
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
@@ -0,0 +1,219 @@
+"""A small keep-alive HTTP/1.1 client on top of asyncio streams.
+
+Only what the Bot API needs is implemented: one origin per pool, request
+bodies given as bytes, ``Content-Length`` and chunked responses.  Connections
+are returned to the pool after each response unless the server asked to
+close them, so a fan-out of many requests pays for TCP and TLS set-up once
+per connection instead of once per request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTIONS = 10
+
+_Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class HTTPError(Exception):
+    """The server sent something that is not a well-formed HTTP response."""
+
+
+@dataclass(slots=True)
+class Response:
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class _StaleConnection(Exception):
+    """A pooled connection was closed by the peer before answering."""
+
+
+class ConnectionPool:
+    """Reuse up to ``max_connections`` connections to a single origin."""
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported base URL: {base_url!r}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._ssl = (
+            (ssl_context or ssl.create_default_context())
+            if parts.scheme == "https"
+            else None
+        )
+        default_port = 443 if parts.scheme == "https" else 80
+        self._host_header = (
+            self.host if self.port == default_port else f"{self.host}:{self.port}"
+        )
+        self._limit = asyncio.Semaphore(max_connections)
+        self._idle: deque[_Connection] = deque()
+        self.connections_opened = 0
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: Mapping[str, str] | None = None,
+    ) -> Response:
+        """Send one request and read the whole response."""
+        head = self._encode_head(method, path, body, headers)
+        async with self._limit:
+            while True:
+                conn, reused = await self._acquire()
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._roundtrip(conn, head + body, reused), self.timeout
+                    )
+                except _StaleConnection:
+                    conn[1].close()
+                    continue
+                except BaseException:
+                    conn[1].close()
+                    raise
+                if keep_alive:
+                    self._idle.append(conn)
+                else:
+                    conn[1].close()
+                return response
+
+    def _encode_head(
+        self,
+        method: str,
+        path: str,
+        body: bytes,
+        headers: Mapping[str, str] | None,
+    ) -> bytes:
+        lines = [
+            f"{method} {self.prefix}{path} HTTP/1.1",
+            f"Host: {self._host_header}",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+        ]
+        lines.extend(f"{k}: {v}" for k, v in (headers or {}).items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _acquire(self) -> tuple[_Connection, bool]:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return (reader, writer), True
+            writer.close()
+        conn = await asyncio.wait_for(
+            asyncio.open_connection(
+                self.host,
+                self.port,
+                ssl=self._ssl,
+                server_hostname=self.host if self._ssl else None,
+            ),
+            self.timeout,
+        )
+        self.connections_opened += 1
+        return conn, False
+
+    async def _roundtrip(
+        self, conn: _Connection, data: bytes, reused: bool
+    ) -> tuple[Response, bool]:
+        reader, writer = conn
+        try:
+            writer.write(data)
+            await writer.drain()
+            status_line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if reused:
+                raise _StaleConnection from None
+            raise
+        if not status_line:
+            if reused:
+                raise _StaleConnection
+            raise HTTPError("connection closed before response")
+        return await _read_response(reader, status_line)
+
+
+async def _read_response(
+    reader: asyncio.StreamReader, status_line: bytes
+) -> tuple[Response, bool]:
+    while True:
+        try:
+            version, status, *_ = status_line.decode("latin-1").split(None, 2)
+            code = int(status)
+        except ValueError:
+            raise HTTPError(f"bad status line: {status_line!r}") from None
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if 100 <= code < 200:
+            status_line = await reader.readline()
+            continue
+        break
+
+    keep_alive = headers.get("connection", "").lower() != "close" and (
+        version != "HTTP/1.0" or headers.get("connection", "").lower() == "keep-alive"
+    )
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = await _read_chunked(reader)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    elif code in (204, 304):
+        body = b""
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return Response(code, headers, body), keep_alive
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    parts = []
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPError(f"bad chunk size: {size_line!r}") from None
+        if size == 0:
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(parts)
+        parts.append(await reader.readexactly(size))
+        await reader.readexactly(2)
@@ -0,0 +1,300 @@
+"""Build the Telegram drops message from a ``latest_<game>.json`` snapshot.
+
+This is a single-pass replacement for the jq/sed/sort pipeline that used to
+live in the workflow's "Build message (with timeframes)" step.  The text has
+the same shape, minus the trailing blank line it emitted when there was no
+"… and N more" footer.  Instead of ``sort -u``, lines that differ only in
+case, Unicode form, spacing or dash style are merged (see
+:mod:`dropnoti.dedupe`) and kept in the order the snapshot lists them.
+The heading comes from the game's :class:`Template`.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable, Mapping, Sequence
+
+from .dedupe import Deduper
+from .stream import iter_events
+
+PREVIEW_LIMIT = 8
+# Telegram's cap on message text, in UTF-16 code units.
+MESSAGE_LIMIT = 4096
+SEPARATOR = " — "
+UNTITLED = "Untitled"
+NO_TIMEFRAME = "Time N/A"
+
+
+@dataclass(frozen=True, slots=True)
+class Template:
+    """How one game's messages are headed.
+
+    ``title`` and ``empty`` are :meth:`str.format` strings that may use
+    ``{name}``, ``{short}``, ``{count}`` and ``{as_of}``.  The defaults are
+    the original Rainbow Six wording.
+    """
+
+    name: str = "Rainbow Six"
+    short: str = "R6"
+    title: str = "{short} Drops: {count} campaigns"
+    empty: str = "No {name} drops today"
+    as_of: str = "as of {as_of} (UTC)"
+
+    def header(self, count: int, as_of: str) -> tuple[str, ...]:
+        fields = {
+            "name": self.name,
+            "short": self.short,
+            "count": count,
+            "as_of": as_of,
+        }
+        stamp = self.as_of.format(**fields)
+        if count == 0:
+            return (self.empty.format(**fields), stamp)
+        return (self.title.format(**fields), stamp, "")
+
+
+DEFAULT_TEMPLATE = Template()
+
+
+@dataclass(frozen=True, slots=True)
+class Message:
+    """A rendered drops message and the pieces it was assembled from.
+
+    ``preview`` holds every line when the message was built without a limit;
+    :meth:`pages` then splits it to fit Telegram's length cap.
+    """
+
+    count: int
+    as_of: str
+    preview: tuple[str, ...]
+    total: int
+    template: Template = DEFAULT_TEMPLATE
+
+    @property
+    def footer(self) -> str:
+        """The ``… and N more`` line, or an empty string when nothing was cut."""
+        extra = self.total - len(self.preview)
+        return f"… and {extra} more" if extra > 0 else ""
+
+    @property
+    def header(self) -> tuple[str, ...]:
+        return self.template.header(self.count, self.as_of)
+
+    @property
+    def lines(self) -> list[str]:
+        if self.count == 0:
+            return []
+        lines = [f"• {line}" for line in self.preview]
+        if self.footer:
+            lines.append(self.footer)
+        return lines
+
+    @property
+    def text(self) -> str:
+        return "\n".join((*self.header, *self.lines))
+
+    def pages(self, limit: int = MESSAGE_LIMIT) -> list[str]:
+        """The message split into as few texts as fit ``limit`` each."""
+        return paginate(self.lines, self.header, limit)
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def telegram_length(text: str) -> int:
+    """Length of ``text`` as Telegram counts it (UTF-16 code units)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _fit(line: str, budget: int) -> str:
+    """Cut ``line`` to ``budget`` code units, marking the cut with ``…``."""
+    units = line.encode("utf-16-le")[: 2 * max(budget - 1, 0)]
+    return units.decode("utf-16-le", "ignore") + "…"
+
+
+def paginate(
+    lines: Sequence[str], header: Sequence[str] = (), limit: int = MESSAGE_LIMIT
+) -> list[str]:
+    """Pack ``lines`` in order into as few texts of at most ``limit`` as possible.
+
+    Every page starts with ``header``.  When more than one page is needed the
+    first header line gets a ``(1/3)``-style marker, and room for it is
+    reserved on every page.  Filling each page before starting the next is
+    optimal when the order has to be kept.  A line too long for an empty page
+    is cut.
+    """
+    sizes = [telegram_length(line) + 1 for line in lines]  # +1 for the newline
+    base = sum(telegram_length(h) + 1 for h in header) - 1
+    if base + sum(sizes) <= limit:
+        return ["\n".join((*header, *lines))]
+    # The marker is at most " (n/n)" with n the number of lines.
+    marker = 2 * len(str(len(lines))) + 4 if header else 0
+    budget = limit - base - marker
+    pages: list[list[str]] = []
+    page: list[str] = []
+    used = 0
+    for line, size in zip(lines, sizes):
+        if size > budget:
+            line = _fit(line, budget - 1)
+            size = budget
+        if page and used + size > budget:
+            pages.append(page)
+            page, used = [], 0
+        page.append(line)
+        used += size
+    if page or not pages:
+        pages.append(page)
+    texts = []
+    for i, page in enumerate(pages, 1):
+        top = list(header)
+        if top:
+            top[0] = f"{top[0]} ({i}/{len(pages)})"
+        texts.append("\n".join((*top, *page)))
+    return texts
+
+
+def normalize_space(value: str) -> str:
+    """Collapse every run of whitespace to a single space and trim the ends."""
+    return " ".join(value.split())
+
+
+def clean_field(value: Any, default: str) -> str:
+    """Apply the workflow's ``// default`` fallback and normalize whitespace."""
+    if value is None or value is False:
+        return default
+    value = normalize_space(str(value))
+    return value or default
+
+
+def card_field(card: Mapping[str, Any], key: str, default: str) -> str:
+    """Return ``card[key]`` with whitespace normalized, or ``default``."""
+    return clean_field(card.get(key), default)
+
+
+def format_line(card: Mapping[str, Any]) -> str:
+    """Render one card as ``Title — Timeframe`` with the workflow's fallbacks."""
+    return (
+        card_field(card, "title", UNTITLED)
+        + SEPARATOR
+        + card_field(card, "timeframe", NO_TIMEFRAME)
+    )
+
+
+def format_as_of(scraped_at: str | None, now: datetime | None = None) -> str:
+    """Format ``scraped_at`` as ``MM-DD`` in UTC, falling back to today."""
+    if not scraped_at:
+        return (now or datetime.now(timezone.utc)).strftime("%m-%d")
+    try:
+        stamp = datetime.fromisoformat(scraped_at.replace("Z", "+00:00"))
+    except ValueError:
+        return scraped_at[5:10]
+    if stamp.tzinfo is not None:
+        stamp = stamp.astimezone(timezone.utc)
+    return stamp.strftime("%m-%d")
+
+
+class LineCollector:
+    """Deduplicate lines and keep the first ``limit`` of them.
+
+    Lines keep first-seen order.  Only the preview is kept in order; every
+    other line is remembered by its spelling and normalized key, so memory
+    grows with the number of distinct lines rather than with the size of
+    the input.  With ``limit=None`` every line is kept.
+    """
+
+    __slots__ = ("limit", "preview", "_seen")
+
+    def __init__(self, limit: int | None = PREVIEW_LIMIT) -> None:
+        self.limit = limit
+        self.preview: list[str] = []
+        self._seen = Deduper()
+
+    @property
+    def total(self) -> int:
+        return len(self._seen)
+
+    def lines(self) -> tuple[str, ...]:
+        return tuple(self.preview)
+
+    def add(self, line: str) -> None:
+        if self._seen.add(line) and (
+            self.limit is None or len(self.preview) < self.limit
+        ):
+            self.preview.append(line)
+
+    def add_card(self, card: Any) -> None:
+        if isinstance(card, Mapping):
+            self.add(format_line(card))
+
+
+def collect_lines(
+    cards: Iterable[Mapping[str, Any]], limit: int | None = PREVIEW_LIMIT
+) -> tuple[tuple[str, ...], int]:
+    """Return the first ``limit`` unique lines and the number of unique lines."""
+    collector = LineCollector(limit)
+    for card in cards:
+        collector.add_card(card)
+    return collector.lines(), collector.total
+
+
+def message_from_snapshot(
+    snapshot: Mapping[str, Any],
+    limit: int | None = PREVIEW_LIMIT,
+    now: datetime | None = None,
+    template: Template = DEFAULT_TEMPLATE,
+) -> Message:
+    """Build a :class:`Message` from an already decoded snapshot."""
+    count = snapshot.get("count") or 0
+    cards = snapshot.get("cards") or ()
+    preview, total = collect_lines(cards, limit)
+    return Message(
+        count=int(count),
+        as_of=format_as_of(snapshot.get("scraped_at"), now),
+        preview=preview,
+        total=total,
+        template=template,
+    )
+
+
+def build_message(
+    path: str | os.PathLike[str] = "latest_r6.json",
+    limit: int | None = PREVIEW_LIMIT,
+    now: datetime | None = None,
+    template: Template = DEFAULT_TEMPLATE,
+) -> Message:
+    """Stream ``path`` once and build the drops message.
+
+    Cards are consumed one at a time.  Reading stops as soon as everything
+    the message needs is known: after the ``cards`` array when ``count`` and
+    ``scraped_at`` have been seen, or straight away when ``count`` is zero.
+    A missing file is treated like the workflow's ``{}`` placeholder.
+    """
+    collector = LineCollector(limit)
+    header: dict[str, Any] = {}
+    cards_done = False
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for key, value in iter_events(fh):
+                if key == "cards.item":
+                    collector.add_card(value)
+                    continue
+                if key == "cards.end":
+                    cards_done = True
+                elif key in ("count", "scraped_at"):
+                    header[key] = value
+                else:
+                    continue
+                if len(header) == 2 and (cards_done or not header["count"]):
+                    break
+    except FileNotFoundError:
+        pass
+    count = header.get("count") or 0
+    return Message(
+        count=int(count),
+        as_of=format_as_of(header.get("scraped_at"), now),
+        preview=collector.lines() if count else (),
+        total=collector.total if count else 0,
+        template=template,
+    )
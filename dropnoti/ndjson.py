@@ -0,0 +1,152 @@
+"""Stream cards from the scraper to the message builder.
+
+Without streaming, the builder starts only once ``latest_r6.json`` has been
+written in full.  :func:`scrape_and_build` instead hands each page's cards,
+in page order, to the builder through a bounded :class:`asyncio.Queue` as
+soon as the page is done.  Deduplication and rendering then run while later
+pages are still downloading, and a full queue holds the scraper back
+instead of letting cards pile up in memory.  The queue carries whole pages,
+since a queue operation per card costs more than the deduplication does.
+
+Across processes the same stream is NDJSON, one card per line::
+
+    python -m dropnoti scrape URL... --ndjson - | python -m dropnoti build --ndjson -
+
+where the pipe is the bounded buffer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import IO, Any, Iterable, Iterator
+
+from .message import (
+    DEFAULT_TEMPLATE,
+    PREVIEW_LIMIT,
+    LineCollector,
+    Message,
+    Template,
+    format_as_of,
+)
+from .scrape import (
+    DEFAULT_PER_HOST,
+    PageResult,
+    Parser,
+    ScrapeResult,
+    ValidatorCache,
+    scrape_to,
+)
+
+QUEUE_SIZE = 16
+
+Card = dict[str, Any]
+
+
+def dumps(cards: Iterable[Card]) -> str:
+    """``cards`` as NDJSON lines."""
+    return "".join(
+        json.dumps(card, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for card in cards
+    )
+
+
+def iter_ndjson(fp: IO[str]) -> Iterator[Card]:
+    """Yield the cards of an NDJSON stream as lines arrive; blank lines skip.
+
+    Raises :class:`ValueError` with the line number for a line that is not
+    JSON.
+    """
+    for number, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            card = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"line {number}: {exc}") from None
+        if isinstance(card, dict):
+            yield card
+
+
+def message_from_cards(
+    cards: Iterable[Card],
+    limit: int | None = PREVIEW_LIMIT,
+    scraped_at: str | None = None,
+    now: datetime | None = None,
+    template: Template = DEFAULT_TEMPLATE,
+) -> Message:
+    """Build a :class:`Message` while consuming ``cards`` one at a time."""
+    collector = LineCollector(limit)
+    count = 0
+    for card in cards:
+        collector.add_card(card)
+        count += 1
+    return _message(collector, count, scraped_at, now, template)
+
+
+def _message(
+    collector: LineCollector,
+    count: int,
+    scraped_at: str | None,
+    now: datetime | None,
+    template: Template,
+) -> Message:
+    return Message(
+        count=count,
+        as_of=format_as_of(scraped_at, now),
+        preview=collector.lines() if count else (),
+        total=collector.total if count else 0,
+        template=template,
+    )
+
+
+async def scrape_and_build(
+    urls: Iterable[str],
+    output: str | os.PathLike[str],
+    cache: ValidatorCache | None = None,
+    parse: Parser | None = None,
+    per_host: int = DEFAULT_PER_HOST,
+    limit: int | None = PREVIEW_LIMIT,
+    template: Template = DEFAULT_TEMPLATE,
+    ndjson: IO[str] | None = None,
+    queue_size: int = QUEUE_SIZE,
+) -> tuple[ScrapeResult, Message]:
+    """Scrape ``urls`` into ``output`` and build the message as cards arrive.
+
+    At most ``queue_size`` pages wait for the builder.  With ``ndjson`` set,
+    every card is also written there, one page at a time and flushed, for a
+    consumer in another process.
+
+    Lines come in scrape order: pages in URL order, cards as each page lists
+    them.  :func:`~dropnoti.message.build_message` on ``output`` reads the
+    canonical snapshot, sorted by end time, so it has the same count and
+    distinct lines but may list them, pick the preview, and spell a merged
+    duplicate differently.
+    """
+    queue: asyncio.Queue[list[Card] | None] = asyncio.Queue(queue_size)
+    collector = LineCollector(limit)
+
+    async def consume() -> int:
+        count = 0
+        while (cards := await queue.get()) is not None:
+            for card in cards:
+                collector.add_card(card)
+            count += len(cards)
+        return count
+
+    async def on_page(page: PageResult) -> None:
+        if ndjson is not None:
+            ndjson.write(dumps(page.cards))
+            ndjson.flush()
+        await queue.put(page.cards)
+
+    consumer = asyncio.ensure_future(consume())
+    try:
+        result = await scrape_to(urls, output, cache, parse, per_host, on_page)
+        await queue.put(None)
+        count = await consumer
+    finally:
+        consumer.cancel()
+    return result, _message(collector, count, result.scraped_at, None, template)
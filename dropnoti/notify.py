@@ -0,0 +1,81 @@
+"""Decide what a snapshot means for subscribers, independent of transport.
+
+:func:`plan` is the shared "diff" step of ``send --state`` and the
+``serve`` daemon: it short-circuits on an unchanged content hash, otherwise
+diffs the snapshot against the saved state and returns the message to send
+together with the state to save once delivery succeeded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+
+from .fingerprint import content_hash
+from .message import DEFAULT_TEMPLATE, PREVIEW_LIMIT, Message, Template
+from .state import (
+    CampaignDiff,
+    State,
+    load_state,
+    message_for_changes,
+    read_changes,
+    save_state,
+)
+
+UNCHANGED = "unchanged"
+NO_CHANGES = "no-changes"
+
+
+@dataclass(frozen=True, slots=True)
+class Plan:
+    """The outcome of diffing one snapshot.
+
+    ``message`` is ``None`` when there is nothing to send; ``skipped`` then
+    says why.  ``state`` is what to persist after a successful send, and
+    ``previous_digest`` the content hash of the state it was diffed against.
+    """
+
+    message: Message | None
+    state: State
+    digest: str
+    skipped: str | None = None
+    changes: CampaignDiff | None = None
+    previous_digest: str | None = None
+
+    @property
+    def transition(self) -> str:
+        """Identifies the diff: the same snapshot after another state differs."""
+        raw = f"{self.previous_digest or ''}\x1f{self.digest}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+
+def plan(
+    snapshot: str | os.PathLike[str],
+    state_path: str | os.PathLike[str],
+    limit: int | None = PREVIEW_LIMIT,
+    previous: State | None = None,
+    template: Template = DEFAULT_TEMPLATE,
+    dry_run: bool = False,
+) -> Plan:
+    """Diff ``snapshot`` against ``previous`` (or the state at ``state_path``).
+
+    When nothing needs sending, the refreshed state is saved right away so
+    the next run can short-circuit on the hash, unless ``dry_run`` is set.
+    """
+    if previous is None:
+        previous = load_state(state_path)
+    digest = content_hash(snapshot)
+    if previous is not None and previous.content_hash == digest:
+        return Plan(None, previous, digest, UNCHANGED)
+    header, changes, current = read_changes(
+        snapshot, previous.index if previous else None
+    )
+    message = message_for_changes(header, changes, limit, template)
+    state = State(current, digest)
+    since = previous.content_hash if previous is not None else None
+    if message is None:
+        if not dry_run:
+            save_state(state, state_path)
+        return Plan(None, state, digest, NO_CHANGES, changes, since)
+    return Plan(message, state, digest, changes=changes, previous_digest=since)
@@ -0,0 +1,318 @@
+"""Durable outbox so repeated or overlapping runs deliver each page once.
+
+Every page planned for a chat is written to a SQLite table (in WAL mode, so
+readers never block the writer) under an idempotency key derived from a
+digest of what the message reports, the chat, the page number and the
+page's text.  For a diff the digest covers the snapshot and the state it
+was diffed against (:attr:`~dropnoti.notify.Plan.transition`), so a
+snapshot whose content comes back later is announced again.  Enqueueing
+the same key again is a no-op, which is what makes a retried workflow step
+or a manual dispatch right after the cron run coalesce into one delivery.
+
+:meth:`Outbox.deliver` claims due entries with a short lease, sends them
+per chat in page order and marks an entry delivered only on a ``200`` reply.
+Other failures are retried with exponential backoff; ``400``-class errors
+other than ``429`` are permanent.  A run that dies between Telegram
+accepting a page and the entry being marked can resend that one page once
+the lease expires, so delivery is at least once per key.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Sequence
+
+if TYPE_CHECKING:
+    from .telegram import ApiResult, TelegramClient
+
+OUTBOX_PATH = ".dropnoti/outbox.sqlite3"
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 300.0
+MAX_ATTEMPTS = 8
+LEASE = 60.0
+# How often a run checks on entries another run is sending.
+POLL = 1.0
+# Replies that will not get better by retrying.
+PERMANENT = frozenset({400, 401, 403, 404})
+
+PENDING = "pending"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    delivered REAL,
+    message_id INTEGER,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+"""
+# Pending entries whose earlier pages have all been delivered.
+_READY = (
+    "status = 'pending' AND NOT EXISTS (SELECT 1 FROM outbox AS p"
+    " WHERE p.digest = o.digest AND p.chat_id = o.chat_id"
+    " AND p.page < o.page AND p.status != 'delivered')"
+)
+
+
+def idempotency_key(digest: str, chat_id: str, page: int, text: str) -> str:
+    """Key of page ``page`` (from 0) of message ``digest`` for ``chat_id``."""
+    raw = f"{digest}\x1f{chat_id}\x1f{page}\x1f{text}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def backoff(
+    attempts: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX
+) -> float:
+    """Delay before retrying after ``attempts`` failed tries."""
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxEntry:
+    key: str
+    digest: str
+    chat_id: str
+    page: int
+    text: str
+    attempts: int
+
+
+@dataclass(frozen=True, slots=True)
+class DeliveryReport:
+    """Entry counts for one digest (or the whole outbox) after a delivery."""
+
+    delivered: int = 0
+    pending: int = 0
+    failed: int = 0
+
+    @property
+    def done(self) -> bool:
+        return not self.pending and not self.failed
+
+
+class Outbox:
+    """The outbox table at ``path``.  Use as a context manager."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] = OUTBOX_PATH,
+        clock: Callable[[], float] = time.time,
+        max_attempts: int = MAX_ATTEMPTS,
+        lease: float = LEASE,
+    ) -> None:
+        self.path = os.fspath(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.clock = clock
+        self.max_attempts = max_attempts
+        self.lease = lease
+        # Autocommit; transactions are opened explicitly where they matter.
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+
+    def __enter__(self) -> "Outbox":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def enqueue(
+        self, digest: str, chat_ids: Iterable[str], pages: Sequence[str]
+    ) -> int:
+        """Plan ``pages`` for every chat; returns how many entries are new."""
+        now = self.clock()
+        rows = [
+            (idempotency_key(digest, chat_id, i, text), digest, chat_id, i, text, now)
+            for chat_id in chat_ids
+            for i, text in enumerate(pages)
+        ]
+        with self._transaction():
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO outbox"
+                " (key, digest, chat_id, page, text, created)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self.db.total_changes - before
+
+    def claim(self, limit: int = 1000) -> list[OutboxEntry]:
+        """Lease the due entries whose earlier pages were all delivered."""
+        now = self.clock()
+        with self._transaction():
+            rows = self.db.execute(
+                "SELECT key, digest, chat_id, page, text, attempts FROM outbox AS o"
+                f" WHERE {_READY} AND next_attempt <= ? AND claimed_until <= ?"
+                " ORDER BY created, chat_id, page LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            self.db.executemany(
+                "UPDATE outbox SET claimed_until = ? WHERE key = ?",
+                [(now + self.lease, row[0]) for row in rows],
+            )
+        return [OutboxEntry(*row) for row in rows]
+
+    def mark_delivered(self, key: str, message_id: int | None = None) -> None:
+        self.db.execute(
+            "UPDATE outbox SET status = 'delivered', delivered = ?, message_id = ?,"
+            " claimed_until = 0 WHERE key = ?",
+            (self.clock(), message_id, key),
+        )
+
+    def mark_failed(
+        self,
+        entry: OutboxEntry,
+        error: str,
+        retry_after: float | None = None,
+        permanent: bool = False,
+    ) -> None:
+        attempts = entry.attempts + 1
+        if permanent or attempts >= self.max_attempts:
+            status, delay = FAILED, 0.0
+        else:
+            status, delay = PENDING, max(backoff(attempts), retry_after or 0.0)
+        with self._transaction():
+            self.db.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt = ?,"
+                " claimed_until = 0, last_error = ? WHERE key = ?",
+                (status, attempts, self.clock() + delay, error, entry.key),
+            )
+            if status == FAILED:
+                # Later pages would never be sent out of order; drop them too.
+                self.db.execute(
+                    "UPDATE outbox SET status = 'failed', last_error = ?"
+                    " WHERE digest = ? AND chat_id = ? AND page > ?"
+                    " AND status = 'pending'",
+                    (
+                        f"page {entry.page} failed",
+                        entry.digest,
+                        entry.chat_id,
+                        entry.page,
+                    ),
+                )
+
+    def release(self, entry: OutboxEntry) -> None:
+        """Give up a lease without counting an attempt."""
+        self.db.execute(
+            "UPDATE outbox SET claimed_until = 0 WHERE key = ?", (entry.key,)
+        )
+
+    def report(self, digest: str | None = None) -> DeliveryReport:
+        query = "SELECT status, COUNT(*) FROM outbox"
+        params: tuple[str, ...] = ()
+        if digest is not None:
+            query += " WHERE digest = ?"
+            params = (digest,)
+        counts = dict(self.db.execute(query + " GROUP BY status", params).fetchall())
+        return DeliveryReport(
+            counts.get(DELIVERED, 0), counts.get(PENDING, 0), counts.get(FAILED, 0)
+        )
+
+    def next_due(self) -> float | None:
+        """When the earliest pending entry may be retried."""
+        row = self.db.execute(
+            "SELECT MIN(MAX(next_attempt, claimed_until)) FROM outbox AS o"
+            f" WHERE {_READY}"
+        ).fetchone()
+        return row[0]
+
+    def _leased(self, now: float) -> bool:
+        return (
+            self.db.execute(
+                "SELECT 1 FROM outbox WHERE status = 'pending' AND claimed_until > ?"
+                " LIMIT 1",
+                (now,),
+            ).fetchone()
+            is not None
+        )
+
+    async def deliver(
+        self,
+        client: TelegramClient,
+        digest: str | None = None,
+        wait: float = 0.0,
+    ) -> DeliveryReport:
+        """Send everything due, waiting up to ``wait`` seconds for retries.
+
+        Chats are served concurrently and each chat's pages in order.  The
+        report covers ``digest`` when given, else the whole outbox.
+        """
+        deadline = self.clock() + wait
+        while True:
+            entries = self.claim()
+            if entries:
+                by_chat: dict[str, list[OutboxEntry]] = {}
+                for entry in entries:
+                    by_chat.setdefault(entry.chat_id, []).append(entry)
+                await asyncio.gather(
+                    *(self._send_chat(client, chat) for chat in by_chat.values())
+                )
+                continue
+            due = self.next_due()
+            now = self.clock()
+            if due is None or now >= deadline:
+                return self.report(digest)
+            if due > deadline and not self._leased(now):
+                return self.report(digest)
+            # Entries leased by another run may be finished any moment.
+            await asyncio.sleep(min(max(due - now, 0.0), POLL, deadline - now))
+
+    async def _send_chat(
+        self, client: TelegramClient, entries: list[OutboxEntry]
+    ) -> None:
+        for i, entry in enumerate(entries):
+            result = await client.send_message(entry.chat_id, entry.text)
+            if result.status == 200 and result.ok:
+                self.mark_delivered(entry.key, result.message_id)
+                continue
+            self._failed(entry, result)
+            # Later pages must wait for this one.
+            for later in entries[i + 1 :]:
+                self.release(later)
+            return
+
+    def _failed(self, entry: OutboxEntry, result: ApiResult) -> None:
+        error = f"{result.status} {result.description}".strip()
+        self.mark_failed(
+            entry, error, result.retry_after, permanent=result.status in PERMANENT
+        )
+
+    def _transaction(self) -> "_Immediate":
+        return _Immediate(self.db)
+
+
+class _Immediate:
+    """``BEGIN IMMEDIATE`` … ``COMMIT``, so two runs cannot claim one entry."""
+
+    __slots__ = ("db",)
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+
+    def __enter__(self) -> None:
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type: object, *exc: object) -> None:
+        self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
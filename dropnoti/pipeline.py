@@ -0,0 +1,420 @@
+"""Run scrape → normalize → diff → plan → render → send as a staged pipeline.
+
+Each :class:`Stage` has its own workers reading from a bounded
+:class:`asyncio.Queue`.  A stage passes results on with ``emit``, which waits
+while the next queue is full, so a slow Telegram fan-out holds back
+rendering, planning and eventually scraping instead of letting pages pile
+up in memory.  Stages that need all of their input, like the diff, do their
+work in ``finish`` once every item has arrived.
+
+Every stage records :class:`StageMetrics`: service time per item, time its
+items waited in the queue, time spent blocked on a full downstream queue,
+and the queue's depth sampled over the run.  :meth:`PipelineReport.format`
+prints them with the busiest stage marked as the bottleneck.
+:func:`notify_stages` builds the drops pipeline from a scraper, the state
+file, the chats or subscribers to notify and a Telegram client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Sequence
+
+from .fingerprint import content_hash
+from .message import DEFAULT_TEMPLATE, PREVIEW_LIMIT, Message, Template, format_as_of
+from .scrape import PageResult, ScrapeError, Scraper, ScrapeResult, write_snapshot
+from .state import Campaign, CampaignDiff, SeenIndex, State, diff
+from .subscribers import Matcher, fan_out
+
+if TYPE_CHECKING:
+    from .telegram import ApiResult, TelegramClient
+
+DEFAULT_QUEUE_SIZE = 64
+SAMPLE_INTERVAL = 0.05
+
+Emit = Callable[[Any], Awaitable[None]]
+Handler = Callable[[Any, Emit], Awaitable[None]]
+Finisher = Callable[[Emit], Awaitable[None]]
+
+# Tells a worker that its stage's input is exhausted.
+_DONE = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Stage:
+    """``handle(item, emit)`` run by ``workers`` tasks over a bounded queue."""
+
+    name: str
+    handle: Handler
+    workers: int = 1
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    finish: Finisher | None = None
+
+
+@dataclass(slots=True)
+class StageMetrics:
+    name: str
+    workers: int
+    capacity: int
+    items: int = 0
+    emitted: int = 0
+    busy: float = 0.0
+    blocked: float = 0.0
+    service: list[float] = field(default_factory=list)
+    waits: list[float] = field(default_factory=list)
+    depth: int = 0
+    depth_max: int = 0
+    depth_total: int = 0
+    samples: int = 0
+
+    @property
+    def mean_depth(self) -> float:
+        return self.depth_total / self.samples if self.samples else 0.0
+
+    def utilization(self, seconds: float) -> float:
+        """Share of the workers' time spent handling items."""
+        return self.busy / (self.workers * seconds) if seconds else 0.0
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass(slots=True)
+class PipelineReport:
+    stages: list[StageMetrics]
+    seconds: float
+    outputs: list[Any]
+
+    @property
+    def bottleneck(self) -> StageMetrics | None:
+        """The stage whose workers were busy the largest share of the run."""
+        if not self.stages:
+            return None
+        return max(self.stages, key=lambda m: m.utilization(self.seconds))
+
+    def format(self) -> list[str]:
+        lines = [
+            f"{'stage':<10} {'workers':>7} {'items':>7} {'p50 ms':>8} "
+            f"{'p99 ms':>8} {'busy':>5} {'blocked s':>9} {'wait p50':>9} "
+            f"{'queue avg':>9} {'max/size':>9}"
+        ]
+        slowest = self.bottleneck
+        for m in self.stages:
+            lines.append(
+                f"{m.name:<10} {m.workers:>7} {m.items:>7} "
+                f"{percentile(m.service, 0.5) * 1000:>8.1f} "
+                f"{percentile(m.service, 0.99) * 1000:>8.1f} "
+                f"{m.utilization(self.seconds):>5.0%} {m.blocked:>9.2f} "
+                f"{percentile(m.waits, 0.5) * 1000:>7.1f}ms "
+                f"{m.mean_depth:>9.1f} {f'{m.depth_max}/{m.capacity}':>9}"
+                + ("  <- bottleneck" if m is slowest else "")
+            )
+        lines.append(f"{self.seconds:.2f} s in total")
+        return lines
+
+
+class _Emitter:
+    """Passes one worker's results downstream and times how long it blocked."""
+
+    __slots__ = ("queue", "metrics", "downstream", "outputs", "blocked")
+
+    def __init__(
+        self,
+        queue: asyncio.Queue[Any] | None,
+        metrics: StageMetrics,
+        downstream: StageMetrics | None,
+        outputs: list[Any],
+    ) -> None:
+        self.queue = queue
+        self.metrics = metrics
+        self.downstream = downstream
+        self.outputs = outputs
+        self.blocked = 0.0
+
+    async def __call__(self, item: Any) -> None:
+        self.metrics.emitted += 1
+        if self.queue is None:
+            self.outputs.append(item)
+            return
+        start = time.perf_counter()
+        await self.queue.put((time.perf_counter(), item))
+        self.blocked += time.perf_counter() - start
+        assert self.downstream is not None
+        self.downstream.depth_max = max(self.downstream.depth_max, self.queue.qsize())
+
+
+class Pipeline:
+    """Connect ``stages`` with bounded queues; :meth:`run` feeds the first.
+
+    :attr:`metrics` is live while :meth:`run` is in progress, and
+    ``progress`` is called with it every ``progress_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        progress: Callable[[list[StageMetrics]], None] | None = None,
+        progress_interval: float = 1.0,
+    ) -> None:
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.metrics: list[StageMetrics] = []
+
+    async def run(self, items: Iterable[Any]) -> PipelineReport:
+        """Push ``items`` through every stage; the last stage's emits are output.
+
+        If a stage raises, the other stages are cancelled and the exception
+        propagates.
+        """
+        stages = self.stages
+        queues: list[asyncio.Queue[Any]] = [
+            asyncio.Queue(stage.queue_size) for stage in stages
+        ]
+        self.metrics = metrics = [
+            StageMetrics(stage.name, stage.workers, stage.queue_size)
+            for stage in stages
+        ]
+        outputs: list[Any] = []
+        start = time.perf_counter()
+
+        def emitter(i: int) -> _Emitter:
+            if i + 1 == len(stages):
+                return _Emitter(None, metrics[i], None, outputs)
+            return _Emitter(queues[i + 1], metrics[i], metrics[i + 1], outputs)
+
+        async def feed() -> None:
+            emit = _Emitter(queues[0], StageMetrics("", 1, 0), metrics[0], outputs)
+            for item in items:
+                await emit(item)
+            for _ in range(stages[0].workers):
+                await queues[0].put(_DONE)
+
+        async def work(i: int, emit: _Emitter) -> None:
+            stage, queue, m = stages[i], queues[i], metrics[i]
+            while True:
+                entry = await queue.get()
+                if entry is _DONE:
+                    return
+                queued, item = entry
+                began = time.perf_counter()
+                m.waits.append(began - queued)
+                blocked = emit.blocked
+                await stage.handle(item, emit)
+                spent = time.perf_counter() - began - (emit.blocked - blocked)
+                m.items += 1
+                m.busy += spent
+                m.service.append(spent)
+
+        async def run_stage(i: int) -> None:
+            emitters = [emitter(i) for _ in range(stages[i].workers)]
+            await asyncio.gather(*(work(i, emit) for emit in emitters))
+            finish = stages[i].finish
+            if finish is not None:
+                began = time.perf_counter()
+                blocked = emitters[0].blocked
+                await finish(emitters[0])
+                spent = time.perf_counter() - began - (emitters[0].blocked - blocked)
+                metrics[i].busy += spent
+            for emit in emitters:
+                metrics[i].blocked += emit.blocked
+            if i + 1 < len(stages):
+                for _ in range(stages[i + 1].workers):
+                    await queues[i + 1].put(_DONE)
+
+        async def sample() -> None:
+            last_report = time.perf_counter()
+            while True:
+                for queue, m in zip(queues, metrics):
+                    m.depth = queue.qsize()
+                    m.depth_total += m.depth
+                    m.samples += 1
+                if self.progress is not None:
+                    now = time.perf_counter()
+                    if now - last_report >= self.progress_interval:
+                        last_report = now
+                        self.progress(metrics)
+                await asyncio.sleep(SAMPLE_INTERVAL)
+
+        sampler = asyncio.ensure_future(sample())
+        tasks = [asyncio.ensure_future(feed())]
+        tasks += [asyncio.ensure_future(run_stage(i)) for i in range(len(stages))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+        return PipelineReport(metrics, time.perf_counter() - start, outputs)
+
+
+def format_progress(metrics: Sequence[StageMetrics]) -> str:
+    """One line of current queue depths, e.g. for :class:`Pipeline` progress."""
+    return "  ".join(
+        f"{m.name} {m.depth}/{m.capacity} ({m.items} done)" for m in metrics
+    )
+
+
+# The drops pipeline
+
+
+@dataclass(slots=True)
+class NotifyOutcome:
+    """What the drops pipeline found, filled in while it runs.
+
+    ``content_hash`` is that of the snapshot file, when one was written.
+    """
+
+    scraped_at: str = ""
+    pages: dict[int, PageResult] = field(default_factory=dict)
+    cards: int = 0
+    index: SeenIndex | None = None
+    content_hash: str | None = None
+    changes: CampaignDiff | None = None
+    results: dict[str, list[ApiResult]] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> list[str]:
+        """Chats that did not get every page."""
+        return [
+            chat_id
+            for chat_id, results in self.results.items()
+            if not all(r.ok for r in results)
+        ]
+
+    def state(self) -> State | None:
+        if self.index is None:
+            return None
+        return State(self.index, self.content_hash)
+
+
+def notify_stages(
+    scraper: Scraper,
+    outcome: NotifyOutcome,
+    chat_ids: Sequence[str] = (),
+    client: TelegramClient | None = None,
+    previous: State | None = None,
+    subscribers: Matcher | None = None,
+    snapshot: str | os.PathLike[str] | None = None,
+    limit: int | None = PREVIEW_LIMIT,
+    template: Template = DEFAULT_TEMPLATE,
+    workers: dict[str, int] | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> list[Stage]:
+    """The stages turning ``(position, url)`` pairs into sent messages.
+
+    ``scrape`` fetches pages through ``scraper``; ``normalize`` turns their
+    cards into campaigns; ``diff`` waits for every page, writes the
+    ``snapshot`` (when set) and compares the campaigns with ``previous``
+    (everything is new without it); ``plan`` gives every chat in
+    ``chat_ids`` all changes, or each of ``subscribers`` what it matched;
+    ``render`` paginates each message once; ``send`` delivers the pages
+    through ``client``, or skips delivery without one.  ``workers``
+    overrides a stage's default worker count by name.
+    """
+    counts = {"scrape": scraper.per_host, "render": 2, "send": 32}
+    counts.update(workers or {})
+    campaigns: dict[int, list[Campaign]] = {}
+    rendered: dict[Message, list[str]] = {}
+
+    async def scrape(item: tuple[int, str], emit: Emit) -> None:
+        position, url = item
+        if not outcome.scraped_at:
+            now = datetime.now(timezone.utc).isoformat()
+            outcome.scraped_at = now.replace("+00:00", "Z")
+        page = await scraper.fetch(url)
+        cached = scraper.cache is not None and scraper.cache.get(url) is not None
+        if page.error is not None and not cached:
+            raise ScrapeError(f"{url}: {page.error}")
+        outcome.pages[position] = page
+        await emit((position, page.cards))
+
+    async def normalize(item: tuple[int, list[Any]], emit: Emit) -> None:
+        position, cards = item
+        await emit((position, [Campaign.from_card(card) for card in cards]))
+
+    async def collect(item: tuple[int, list[Campaign]], emit: Emit) -> None:
+        position, page = item
+        campaigns[position] = page
+
+    async def compare(emit: Emit) -> None:
+        # Index pages in URL order, so which spelling of a campaign wins does
+        # not depend on which page finished first.
+        result = ScrapeResult(
+            [outcome.pages[position] for position in sorted(outcome.pages)],
+            outcome.scraped_at,
+        )
+        current = SeenIndex()
+        for position in sorted(campaigns):
+            outcome.cards += len(campaigns[position])
+            for campaign in campaigns[position]:
+                current.add(campaign)
+        if snapshot is not None and (result.changed or not os.path.exists(snapshot)):
+            write_snapshot(result.snapshot(), snapshot)
+        if snapshot is not None:
+            outcome.content_hash = content_hash(snapshot)
+        if scraper.cache is not None:
+            scraper.cache.save()
+        outcome.index = current
+        outcome.changes = diff(previous.index if previous else SeenIndex(), current)
+        if outcome.changes:
+            await emit(outcome.changes)
+
+    async def plan(changes: CampaignDiff, emit: Emit) -> None:
+        as_of = format_as_of(outcome.scraped_at)
+        items = changes.items()
+        if subscribers is not None:
+            messages = fan_out(subscribers, items, as_of, limit, template)
+            for chat_id, message in messages.items():
+                await emit((chat_id, message))
+            return
+        lines = [line for _, line in items]
+        message = Message(
+            count=len(lines),
+            as_of=as_of,
+            preview=tuple(lines[:limit]),
+            total=len(lines),
+            template=template,
+        )
+        for chat_id in chat_ids:
+            await emit((chat_id, message))
+
+    async def render(item: tuple[str, Message], emit: Emit) -> None:
+        chat_id, message = item
+        # Chats getting the same message share its pages.
+        pages = rendered.get(message)
+        if pages is None:
+            pages = rendered[message] = message.pages()
+        await emit((chat_id, pages))
+
+    async def send(item: tuple[str, list[str]], emit: Emit) -> None:
+        chat_id, pages = item
+        results = await client.send_pages(chat_id, pages) if client else []
+        outcome.results[chat_id] = results
+        await emit((chat_id, len(pages)))
+
+    def stage(name: str, handle: Handler, finish: Finisher | None = None) -> Stage:
+        return Stage(name, handle, counts.get(name, 1), queue_size, finish)
+
+    return [
+        stage("scrape", scrape),
+        stage("normalize", normalize),
+        Stage("diff", collect, 1, queue_size, compare),
+        stage("plan", plan),
+        stage("render", render),
+        stage("send", send),
+    ]
@@ -0,0 +1,191 @@
+"""Keep one drops post per chat per day and edit it in place.
+
+Instead of a new message for every update, :func:`publish` remembers the
+``message_id`` of each chat's post for the current UTC day together with
+the text it last rendered there.  An update edits only the pages whose text
+changed (``editMessageText``), appends pages when the list grew and deletes
+the ones it no longer needs.  When nothing changed it makes no API call at
+all.  A new day, or a post that can no longer be edited, starts a fresh one;
+the rest of an abandoned post is kept in :attr:`DailyPost.orphans` and
+deleted once the fresh one is complete.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+from .files import write_json
+
+if TYPE_CHECKING:
+    from .telegram import ApiResult, TelegramClient
+
+POSTS_PATH = ".dropnoti/posts.json"
+POSTS_VERSION = 1
+
+# Edit failures that mean the old post is gone for good.
+_GONE = (
+    "message to edit not found",
+    "message can't be edited",
+    "message_id_invalid",
+)
+
+
+@dataclass(slots=True)
+class DailyPost:
+    """The messages making up one chat's post on ``day`` and their text.
+
+    ``orphans`` are messages of an abandoned post still waiting to be deleted.
+    """
+
+    day: str
+    message_ids: list[int] = field(default_factory=list)
+    pages: list[str] = field(default_factory=list)
+    orphans: list[int] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class PublishResult:
+    chat_id: str
+    sent: int = 0
+    edited: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    failed: list[ApiResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def calls(self) -> int:
+        return self.sent + self.edited + self.deleted + len(self.failed)
+
+
+class PostStore:
+    """Today's post of every chat, saved as JSON at ``path``."""
+
+    def __init__(self, path: str | os.PathLike[str] = POSTS_PATH) -> None:
+        self.path = os.fspath(path)
+        self.posts: dict[str, DailyPost] = {}
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return
+        if isinstance(data, dict) and data.get("version") == POSTS_VERSION:
+            for chat_id, post in data.get("chats", {}).items():
+                self.posts[chat_id] = DailyPost(
+                    post["day"],
+                    list(post["message_ids"]),
+                    list(post["pages"]),
+                    list(post.get("orphans", [])),
+                )
+
+    def get(self, chat_id: str) -> DailyPost | None:
+        return self.posts.get(chat_id)
+
+    def save(self) -> None:
+        """Atomically replace the file at :attr:`path`."""
+        data = {
+            "version": POSTS_VERSION,
+            "chats": {
+                chat_id: {
+                    "day": post.day,
+                    "message_ids": post.message_ids,
+                    "pages": post.pages,
+                    "orphans": post.orphans,
+                }
+                for chat_id, post in self.posts.items()
+            },
+        }
+        write_json(self.path, data)
+
+
+def today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+async def publish(
+    client: TelegramClient,
+    store: PostStore,
+    chat_ids: Iterable[str],
+    pages: Sequence[str],
+    day: str | None = None,
+) -> list[PublishResult]:
+    """Bring every chat's post for ``day`` (default: today, UTC) to ``pages``.
+
+    Chats are updated concurrently.  The store is updated with whatever was
+    applied, even on failure, so the next call only redoes what is missing;
+    saving it is up to the caller.
+    """
+    day = day or today()
+    return list(
+        await asyncio.gather(
+            *(_publish_chat(client, store, chat_id, pages, day) for chat_id in chat_ids)
+        )
+    )
+
+
+async def _publish_chat(
+    client: TelegramClient,
+    store: PostStore,
+    chat_id: str,
+    pages: Sequence[str],
+    day: str,
+) -> PublishResult:
+    result = PublishResult(chat_id)
+    post = store.get(chat_id)
+    if post is None or post.day != day:
+        orphans = post.orphans if post is not None else []
+        post = store.posts[chat_id] = DailyPost(day, orphans=orphans)
+    for i, page in enumerate(pages):
+        if i < len(post.message_ids):
+            if post.pages[i] == page:
+                result.unchanged += 1
+                continue
+            reply = await client.edit_message_text(chat_id, post.message_ids[i], page)
+            if reply.ok or reply.not_modified:
+                post.pages[i] = page
+                result.edited += 1
+                continue
+            if _gone(reply):
+                # Start over with a fresh post rather than mixing old and new,
+                # and delete what is left of the old one once that is done.
+                orphans = post.message_ids[:i] + post.message_ids[i + 1 :]
+                store.posts[chat_id] = DailyPost(day, orphans=post.orphans + orphans)
+                return await _publish_chat(client, store, chat_id, pages, day)
+            result.failed.append(reply)
+            return result
+        reply = await client.send_message(chat_id, page)
+        if not reply.ok or reply.message_id is None:
+            result.failed.append(reply)
+            return result
+        post.message_ids.append(reply.message_id)
+        post.pages.append(page)
+        result.sent += 1
+    while len(post.message_ids) > len(pages):
+        reply = await client.delete_message(chat_id, post.message_ids[-1])
+        if not reply.ok and reply.status != 400:  # 400: already gone
+            result.failed.append(reply)
+            return result
+        post.message_ids.pop()
+        post.pages.pop()
+        result.deleted += 1
+    while post.orphans:
+        reply = await client.delete_message(chat_id, post.orphans[-1])
+        if not reply.ok and reply.status != 400:
+            result.failed.append(reply)
+            return result
+        post.orphans.pop()
+        result.deleted += 1
+    return result
+
+
+def _gone(reply: ApiResult) -> bool:
+    description = reply.description.lower()
+    return reply.status == 400 and any(reason in description for reason in _GONE)
@@ -0,0 +1,107 @@
+"""Token-bucket rate limiting for Bot API fan-out.
+
+Telegram allows roughly 30 messages per second per bot and one message per
+second per chat.  :class:`RateLimiter` keeps one global bucket plus a bucket
+per chat; a send waits until both have a token.  A ``429`` reply only pushes
+back the chat it was about, so other chats keep going at full speed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable
+
+GLOBAL_RATE = 30.0
+PER_CHAT_RATE = 1.0
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity`` tokens."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.blocked_until = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token can be taken (``0`` if one is available)."""
+        if math.isinf(self.rate):
+            return max(0.0, self.blocked_until - now)
+        self._refill(now)
+        missing = 1.0 - self.tokens
+        wait = missing / self.rate if missing > 1e-9 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def take(self, now: float) -> None:
+        if not math.isinf(self.rate):
+            self._refill(now)
+            self.tokens -= 1.0
+
+    def block(self, until: float) -> None:
+        """Refuse tokens before ``until``, e.g. after a ``retry_after``."""
+        self.blocked_until = max(self.blocked_until, until)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """A global bucket combined with lazily created per-chat buckets."""
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        per_chat_rate: float = PER_CHAT_RATE,
+        global_burst: float | None = None,
+        per_chat_burst: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[object]] = asyncio.sleep,
+    ) -> None:
+        self.clock = clock
+        self.sleep = sleep
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        burst = global_burst if global_burst is not None else max(global_rate, 1.0)
+        if math.isinf(burst):
+            burst = 1.0
+        self.global_bucket = TokenBucket(global_rate, burst, clock())
+        self.chats: dict[str, TokenBucket] = {}
+        self.waited = 0.0
+
+    def _chat(self, chat_id: str) -> TokenBucket:
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            bucket = self.chats[chat_id] = TokenBucket(
+                self.per_chat_rate, self.per_chat_burst, self.clock()
+            )
+        return bucket
+
+    async def acquire(self, chat_id: str) -> float:
+        """Wait until ``chat_id`` may send; return the time spent waiting."""
+        chat = self._chat(chat_id)
+        start = self.clock()
+        while True:
+            now = self.clock()
+            wait = max(chat.wait_time(now), self.global_bucket.wait_time(now))
+            if wait <= 0:
+                chat.take(now)
+                self.global_bucket.take(now)
+                waited = now - start
+                self.waited += waited
+                return waited
+            await self.sleep(wait)
+
+    def retry_after(self, chat_id: str, seconds: float) -> None:
+        """Hold back ``chat_id`` for ``seconds`` after a ``429`` reply."""
+        self._chat(chat_id).block(self.clock() + max(0.0, seconds))
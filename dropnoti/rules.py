@@ -0,0 +1,250 @@
+"""Subscriber filter rules evaluated as bitsets over a batch of cards.
+
+:class:`RuleSet` compiles every distinct keyword of every subscriber into
+one predicate.  For a batch of titles it builds one bit-row per token (bit
+``i`` set when title ``i`` has the token), ANDs the rows of each keyword's
+tokens into the predicate's row and then computes each subscriber's match
+vector as the OR of its included predicates minus the OR of its excluded
+ones.  Python integers serve as the bitsets.  With ``use_numpy=True`` the
+per-subscriber step runs as ``bitwise_or.reduceat`` over blocks of
+subscribers instead; that matches slightly faster but takes longer to
+build and to turn back into position lists, so it is not the default.
+Results equal :meth:`~dropnoti.subscribers.SubscriberIndex.match`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+from .subscribers import Subscriber, phrases, tokenize
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depends on the environment
+    numpy = None
+
+HAVE_NUMPY = numpy is not None
+
+# Subscribers evaluated per NumPy step; bounds the temporary arrays.
+BLOCK = 8192
+
+# NumPy rows 0 and 1 hold nothing and every card; predicates follow.
+_NOTHING = 0
+_EVERYTHING = 1
+_FIRST = 2
+
+
+class RuleSet:
+    """The compiled filters of the subscribers of one game."""
+
+    __slots__ = (
+        "chat_ids",
+        "use_numpy",
+        "_predicates",
+        "_by_token",
+        "_vocabulary",
+        "_includes",
+        "_excludes",
+        "_arrays",
+    )
+
+    def __init__(
+        self,
+        subscribers: Iterable[Subscriber],
+        game: str | None = None,
+        use_numpy: bool = False,
+    ) -> None:
+        if use_numpy and not HAVE_NUMPY:
+            raise RuntimeError("numpy is not installed")
+        self.use_numpy = use_numpy
+        self.chat_ids: list[str] = []
+        # Predicate number -> its tokens, the longest first.
+        self._predicates: list[tuple[str, ...]] = []
+        # Longest token -> predicates keyed by it.
+        self._by_token: dict[str, list[int]] = {}
+        self._vocabulary: set[str] = set()
+        # Per subscriber; no includes means every card.
+        self._includes: list[tuple[int, ...]] = []
+        self._excludes: list[tuple[int, ...]] = []
+        numbers: dict[frozenset[str], int] = {}
+        # Keywords repeat across subscribers; tokenize each spelling once.
+        spellings: dict[str, int | None] = {}
+
+        def predicate(keyword: str) -> int | None:
+            found = phrases((keyword,))
+            if not found:
+                return None
+            tokens = found[0]
+            key = frozenset(tokens)
+            number = numbers.get(key)
+            if number is None:
+                number = numbers[key] = len(self._predicates)
+                first = max(tokens, key=len)
+                self._predicates.append((first, *(t for t in tokens if t != first)))
+                self._by_token.setdefault(first, []).append(number)
+                self._vocabulary.update(tokens)
+            return number
+
+        def compile_(keywords: tuple[str, ...]) -> tuple[int, ...]:
+            found: list[int] = []
+            for keyword in keywords:
+                number = spellings.get(keyword, -1)
+                if number == -1:
+                    number = spellings[keyword] = predicate(keyword)
+                if number is not None and number not in found:
+                    found.append(number)
+            return tuple(found)
+
+        for subscriber in subscribers:
+            if not subscriber.wants_game(game):
+                continue
+            self.chat_ids.append(subscriber.chat_id)
+            self._includes.append(compile_(subscriber.keywords))
+            self._excludes.append(compile_(subscriber.excludes))
+        self._arrays = self._compile_arrays() if self.use_numpy else None
+
+    def __len__(self) -> int:
+        return len(self.chat_ids)
+
+    def match(self, titles: Sequence[str]) -> dict[str, list[int]]:
+        """Map each interested chat to the positions of its ``titles``."""
+        if not titles or not self.chat_ids:
+            return {}
+        values = self._evaluate(titles)
+        if self._arrays is not None:
+            return self._match_numpy(values, len(titles))
+        return self._match_python(values, len(titles))
+
+    def _evaluate(self, titles: Sequence[str]) -> list[int]:
+        """Each predicate's bit-row over ``titles``, as Python integers."""
+        vocabulary = self._vocabulary
+        where: dict[str, list[int]] = {}
+        for position, title in enumerate(titles):
+            for token in set(tokenize(title)):
+                if token in vocabulary:
+                    where.setdefault(token, []).append(position)
+        size = (len(titles) + 7) // 8
+        rows: dict[str, int] = {}
+        for token, positions in where.items():
+            buf = bytearray(size)
+            for p in positions:
+                buf[p >> 3] |= 1 << (p & 7)
+            rows[token] = int.from_bytes(buf, "little")
+        values = [0] * len(self._predicates)
+        predicates = self._predicates
+        for token, row in rows.items():
+            for number in self._by_token.get(token, ()):
+                value = row
+                for other in predicates[number][1:]:
+                    value &= rows.get(other, 0)
+                    if not value:
+                        break
+                values[number] = value
+        return values
+
+    def _match_python(self, values: list[int], count: int) -> dict[str, list[int]]:
+        everything = (1 << count) - 1
+        every = list(range(count))
+        result = {}
+        for number, includes in enumerate(self._includes):
+            if includes:
+                bits = 0
+                for predicate in includes:
+                    bits |= values[predicate]
+            else:
+                bits = everything
+            if not bits:
+                continue
+            for predicate in self._excludes[number]:
+                bits &= ~values[predicate]
+            if bits:
+                positions = every if bits == everything else _positions(bits)
+                result[self.chat_ids[number]] = positions
+        return result
+
+    def _compile_arrays(self) -> tuple[Any, Any, Any, Any]:
+        """Flattened predicate rows of every subscriber and where each starts.
+
+        Empty include lists point at the all-cards row and empty exclude lists
+        at the empty row, so every subscriber has at least one of each, as
+        ``reduceat`` needs.
+        """
+
+        def flatten(lists: list[tuple[int, ...]], empty: int) -> tuple[Any, Any]:
+            flat: list[int] = []
+            starts = []
+            for rows in lists:
+                starts.append(len(flat))
+                if rows:
+                    flat.extend(row + _FIRST for row in rows)
+                else:
+                    flat.append(empty)
+            starts.append(len(flat))
+            return (
+                numpy.array(flat, dtype=numpy.intp),
+                numpy.array(starts, dtype=numpy.intp),
+            )
+
+        return (
+            *flatten(self._includes, _EVERYTHING),
+            *flatten(self._excludes, _NOTHING),
+        )
+
+    def _match_numpy(self, values: list[int], count: int) -> dict[str, list[int]]:
+        # Little-endian 64-bit words, so a row viewed as bytes is in bit order.
+        words = (count + 63) // 64
+        size = words * 8
+        table = numpy.zeros((len(values) + _FIRST, words), dtype="<u8")
+        table[_EVERYTHING] = numpy.frombuffer(
+            ((1 << count) - 1).to_bytes(size, "little"), dtype="<u8"
+        )
+        for predicate, value in enumerate(values):
+            if value:
+                table[predicate + _FIRST] = numpy.frombuffer(
+                    value.to_bytes(size, "little"), dtype="<u8"
+                )
+        inc_rows, inc_starts, exc_rows, exc_starts = self._arrays
+        result = {}
+        every = list(range(count))
+        for lo in range(0, len(self.chat_ids), BLOCK):
+            hi = min(lo + BLOCK, len(self.chat_ids))
+            bits = _reduce(table, inc_rows, inc_starts, lo, hi)
+            bits &= ~_reduce(table, exc_rows, exc_starts, lo, hi)
+            hit = numpy.flatnonzero(bits.any(axis=1))
+            if not hit.size:
+                continue
+            flags = numpy.unpackbits(
+                bits[hit].astype("<u8", copy=False).view(numpy.uint8),
+                axis=1,
+                count=count,
+                bitorder="little",
+            )
+            found = numpy.flatnonzero(flags)
+            rows = found // count
+            flat = (found - rows * count).tolist()
+            ends = numpy.cumsum(numpy.bincount(rows, minlength=hit.size)).tolist()
+            start = 0
+            for number, end in zip(hit.tolist(), ends):
+                positions = every if end - start == count else flat[start:end]
+                result[self.chat_ids[lo + number]] = positions
+                start = end
+        return result
+
+
+def _reduce(table: Any, rows: Any, starts: Any, lo: int, hi: int) -> Any:
+    """OR together the table rows of subscribers ``lo`` to ``hi``."""
+    first, last = int(starts[lo]), int(starts[hi])
+    return numpy.bitwise_or.reduceat(
+        table[rows[first:last]], starts[lo:hi] - first, axis=0
+    )
+
+
+def _positions(bits: int) -> list[int]:
+    """Indexes of the set bits of ``bits``, lowest first."""
+    digits = format(bits, "b")[::-1]
+    found = []
+    i = digits.find("1")
+    while i >= 0:
+        found.append(i)
+        i = digits.find("1", i + 1)
+    return found
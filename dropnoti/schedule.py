@@ -0,0 +1,312 @@
+"""Learn when drops are usually released and poll around those times.
+
+:class:`ReleaseModel` keeps a decaying histogram of release times over the
+week in 15-minute buckets.  Training data is the first appearance of each
+campaign in the snapshot history, or releases the daemon observes live.
+:class:`AdaptiveScheduler` turns the model into poll intervals: close to
+``min_interval`` in and just before busy buckets, ``max_interval`` in quiet
+ones, and a short burst of fast polls after every change.  It keeps the
+chosen intervals in :class:`SchedulerMetrics`.
+
+:func:`simulate` replays release times against a scheduler on a fake clock,
+which is how ``python -m dropnoti schedule`` compares the adaptive policy
+with fixed-interval polling.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Sequence
+
+from .history import SnapshotHistory
+from .state import Campaign
+
+WEEK = 7 * 24 * 3600
+BUCKET = 15 * 60
+BUCKETS = WEEK // BUCKET
+# Monday 00:00 UTC, so bucket 0 starts a week.
+_EPOCH_MONDAY = 4 * 24 * 3600
+
+MIN_INTERVAL = 15.0
+MAX_INTERVAL = 180.0
+BURST = 10 * 60.0
+HALF_LIFE_WEEKS = 4.0
+LOOKBEHIND = 2
+LOOKAHEAD = 4
+
+
+def bucket_of(ts: float) -> int:
+    return int(((ts - _EPOCH_MONDAY) % WEEK) // BUCKET)
+
+
+class ReleaseModel:
+    """Decaying weekly histogram of release times."""
+
+    def __init__(self, half_life_weeks: float = HALF_LIFE_WEEKS) -> None:
+        self.half_life = half_life_weeks * WEEK
+        self.weights = [0.0] * BUCKETS
+        self.latest = 0.0
+        self.events = 0
+        self._smoothed: list[float] | None = None
+
+    def observe(self, ts: float) -> None:
+        """Record a release at epoch ``ts``."""
+        if ts > self.latest:
+            # Age every earlier observation instead of weighting the new one
+            # up, so the weights stay bounded.
+            if self.latest:
+                decay = 0.5 ** ((ts - self.latest) / self.half_life)
+                self.weights = [w * decay for w in self.weights]
+            self.latest = ts
+            weight = 1.0
+        else:
+            weight = 0.5 ** ((self.latest - ts) / self.half_life)
+        self.weights[bucket_of(ts)] += weight
+        self.events += 1
+        self._smoothed = None
+
+    def observe_many(self, timestamps: Iterable[float]) -> None:
+        for ts in sorted(timestamps):
+            self.observe(ts)
+
+    def scores(self) -> list[float]:
+        """Per-bucket activity in ``[0, 1]``.
+
+        Each bucket also counts releases in the following hour, so polling
+        speeds up ahead of a busy window rather than once it is underway.
+        """
+        if self._smoothed is None:
+            w = self.weights
+            raw = [
+                sum(w[(b + k) % BUCKETS] for k in range(-LOOKBEHIND, LOOKAHEAD + 1))
+                for b in range(BUCKETS)
+            ]
+            peak = max(raw)
+            self._smoothed = [r / peak for r in raw] if peak else raw
+        return self._smoothed
+
+    def score(self, ts: float) -> float:
+        return self.scores()[bucket_of(ts)]
+
+    @classmethod
+    def from_history(
+        cls, history: SnapshotHistory, half_life_weeks: float = HALF_LIFE_WEEKS
+    ) -> "ReleaseModel":
+        """Train on the first appearance of every campaign in ``history``."""
+        return cls.from_releases(release_times(history), half_life_weeks)
+
+    @classmethod
+    def from_releases(
+        cls, releases: Iterable[float], half_life_weeks: float = HALF_LIFE_WEEKS
+    ) -> "ReleaseModel":
+        model = cls(half_life_weeks)
+        model.observe_many(releases)
+        return model
+
+
+def release_times(history: SnapshotHistory) -> list[float]:
+    """``scraped_at`` of each snapshot that showed a campaign for the first time.
+
+    The first snapshot only establishes the baseline.
+    """
+    seen: set[str] = set()
+    releases: list[float] = []
+    for i, entry in enumerate(history.entries()):
+        cards = history.load(i).get("cards") or ()
+        keys = {
+            Campaign.from_card(card).key for card in cards if isinstance(card, dict)
+        }
+        if i and not keys <= seen:
+            releases.append(entry.timestamp)
+        seen |= keys
+    return releases
+
+
+@dataclass(slots=True)
+class SchedulerMetrics:
+    """Intervals chosen so far, by the reason they were chosen."""
+
+    polls: int = 0
+    total_interval: float = 0.0
+    min_interval: float = math.inf
+    max_interval: float = 0.0
+    last_interval: float = 0.0
+    last_score: float = 0.0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    def record(self, interval: float, reason: str, score: float) -> None:
+        self.polls += 1
+        self.total_interval += interval
+        self.min_interval = min(self.min_interval, interval)
+        self.max_interval = max(self.max_interval, interval)
+        self.last_interval = interval
+        self.last_score = score
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    @property
+    def mean_interval(self) -> float:
+        return self.total_interval / self.polls if self.polls else 0.0
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "polls": self.polls,
+            "mean_interval": round(self.mean_interval, 3),
+            "min_interval": self.min_interval if self.polls else None,
+            "max_interval": self.max_interval,
+            "last_interval": self.last_interval,
+            "last_score": round(self.last_score, 3),
+            "reasons": dict(self.reasons),
+        }
+
+
+class AdaptiveScheduler:
+    """Choose the next poll interval from a :class:`ReleaseModel`.
+
+    Drop-in replacement for :class:`~dropnoti.daemon.PollInterval`.
+    """
+
+    def __init__(
+        self,
+        model: ReleaseModel | None = None,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+        burst: float = BURST,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.model = model or ReleaseModel()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.burst = burst
+        self.clock = clock
+        self.metrics = SchedulerMetrics()
+        self._burst_until = -math.inf
+
+    def _for_score(self, score: float) -> float:
+        # Geometric interpolation: halving the score roughly doubles the wait.
+        return self.max_interval * (self.min_interval / self.max_interval) ** score
+
+    def interval_at(self, now: float) -> tuple[float, str, float]:
+        if now < self._burst_until:
+            return self.min_interval, "burst", 1.0
+        if not self.model.events:
+            return self.max_interval, "untrained", 0.0
+        score = self.model.score(now)
+        interval = self._for_score(score)
+        reason = "learned" if score > 0 else "idle"
+        # Do not sleep past the start of a busier bucket.
+        boundary = now - (now - _EPOCH_MONDAY) % BUCKET + BUCKET
+        while boundary < now + interval:
+            ahead = (boundary - now) + self._for_score(self.model.score(boundary))
+            if ahead < interval:
+                interval, reason = ahead, "ahead"
+            boundary += BUCKET
+        return max(self.min_interval, interval), reason, score
+
+    def next(self, changed: bool) -> float:
+        now = self.clock()
+        if changed:
+            self._burst_until = now + self.burst
+        interval, reason, score = self.interval_at(now)
+        self.metrics.record(interval, reason, score)
+        return interval
+
+    def observe_release(self, ts: float | None = None) -> None:
+        self.model.observe(self.clock() if ts is None else ts)
+
+
+# Simulation
+
+# Monday 2026-01-05 00:00 UTC, so synthetic runs are reproducible.
+SIMULATION_START = 1767571200.0
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationResult:
+    name: str
+    polls: int
+    latencies: tuple[float, ...]
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def mean_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def simulate(
+    name: str,
+    scheduler_factory: Callable[[FakeClock], object],
+    releases: Sequence[float],
+    start: float,
+    end: float,
+) -> SimulationResult:
+    """Poll from ``start`` to ``end`` on a fake clock.
+
+    Each release is detected by the first poll at or after it.  The
+    scheduler is told about releases as it detects them, like the daemon
+    does.
+    """
+    releases = sorted(r for r in releases if start <= r < end)
+    clock = FakeClock(start)
+    scheduler = scheduler_factory(clock)
+    polls = 0
+    pending = 0
+    latencies: list[float] = []
+    while clock.now < end:
+        polls += 1
+        detected = bisect_left(releases, clock.now + 1e-9)
+        changed = detected > pending
+        for r in releases[pending:detected]:
+            latencies.append(clock.now - r)
+        if changed:
+            observe = getattr(scheduler, "observe_release", None)
+            if observe is not None:
+                observe(clock.now)
+        pending = detected
+        clock.now += scheduler.next(changed)  # type: ignore[attr-defined]
+    return SimulationResult(name, polls, tuple(latencies))
+
+
+class FixedInterval:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+
+    def next(self, changed: bool) -> float:
+        return self.interval
+
+
+def synthetic_releases(
+    weeks: int, start: float, seed: int = 0, stray: float = 0.1
+) -> list[float]:
+    """Releases clustered around two weekly windows, plus a few strays.
+
+    Most land on Tuesday 17:00 and Thursday 18:00 UTC, give or take about
+    20 minutes.  A fraction ``stray`` land at random times.
+    """
+    rng = random.Random(seed)
+    base = start - (start - _EPOCH_MONDAY) % WEEK
+    windows = (1 * 86400 + 17 * 3600, 3 * 86400 + 18 * 3600)
+    releases = []
+    for week in range(weeks):
+        for window in windows:
+            for _ in range(rng.randint(1, 3)):
+                releases.append(base + week * WEEK + window + rng.gauss(0, 1200))
+        if rng.random() < stray * 4:
+            releases.append(base + week * WEEK + rng.uniform(0, WEEK))
+    return sorted(r for r in releases if r >= start)
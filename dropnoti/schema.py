@@ -0,0 +1,119 @@
+"""Typed view of the drops JSON schema.
+
+``latest_r6.json`` decodes into a :class:`DropsSnapshot` holding compact
+:class:`Card` objects instead of dicts.  The workflow's jq fallbacks
+(``.title // "Untitled"``, ``.timeframe // "Time N/A"``, ``.count // 0``)
+and whitespace normalization are applied while decoding, so later stages can
+read ``card.title`` without re-checking it.
+
+Decoding is :func:`json.loads` followed by a pass building ``__slots__``
+objects, so it is slower than ``json.loads`` alone; in exchange identical
+cards are shared and the result retains far less memory.  Fields the scraper
+adds beyond the ones below are ignored.  Decoded cards should be treated as
+read-only.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+from .message import NO_TIMEFRAME, SEPARATOR, UNTITLED, clean_field
+
+
+class Card:
+    """One drop campaign card."""
+
+    __slots__ = ("title", "timeframe")
+
+    def __init__(self, title: Any = None, timeframe: Any = None) -> None:
+        self.title = clean_field(title, UNTITLED)
+        self.timeframe = clean_field(timeframe, NO_TIMEFRAME)
+
+    @property
+    def line(self) -> str:
+        return f"{self.title}{SEPARATOR}{self.timeframe}"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Card):
+            return NotImplemented
+        return (self.title, self.timeframe) == (other.title, other.timeframe)
+
+    def __repr__(self) -> str:
+        return f"Card(title={self.title!r}, timeframe={self.timeframe!r})"
+
+
+class DropsSnapshot:
+    """A whole ``latest_<game>.json`` document."""
+
+    __slots__ = ("scraped_at", "count", "cards")
+
+    def __init__(
+        self,
+        scraped_at: str | None = None,
+        count: int | None = None,
+        cards: list[Card] | None = None,
+    ) -> None:
+        self.scraped_at = scraped_at
+        self.count = count or 0
+        self.cards = cards if cards is not None else []
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DropsSnapshot):
+            return NotImplemented
+        return (self.scraped_at, self.count, self.cards) == (
+            other.scraped_at,
+            other.count,
+            other.cards,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"DropsSnapshot(scraped_at={self.scraped_at!r}, "
+            f"count={self.count!r}, cards=<{len(self.cards)} cards>)"
+        )
+
+
+def from_dict(data: Any) -> DropsSnapshot:
+    """Build a snapshot from already decoded JSON, tolerating odd values."""
+    if not isinstance(data, dict):
+        return DropsSnapshot()
+    scraped_at = data.get("scraped_at")
+    count = data.get("count")
+    cards = data.get("cards")
+    # Titles and timeframes repeat a lot; intern the cleaned cards so each
+    # distinct pair is normalized (and stored) once.
+    interned: dict[tuple[Any, Any], Card] = {}
+    decoded = []
+    for card in cards if isinstance(cards, list) else ():
+        if not isinstance(card, dict):
+            continue
+        key = (card.get("title"), card.get("timeframe"))
+        try:
+            obj = interned.get(key)
+        except TypeError:  # unhashable values, e.g. a list as the title
+            obj = Card(*key)
+        if obj is None:
+            obj = interned[key] = Card(*key)
+        decoded.append(obj)
+    return DropsSnapshot(
+        scraped_at=scraped_at if isinstance(scraped_at, str) else None,
+        count=count if isinstance(count, int) and not isinstance(count, bool) else 0,
+        cards=decoded,
+    )
+
+
+def loads(data: bytes | str) -> DropsSnapshot:
+    """Decode a snapshot document."""
+    return from_dict(json.loads(data))
+
+
+def load(path: str | os.PathLike[str] = "latest_r6.json") -> DropsSnapshot:
+    """Decode ``path``; a missing file gives an empty snapshot."""
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+    except FileNotFoundError:
+        return DropsSnapshot()
+    return loads(data)
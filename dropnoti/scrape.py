@@ -0,0 +1,294 @@
+"""Fetch drop pages concurrently and write ``latest_r6.json``.
+
+:class:`Scraper` fetches every page URL at once, through one keep-alive
+:class:`~dropnoti.http.ConnectionPool` per origin, so each host sees at most
+``per_host`` connections however many pages it serves.  Validators from the
+last run (``ETag``/``Last-Modified``) are kept on disk in a
+:class:`ValidatorCache` together with the cards parsed from each page, and
+sent back as ``If-None-Match``/``If-Modified-Since``.  A ``304`` reuses the
+cached cards without reading or parsing a body, and when every page answers
+``304`` the snapshot does not need rewriting at all.
+
+Pages are turned into cards by a :data:`Parser`.  The default one from
+:func:`page_parser` reads JSON pages that already list ``{"title",
+"timeframe"}`` cards and runs anything else through a
+:class:`~dropnoti.extract.CardExtractor`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Iterable, Sequence
+from urllib.parse import urlsplit
+
+from . import canonical
+from .extract import CardExtractor
+from .files import write_json
+from .http import ConnectionPool, HTTPError
+
+CACHE_PATH = ".dropnoti/scrape-cache.json"
+CACHE_VERSION = 1
+DEFAULT_PER_HOST = 4
+USER_AGENT = "dropnoti"
+
+Card = dict[str, Any]
+Parser = Callable[[bytes], list[Card]]
+PageHandler = Callable[["PageResult"], Awaitable[None]]
+
+
+class ScrapeError(Exception):
+    """A page could not be fetched and there are no cached cards for it."""
+
+
+def parse_json(body: bytes) -> list[Card]:
+    """Cards from a JSON page: a list of cards or a snapshot with ``cards``."""
+    data = json.loads(body)
+    if isinstance(data, dict):
+        data = data.get("cards") or []
+    if not isinstance(data, list):
+        raise ValueError("expected a list of cards")
+    return [
+        {"title": card.get("title"), "timeframe": card.get("timeframe")}
+        for card in data
+        if isinstance(card, dict)
+    ]
+
+
+def page_parser(extractor: CardExtractor | None = None) -> Parser:
+    """A parser for JSON card lists and, through ``extractor``, HTML pages."""
+    html = extractor or CardExtractor()
+
+    def parse(body: bytes) -> list[Card]:
+        if body.lstrip()[:1] in (b"{", b"["):
+            return parse_json(body)
+        return html.extract(body)
+
+    return parse
+
+
+@dataclass(slots=True)
+class CachedPage:
+    etag: str | None = None
+    last_modified: str | None = None
+    cards: list[Card] = field(default_factory=list)
+
+
+class ValidatorCache:
+    """Validators and parsed cards of every page, saved as JSON at ``path``."""
+
+    def __init__(self, path: str | os.PathLike[str] = CACHE_PATH) -> None:
+        self.path = os.fspath(path)
+        self.pages: dict[str, CachedPage] = {}
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+            for url, page in data.get("pages", {}).items():
+                self.pages[url] = CachedPage(
+                    page.get("etag"), page.get("last_modified"), list(page["cards"])
+                )
+
+    def get(self, url: str) -> CachedPage | None:
+        return self.pages.get(url)
+
+    def save(self) -> None:
+        """Atomically replace the file at :attr:`path`."""
+        data = {
+            "version": CACHE_VERSION,
+            "pages": {
+                url: {
+                    "etag": page.etag,
+                    "last_modified": page.last_modified,
+                    "cards": page.cards,
+                }
+                for url, page in self.pages.items()
+            },
+        }
+        write_json(self.path, data)
+
+
+@dataclass(slots=True)
+class PageResult:
+    """How one page was fetched.
+
+    ``status`` is ``None`` when the request failed; ``error`` then says why
+    and ``cards`` are the cached ones, if any.
+    """
+
+    url: str
+    status: int | None
+    cards: list[Card]
+    seconds: float
+    error: str | None = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+@dataclass(slots=True)
+class ScrapeResult:
+    pages: list[PageResult]
+    scraped_at: str
+
+    @property
+    def cards(self) -> list[Card]:
+        return [card for page in self.pages for card in page.cards]
+
+    @property
+    def changed(self) -> bool:
+        """Whether any page came back with a new body."""
+        return any(page.status == 200 for page in self.pages)
+
+    @property
+    def failed(self) -> list[PageResult]:
+        return [page for page in self.pages if page.error is not None]
+
+    def snapshot(self) -> dict[str, Any]:
+        cards = self.cards
+        return {"scraped_at": self.scraped_at, "count": len(cards), "cards": cards}
+
+
+class Scraper:
+    """Fetch pages with conditional requests, at most ``per_host`` at a time."""
+
+    def __init__(
+        self,
+        parse: Parser | None = None,
+        cache: ValidatorCache | None = None,
+        per_host: int = DEFAULT_PER_HOST,
+        timeout: float = 30.0,
+    ) -> None:
+        self.parse = parse or page_parser()
+        self.cache = cache
+        self.per_host = per_host
+        self.timeout = timeout
+        self._pools: dict[str, ConnectionPool] = {}
+
+    async def __aenter__(self) -> "Scraper":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            await pool.close()
+
+    @property
+    def connections_opened(self) -> int:
+        return sum(pool.connections_opened for pool in self._pools.values())
+
+    async def scrape(
+        self, urls: Sequence[str], on_page: PageHandler | None = None
+    ) -> ScrapeResult:
+        """Fetch every page in ``urls``; cards keep the order of ``urls``.
+
+        ``on_page`` is awaited with each page in that order as soon as it
+        and every page before it are done, so consumers can start on the
+        first pages while later ones are still downloading.
+
+        Raises :class:`ScrapeError` when a page fails without cached cards
+        to fall back on, since a snapshot missing it would read as every
+        one of its campaigns ending.
+        """
+        scraped_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        tasks = [asyncio.ensure_future(self.fetch(url)) for url in urls]
+        pages = []
+        try:
+            for task in tasks:
+                page = await task
+                if page.error is not None and self._cached(page.url) is None:
+                    raise ScrapeError(f"{page.url}: {page.error}")
+                pages.append(page)
+                if on_page is not None:
+                    await on_page(page)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let cancelled fetches finish before their pools are closed.
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return ScrapeResult(pages, scraped_at)
+
+    async def fetch(self, url: str) -> PageResult:
+        """Fetch and parse one page, or reuse its cached cards on ``304``."""
+        start = time.perf_counter()
+        cached = self._cached(url)
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {"User-Agent": USER_AGENT}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        try:
+            pool = self._pool(f"{parts.scheme}://{parts.netloc}")
+            response = await pool.request("GET", path, headers=headers)
+            if response.status == 304 and cached is not None:
+                return PageResult(url, 304, cached.cards, time.perf_counter() - start)
+            if response.status != 200:
+                raise HTTPError(f"HTTP {response.status}")
+            cards = self.parse(response.body)
+        except (OSError, asyncio.TimeoutError, HTTPError, ValueError) as exc:
+            return self._failed(url, cached, exc, start)
+        if self.cache is not None:
+            validators = response.headers.get("etag"), response.headers.get(
+                "last-modified"
+            )
+            self.cache.pages[url] = CachedPage(*validators, cards)
+        return PageResult(url, 200, cards, time.perf_counter() - start)
+
+    def _cached(self, url: str) -> CachedPage | None:
+        return self.cache.get(url) if self.cache is not None else None
+
+    def _failed(
+        self, url: str, cached: CachedPage | None, exc: Exception, start: float
+    ) -> PageResult:
+        error = str(exc) or type(exc).__name__
+        cards = cached.cards if cached is not None else []
+        return PageResult(url, None, cards, time.perf_counter() - start, error)
+
+    def _pool(self, origin: str) -> ConnectionPool:
+        pool = self._pools.get(origin)
+        if pool is None:
+            pool = self._pools[origin] = ConnectionPool(
+                origin, max_connections=self.per_host, timeout=self.timeout
+            )
+        return pool
+
+
+def write_snapshot(snapshot: dict[str, Any], path: str | os.PathLike[str]) -> None:
+    """Atomically write ``snapshot`` to ``path`` in canonical form."""
+    canonical.write(snapshot, path)
+
+
+async def scrape_to(
+    urls: Iterable[str],
+    output: str | os.PathLike[str],
+    cache: ValidatorCache | None = None,
+    parse: Parser | None = None,
+    per_host: int = DEFAULT_PER_HOST,
+    on_page: PageHandler | None = None,
+) -> ScrapeResult:
+    """Scrape ``urls`` into the snapshot at ``output``.
+
+    The snapshot is left alone when every page was unchanged and it exists;
+    the cache, if any, is saved either way.  ``on_page`` is passed on to
+    :meth:`Scraper.scrape`.
+    """
+    async with Scraper(parse, cache, per_host) as scraper:
+        result = await scraper.scrape(list(urls), on_page)
+    if result.changed or not os.path.exists(output):
+        write_snapshot(result.snapshot(), output)
+    if cache is not None:
+        cache.save()
+    return result
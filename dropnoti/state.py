@@ -0,0 +1,259 @@
+"""Persisted index of campaigns that have already been announced.
+
+A campaign is identified by its normalized title and timeframe.  The index
+keeps those identities in a set, so checking a card against the previous run
+is a constant-time lookup, and :func:`diff` turns two indexes into the
+additions, removals and timeframe changes worth notifying about.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple
+
+from .dedupe import normalize_key
+from .files import write_json
+from .message import (
+    DEFAULT_TEMPLATE,
+    NO_TIMEFRAME,
+    PREVIEW_LIMIT,
+    SEPARATOR,
+    UNTITLED,
+    Message,
+    Template,
+    card_field,
+    format_as_of,
+)
+from .stream import iter_events
+
+log = logging.getLogger(__name__)
+
+STATE_VERSION = 2
+STATE_PATH = ".dropnoti/state.json"
+
+
+class Campaign(NamedTuple):
+    title: str
+    timeframe: str
+
+    @classmethod
+    def from_card(cls, card: Mapping[str, Any]) -> "Campaign":
+        return cls(
+            card_field(card, "title", UNTITLED),
+            card_field(card, "timeframe", NO_TIMEFRAME),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.title}{SEPARATOR}{self.timeframe}"
+
+    @property
+    def title_key(self) -> str:
+        return normalize_key(self.title)
+
+    @property
+    def key(self) -> str:
+        """Stable identity: normalized title and timeframe."""
+        return f"{self.title_key}\x1f{normalize_key(self.timeframe)}"
+
+
+class SeenIndex:
+    """Campaigns keyed by :attr:`Campaign.key`."""
+
+    __slots__ = ("campaigns",)
+
+    def __init__(self, campaigns: Iterable[Campaign] = ()) -> None:
+        self.campaigns: dict[str, Campaign] = {}
+        for campaign in campaigns:
+            self.add(campaign)
+
+    def add(self, campaign: Campaign) -> None:
+        self.campaigns.setdefault(campaign.key, campaign)
+
+    def add_card(self, card: Any) -> None:
+        if isinstance(card, Mapping):
+            self.add(Campaign.from_card(card))
+
+    def __contains__(self, campaign: object) -> bool:
+        return isinstance(campaign, Campaign) and campaign.key in self.campaigns
+
+    def __len__(self) -> int:
+        return len(self.campaigns)
+
+    def __iter__(self) -> Iterator[Campaign]:
+        return iter(self.campaigns.values())
+
+    def to_json(self) -> list[list[str]]:
+        return sorted([c.title, c.timeframe] for c in self.campaigns.values())
+
+
+@dataclass(frozen=True, slots=True)
+class CampaignDiff:
+    added: tuple[Campaign, ...] = ()
+    removed: tuple[Campaign, ...] = ()
+    changed: tuple[tuple[Campaign, Campaign], ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def items(self) -> list[tuple[Campaign, str]]:
+        """Each change as the campaign it concerns and its display line."""
+        return [
+            *((c, f"New: {c}") for c in self.added),
+            *(
+                (new, f"Changed: {old} → {new.timeframe}")
+                for old, new in self.changed
+            ),
+            *((c, f"Ended: {c}") for c in self.removed),
+        ]
+
+    def lines(self) -> list[str]:
+        """One display line per change: new, then changed, then ended."""
+        return [line for _, line in self.items()]
+
+
+def diff(old: SeenIndex, new: SeenIndex) -> CampaignDiff:
+    """Compare two indexes.
+
+    A campaign that disappears while another one with the same title shows up
+    is reported as a timeframe change rather than a removal plus an addition.
+    """
+    old_keys = old.campaigns.keys()
+    new_keys = new.campaigns.keys()
+    gone: dict[str, list[Campaign]] = {}
+    for key in old_keys - new_keys:
+        campaign = old.campaigns[key]
+        gone.setdefault(campaign.title_key, []).append(campaign)
+    for same_title in gone.values():
+        same_title.sort(reverse=True)
+
+    added: list[Campaign] = []
+    changed: list[tuple[Campaign, Campaign]] = []
+    for key in new_keys - old_keys:
+        campaign = new.campaigns[key]
+        previous = gone.get(campaign.title_key)
+        if previous:
+            changed.append((previous.pop(), campaign))
+        else:
+            added.append(campaign)
+    removed = [c for same_title in gone.values() for c in same_title]
+    return CampaignDiff(
+        tuple(sorted(added)), tuple(sorted(removed)), tuple(sorted(changed))
+    )
+
+
+@dataclass(slots=True)
+class State:
+    """What was last delivered: its campaigns and the snapshot's content hash."""
+
+    index: SeenIndex
+    content_hash: str | None = None
+
+
+def load_state(path: str | os.PathLike[str] = STATE_PATH) -> State | None:
+    """Load the state saved by :func:`save_state`, or ``None`` if there is none.
+
+    A file that cannot be read as a state (truncated, say) is logged and
+    treated as missing, so the run starts over instead of failing on every
+    schedule until someone deletes it.
+    """
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except ValueError as exc:
+        log.warning("ignoring unreadable state file %s: %s", os.fspath(path), exc)
+        return None
+    if not isinstance(data, dict) or data.get("version") not in (1, STATE_VERSION):
+        return None
+    try:
+        index = SeenIndex(Campaign(*pair) for pair in data.get("campaigns", ()))
+    except (TypeError, AttributeError) as exc:
+        log.warning("ignoring malformed state file %s: %s", os.fspath(path), exc)
+        return None
+    return State(index, data.get("content_hash"))
+
+
+def save_state(state: State, path: str | os.PathLike[str] = STATE_PATH) -> None:
+    """Atomically replace the state file at ``path``."""
+    data = {
+        "version": STATE_VERSION,
+        "content_hash": state.content_hash,
+        "campaigns": state.index.to_json(),
+    }
+    write_json(path, data)
+
+
+def read_snapshot_index(
+    path: str | os.PathLike[str],
+) -> tuple[dict[str, Any], SeenIndex]:
+    """Stream ``path`` into a :class:`SeenIndex` plus its header fields."""
+    header: dict[str, Any] = {}
+    index = SeenIndex()
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for key, value in iter_events(fh):
+                if key == "cards.item":
+                    index.add_card(value)
+                elif key in ("count", "scraped_at"):
+                    header[key] = value
+    except FileNotFoundError:
+        pass
+    return header, index
+
+
+def read_changes(
+    snapshot: str | os.PathLike[str], previous: SeenIndex | None
+) -> tuple[dict[str, Any], CampaignDiff, SeenIndex]:
+    """Diff ``snapshot`` against ``previous``.
+
+    Returns the snapshot's header fields, the changes and the snapshot's
+    own index.  Without a previous index every campaign counts as new.
+    """
+    header, current = read_snapshot_index(snapshot)
+    return header, diff(previous or SeenIndex(), current), current
+
+
+def changes_message(
+    snapshot: str | os.PathLike[str],
+    previous: SeenIndex | None,
+    limit: int | None = PREVIEW_LIMIT,
+    template: Template = DEFAULT_TEMPLATE,
+) -> tuple[Message | None, SeenIndex]:
+    """Build a message listing only what changed since ``previous``.
+
+    Returns ``None`` instead of a message when nothing changed, together
+    with the snapshot's index so the caller can save it after a successful
+    send.  Without a previous index every campaign counts as new.
+    """
+    header, changes, current = read_changes(snapshot, previous)
+    return message_for_changes(header, changes, limit, template), current
+
+
+def message_for_changes(
+    header: Mapping[str, Any],
+    changes: CampaignDiff,
+    limit: int | None = PREVIEW_LIMIT,
+    template: Template = DEFAULT_TEMPLATE,
+) -> Message | None:
+    """The message listing ``changes``, or ``None`` when there are none.
+
+    The count is that of the changes, so a snapshot whose campaigns all
+    ended still lists them.
+    """
+    if not changes:
+        return None
+    lines = changes.lines()
+    return Message(
+        count=len(lines),
+        as_of=format_as_of(header.get("scraped_at")),
+        preview=tuple(lines[:limit]),
+        total=len(lines),
+        template=template,
+    )
@@ -0,0 +1,141 @@
+"""Incremental reader for ``latest_r6.json``.
+
+``json.load`` materialises the whole ``cards`` array before anything can look
+at it.  :func:`iter_events` instead walks the top-level object and yields the
+elements of large arrays one at a time, so a consumer only ever holds the card
+it is working on plus a read buffer of ``chunk_size`` characters.
+
+Events are ``(key, value)`` pairs, loosely following ijson's prefixes:
+
+* ``("scraped_at", "2026-01-06T14:52:40Z")`` for ordinary top-level members,
+* ``("cards.item", {...})`` for each element of a streamed array,
+* ``("cards.end", n)`` once a streamed array is closed, with its length.
+
+Closing the generator early stops reading the file.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import IO, Any, Collection, Iterator
+
+CHUNK_SIZE = 64 * 1024
+STREAM_KEYS = ("cards",)
+
+_WHITESPACE = " \t\n\r"
+_NUMBER = frozenset("0123456789+-.eE")
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    __slots__ = ("fp", "chunk_size", "buf", "pos", "eof")
+
+    def __init__(self, fp: IO[str], chunk_size: int) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        while True:
+            buf, pos, end = self.buf, self.pos, len(self.buf)
+            while pos < end and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < end:
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise json.JSONDecodeError(
+                f"Expected one of {chars!r}", self.buf, self.pos
+            )
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        first = self.peek()
+        if first == "-" or "0" <= first <= "9":
+            # A prefix of a number is often a valid number itself ("1." reads
+            # as 1), so read on until the number visibly ends.
+            while True:
+                buf, end = self.buf, self.pos
+                while end < len(buf) and buf[end] in _NUMBER:
+                    end += 1
+                if end < len(buf) or not self.fill():
+                    break
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+
+def iter_events(
+    fp: IO[str],
+    stream_keys: Collection[str] = STREAM_KEYS,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[tuple[str, Any]]:
+    """Yield ``(key, value)`` events for the top-level object in ``fp``.
+
+    Arrays under ``stream_keys`` are yielded element by element; every other
+    member is decoded whole.  A document whose top level is not an object
+    yields nothing.
+    """
+    reader = _Reader(fp, chunk_size)
+    if reader.peek() != "{":
+        reader.value()
+        return
+    reader.pos += 1
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expected member name", reader.buf, reader.pos)
+        reader.expect(":")
+        if key in stream_keys and reader.peek() == "[":
+            reader.pos += 1
+            n = 0
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield f"{key}.item", reader.value()
+                    n += 1
+                    if reader.expect(",]") == "]":
+                        break
+            yield f"{key}.end", n
+        else:
+            yield key, reader.value()
+        if reader.expect(",}") == "}":
+            return
+
+
+def iter_cards(fp: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of the top-level ``cards`` array one at a time."""
+    for key, value in iter_events(fp, ("cards",), chunk_size):
+        if key == "cards.item":
+            yield value
+        elif key == "cards.end":
+            return
@@ -0,0 +1,237 @@
+"""Subscribers with keyword and game filters, matched through an inverted index.
+
+Each subscriber is a chat with optional keywords, excluded keywords and
+games.  A keyword is one or more words; it matches a campaign whose title
+contains all of them, compared by :func:`~dropnoti.dedupe.normalize_key`
+tokens.  A campaign is sent when any keyword matches and no excluded one
+does.  No keywords means every campaign, and no games means every game.
+
+:class:`SubscriberIndex` maps each keyword's most selective-looking token
+(its longest) to the subscribers using it.  Matching a title only looks at
+the postings of the title's own tokens, so matching ``c`` cards costs
+``O(c + matches)`` instead of ``O(c × subscribers)``.
+:class:`~dropnoti.rules.RuleSet` evaluates the same rules as bitsets.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Iterator, Protocol, Sequence
+
+from .dedupe import normalize_key
+from .files import write_json
+from .message import DEFAULT_TEMPLATE, Message, Template
+from .state import Campaign
+
+if TYPE_CHECKING:
+    from .rules import RuleSet
+
+SUBSCRIBERS_PATH = ".dropnoti/subscribers.json"
+SUBSCRIBERS_VERSION = 1
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized word tokens of ``text``."""
+    return _TOKEN.findall(normalize_key(text))
+
+
+def phrases(keywords: Iterable[str]) -> list[tuple[str, ...]]:
+    """The distinct tokens of each keyword, skipping keywords without any."""
+    return [tuple(dict.fromkeys(tokens)) for k in keywords if (tokens := tokenize(k))]
+
+
+class Matcher(Protocol):
+    """Maps card titles to the chats interested in them."""
+
+    def __len__(self) -> int: ...
+
+    def match(self, titles: Sequence[str]) -> dict[str, list[int]]: ...
+
+
+@dataclass(frozen=True, slots=True)
+class Subscriber:
+    chat_id: str
+    keywords: tuple[str, ...] = ()
+    games: tuple[str, ...] = ()
+    excludes: tuple[str, ...] = ()
+
+    def wants_game(self, game: str | None) -> bool:
+        return not self.games or game is None or game in self.games
+
+    def matches(self, title: str) -> bool:
+        """Check one title directly, without an index."""
+        tokens = set(tokenize(title))
+        if any(set(p) <= tokens for p in phrases(self.excludes)):
+            return False
+        includes = phrases(self.keywords)
+        return not includes or any(set(p) <= tokens for p in includes)
+
+
+class SubscriberStore:
+    """Subscribers keyed by chat, saved as JSON at ``path``."""
+
+    def __init__(self, path: str | os.PathLike[str] = SUBSCRIBERS_PATH) -> None:
+        self.path = os.fspath(path)
+        self.subscribers: dict[str, Subscriber] = {}
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return
+        if isinstance(data, dict) and data.get("version") == SUBSCRIBERS_VERSION:
+            for item in data.get("subscribers", ()):
+                self.add(
+                    Subscriber(
+                        str(item["chat_id"]),
+                        tuple(item.get("keywords", ())),
+                        tuple(item.get("games", ())),
+                        tuple(item.get("excludes", ())),
+                    )
+                )
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+    def __iter__(self) -> Iterator[Subscriber]:
+        return iter(self.subscribers.values())
+
+    def add(self, subscriber: Subscriber) -> None:
+        """Add ``subscriber``, replacing any earlier filters of the same chat."""
+        self.subscribers[subscriber.chat_id] = subscriber
+
+    def remove(self, chat_id: str) -> bool:
+        return self.subscribers.pop(chat_id, None) is not None
+
+    def index(self, game: str | None = None) -> "SubscriberIndex":
+        return SubscriberIndex(self, game)
+
+    def rules(self, game: str | None = None) -> RuleSet:
+        from .rules import RuleSet
+
+        return RuleSet(self, game)
+
+    def save(self) -> None:
+        """Atomically replace the file at :attr:`path`."""
+        data = {
+            "version": SUBSCRIBERS_VERSION,
+            "subscribers": [
+                {
+                    "chat_id": s.chat_id,
+                    "keywords": s.keywords,
+                    "games": s.games,
+                    "excludes": s.excludes,
+                }
+                for s in self.subscribers.values()
+            ],
+        }
+        write_json(self.path, data)
+
+
+class SubscriberIndex:
+    """Inverted index from title tokens to the subscribers of one game."""
+
+    __slots__ = ("chat_ids", "_postings", "_blocks", "_everything")
+
+    def __init__(
+        self, subscribers: Iterable[Subscriber], game: str | None = None
+    ) -> None:
+        self.chat_ids: list[str] = []
+        # token -> [(subscriber number, the other tokens its keyword needs)]
+        self._postings: dict[str, list[tuple[int, frozenset[str]]]] = {}
+        # The same for excluded keywords.
+        self._blocks: dict[str, list[tuple[int, frozenset[str]]]] = {}
+        self._everything: list[int] = []
+        for subscriber in subscribers:
+            if not subscriber.wants_game(game):
+                continue
+            number = len(self.chat_ids)
+            self.chat_ids.append(subscriber.chat_id)
+            for tokens in phrases(subscriber.excludes):
+                _post(self._blocks, number, tokens)
+            includes = phrases(subscriber.keywords)
+            if not includes:
+                self._everything.append(number)
+            for tokens in includes:
+                _post(self._postings, number, tokens)
+
+    def __len__(self) -> int:
+        return len(self.chat_ids)
+
+    def match(self, titles: Sequence[str]) -> dict[str, list[int]]:
+        """Map each interested chat to the positions of its ``titles``."""
+        matches: dict[int, list[int]] = {}
+        postings = self._postings
+        blocks = self._blocks
+        everyone = set(self._everything) if blocks else set()
+        # Positions hidden from subscribers who otherwise get everything.
+        hidden: dict[int, set[int]] = {}
+        for position, title in enumerate(titles):
+            tokens = set(tokenize(title))
+            blocked: set[int] = set()
+            if blocks:
+                for token in tokens:
+                    for number, rest in blocks.get(token, ()):
+                        if rest <= tokens:
+                            blocked.add(number)
+                for number in blocked & everyone:
+                    hidden.setdefault(number, set()).add(position)
+            hit: set[int] = set()
+            for token in tokens:
+                for number, rest in postings.get(token, ()):
+                    if number not in hit and number not in blocked and rest <= tokens:
+                        hit.add(number)
+                        matches.setdefault(number, []).append(position)
+        result = {self.chat_ids[n]: positions for n, positions in matches.items()}
+        if self._everything and titles:
+            every = list(range(len(titles)))
+            for number in self._everything:
+                skip = hidden.get(number)
+                positions = [p for p in every if p not in skip] if skip else every
+                if positions:
+                    result[self.chat_ids[number]] = positions
+        return result
+
+
+def _post(
+    postings: dict[str, list[tuple[int, frozenset[str]]]],
+    number: int,
+    tokens: tuple[str, ...],
+) -> None:
+    key = max(tokens, key=len)
+    postings.setdefault(key, []).append((number, frozenset(tokens) - {key}))
+
+
+def fan_out(
+    index: Matcher,
+    items: Sequence[tuple[Campaign, str]],
+    as_of: str,
+    limit: int | None = None,
+    template: Template = DEFAULT_TEMPLATE,
+) -> dict[str, Message]:
+    """One message per interested chat, listing the ``items`` it matched.
+
+    ``items`` pairs each campaign with its display line, as
+    :meth:`~dropnoti.state.CampaignDiff.items` does.
+    """
+    matched = index.match([campaign.title for campaign, _ in items])
+    messages = {}
+    # Matchers hand out one shared list to every chat that gets all items.
+    shared: dict[int, Message] = {}
+    for chat_id, positions in matched.items():
+        message = shared.get(id(positions))
+        if message is None:
+            lines = [items[p][1] for p in positions]
+            message = shared[id(positions)] = Message(
+                count=len(lines),
+                as_of=as_of,
+                preview=tuple(lines[:limit]),
+                total=len(lines),
+                template=template,
+            )
+        messages[chat_id] = message
+    return messages
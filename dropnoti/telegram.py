@@ -0,0 +1,243 @@
+"""Asynchronous Telegram Bot API client.
+
+All calls share one :class:`~dropnoti.http.ConnectionPool`, so sending the
+same message to many chats reuses a handful of TLS connections and the
+requests run concurrently.  Sends go through a
+:class:`~dropnoti.ratelimit.RateLimiter` and are rescheduled when Telegram
+answers ``429 Too Many Requests``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, Sequence
+
+from .http import DEFAULT_MAX_CONNECTIONS, DEFAULT_TIMEOUT, ConnectionPool, HTTPError
+from .ratelimit import RateLimiter
+
+API_URL = "https://api.telegram.org"
+MAX_RETRIES = 3
+
+
+@dataclass(frozen=True, slots=True)
+class ApiResult:
+    """The outcome of one Bot API call."""
+
+    method: str
+    status: int
+    payload: dict[str, Any]
+    latency: float
+    chat_id: str | None = None
+    attempts: int = 1
+    waited: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and bool(self.payload.get("ok"))
+
+    @property
+    def result(self) -> Any:
+        return self.payload.get("result")
+
+    @property
+    def description(self) -> str:
+        return str(self.payload.get("description", ""))
+
+    @property
+    def retry_after(self) -> float | None:
+        """The ``retry_after`` hint of a ``429`` reply, in seconds."""
+        if self.status != 429:
+            return None
+        parameters = self.payload.get("parameters")
+        if isinstance(parameters, dict) and "retry_after" in parameters:
+            try:
+                return float(parameters["retry_after"])
+            except (TypeError, ValueError):
+                pass
+        return 1.0
+
+    @property
+    def not_modified(self) -> bool:
+        """An edit rejected because the text was already the same."""
+        return self.status == 400 and "message is not modified" in self.description
+
+    @property
+    def message_id(self) -> int | None:
+        result = self.result
+        if isinstance(result, dict):
+            return result.get("message_id")
+        return None
+
+
+def parse_chat_ids(value: str) -> list[str]:
+    """Split a ``TELEGRAM_CHAT_ID`` value on commas and whitespace."""
+    return [part for part in value.replace(",", " ").split() if part]
+
+
+class TelegramClient:
+    """Send Bot API requests over a pooled keep-alive connection set.
+
+    Use as an async context manager so pooled connections get closed::
+
+        async with TelegramClient(token) as client:
+            results = await client.send_many(chat_ids, text)
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = API_URL,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT,
+        limiter: RateLimiter | None = None,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        self._token = token
+        self.pool = ConnectionPool(base_url, max_connections, timeout)
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_retries = max_retries
+
+    async def __aenter__(self) -> "TelegramClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def call(
+        self, method: str, params: dict[str, Any], chat_id: str | None = None
+    ) -> ApiResult:
+        """Call ``method`` with JSON ``params`` and time the round trip.
+
+        Network errors are reported as a result with status ``0`` rather than
+        raised, so one failing chat does not abort a fan-out.
+        """
+        body = json.dumps(params, ensure_ascii=False).encode("utf-8")
+        start = time.perf_counter()
+        try:
+            response = await self.pool.request(
+                "POST",
+                f"/bot{self._token}/{method}",
+                body,
+                {"Content-Type": "application/json"},
+            )
+        except (
+            OSError,
+            HTTPError,
+            asyncio.TimeoutError,
+            asyncio.IncompleteReadError,
+        ) as exc:
+            return ApiResult(
+                method,
+                0,
+                {"ok": False, "description": f"{type(exc).__name__}: {exc}"},
+                time.perf_counter() - start,
+                chat_id,
+            )
+        latency = time.perf_counter() - start
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            payload = {
+                "ok": False,
+                "description": response.body[:200].decode("utf-8", "replace"),
+            }
+        return ApiResult(method, response.status, payload, latency, chat_id)
+
+    async def send_message(
+        self,
+        chat_id: str,
+        text: str,
+        disable_web_page_preview: bool = True,
+        **params: Any,
+    ) -> ApiResult:
+        params.update(
+            chat_id=chat_id,
+            text=text,
+            disable_web_page_preview=disable_web_page_preview,
+        )
+        return await self.call_for_chat("sendMessage", params, chat_id)
+
+    async def edit_message_text(
+        self,
+        chat_id: str,
+        message_id: int,
+        text: str,
+        disable_web_page_preview: bool = True,
+        **params: Any,
+    ) -> ApiResult:
+        params.update(
+            chat_id=chat_id,
+            message_id=message_id,
+            text=text,
+            disable_web_page_preview=disable_web_page_preview,
+        )
+        return await self.call_for_chat("editMessageText", params, chat_id)
+
+    async def delete_message(self, chat_id: str, message_id: int) -> ApiResult:
+        return await self.call_for_chat(
+            "deleteMessage", {"chat_id": chat_id, "message_id": message_id}, chat_id
+        )
+
+    async def call_for_chat(
+        self, method: str, params: dict[str, Any], chat_id: str
+    ) -> ApiResult:
+        """Call ``method`` for ``chat_id`` within the rate limits.
+
+        A ``429`` reply blocks only this chat for its ``retry_after`` and the
+        call is retried, up to ``max_retries`` times.  ``latency`` is the
+        round trip of the last attempt; time spent queued for the limiter is
+        reported separately as ``waited``.
+        """
+        attempts = 0
+        waited = 0.0
+        while True:
+            waited += await self.limiter.acquire(chat_id)
+            result = await self.call(method, params, chat_id)
+            attempts += 1
+            retry_after = result.retry_after
+            if retry_after is None or attempts > self.max_retries:
+                break
+            self.limiter.retry_after(chat_id, retry_after)
+        return replace(result, attempts=attempts, waited=waited)
+
+    async def send_many(
+        self, chat_ids: Iterable[str], text: str, **params: Any
+    ) -> list[ApiResult]:
+        """Send ``text`` to every chat concurrently, in ``chat_ids`` order."""
+        return list(
+            await asyncio.gather(
+                *(self.send_message(chat_id, text, **params) for chat_id in chat_ids)
+            )
+        )
+
+    async def send_pages(
+        self, chat_id: str, pages: Sequence[str], **params: Any
+    ) -> list[ApiResult]:
+        """Send ``pages`` to one chat in order, stopping at the first failure."""
+        results = []
+        for page in pages:
+            result = await self.send_message(chat_id, page, **params)
+            results.append(result)
+            if not result.ok:
+                break
+        return results
+
+    async def send_pages_many(
+        self, chat_ids: Iterable[str], pages: Sequence[str], **params: Any
+    ) -> list[ApiResult]:
+        """:meth:`send_pages` to every chat concurrently.
+
+        Results are grouped by chat, in ``chat_ids`` order.
+        """
+        per_chat = await asyncio.gather(
+            *(self.send_pages(chat_id, pages, **params) for chat_id in chat_ids)
+        )
+        return [result for results in per_chat for result in results]
@@ -0,0 +1,322 @@
+"""Turn a card's free-text ``timeframe`` into UTC start/end epochs.
+
+Scraped timeframes come in a handful of shapes::
+
+    Jan 6 - Jan 13
+    Fri, Jan 9, 6:00 PM - Sun, Jan 11, 2026, 11:59 PM UTC
+    6 January 2026 – 13 January 2026
+    2026-01-06T18:00:00Z - 2026-01-13T17:59:00Z
+    01/06 - 01/13
+    Ends Jan 13
+
+The date patterns are compiled once at import time, and :func:`parse` is
+memoized because the same strings come back on every run.  Anything that
+yields no date at all is reported as unparseable (:attr:`Timeframe.ok` is
+false) instead of raising.  Dates without a year get the earliest year in
+which they had not ended a month before ``today`` (normally the day of the
+snapshot's ``scraped_at``), so "Dec 28 - Jan 4" scraped on January 2
+starts in the previous year and "Jan 2 - Jan 9" scraped on December 30 in
+the next one.  Missing times default to the start of the first day and the
+end of the last day.  Without a time zone, UTC is assumed.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple
+
+from .message import NO_TIMEFRAME, normalize_space
+
+CACHE_SIZE = 4096
+# How long after its end a campaign may still be listed on a drop page.
+RECENTLY_ENDED = timedelta(days=31)
+
+_MONTHS = {
+    name: i
+    for i, name in enumerate(
+        "jan feb mar apr may jun jul aug sep oct nov dec".split(), start=1
+    )
+}
+# Offsets from UTC in minutes for the abbreviations drop pages tend to use.
+_ZONES = {
+    **dict.fromkeys(("utc", "gmt", "z"), 0),
+    **{"bst": 60, "cet": 60, "cest": 120, "eet": 120, "eest": 180},
+    **{"est": -300, "edt": -240, "cst": -360, "cdt": -300},
+    **{"mst": -420, "mdt": -360, "pst": -480, "pdt": -420},
+    **{"jst": 540, "kst": 540, "aest": 600},
+}
+
+_WEEKDAY = r"(?:(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?,?\s+)?"
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+
+
+def _time(tag: str) -> str:
+    return (
+        rf"(?P<h{tag}>\d{{1,2}})"
+        rf"(?:(?::(?P<min{tag}>\d{{2}})(?::\d{{2}})?)\s*(?P<ap{tag}>[ap]\.?m\.?)?"
+        rf"|\s*(?P<ap2{tag}>[ap]\.?m\.?))"
+    )
+
+
+_POINT = re.compile(
+    "|".join(
+        (
+            r"(?P<iso>(?P<iy>\d{4})-(?P<im>\d{1,2})-(?P<id>\d{1,2})"
+            r"(?:[T\s]+(?P<ih>\d{1,2}):(?P<imin>\d{2})(?::\d{2}(?:\.\d+)?)?)?"
+            r"(?P<itz>Z|[+-]\d{2}:?\d{2})?)",
+            rf"(?P<mdy>{_WEEKDAY}(?P<m1>{_MONTH})\s+"
+            rf"(?P<d1>\d{{1,2}})(?:st|nd|rd|th)?\b"
+            rf"(?:,?\s+(?P<y1>\d{{4}}))?(?:,?\s+(?:at\s+)?{_time('1')})?)",
+            rf"(?P<dmy>{_WEEKDAY}(?P<d2>\d{{1,2}})(?:st|nd|rd|th)?\s+"
+            rf"(?P<m2>{_MONTH})"
+            # Not when a day follows the month: "Season 2 Jan 6" is Jan 6.
+            r"(?!\s+\d{1,2}(?:st|nd|rd|th)?\b(?!\s*(?::|[ap]\.?m)))"
+            rf"(?:,?\s+(?P<y2>\d{{4}}))?(?:,?\s+(?:at\s+)?{_time('2')})?)",
+            rf"(?P<num>(?P<n1>\d{{1,2}})[/.](?P<n2>\d{{1,2}})"
+            rf"(?:[/.](?P<n3>\d{{2,4}}))?(?:,?\s+{_time('3')})?)",
+        )
+    ),
+    re.IGNORECASE,
+)
+_SEP = r"\s*(?:-|–|—|to|until|through)\s*"
+_BARE_DAY = re.compile(
+    rf"^{_SEP}(?P<day>\d{{1,2}})(?:,?\s+(?P<year>\d{{4}}))?\b", re.I
+)
+_BARE_TIME = re.compile(rf"^{_SEP}{_time('4')}", re.I)
+_ZONE = re.compile(
+    r"\b(?P<name>[a-z]{1,4})\s*(?P<off>[+-]\d{1,2}(?::?\d{2})?)?\s*\)?\s*$",
+    re.I,
+)
+_END_ONLY = re.compile(r"^\s*(?:ends?|until|through|till)\b", re.I)
+_START_ONLY = re.compile(r"^\s*(?:starts?|from|begins?)\b", re.I)
+
+
+class Timeframe(NamedTuple):
+    """Start and end as UTC epoch seconds; ``None`` where unknown."""
+
+    start: int | None
+    end: int | None
+
+    @property
+    def ok(self) -> bool:
+        return self.start is not None or self.end is not None
+
+
+UNKNOWN = Timeframe(None, None)
+
+
+class _Point(NamedTuple):
+    year: int | None
+    month: int
+    day: int
+    hour: int | None
+    minute: int
+    tz: timezone | None
+
+
+def _hour(match: re.Match[str], tag: str) -> tuple[int | None, int]:
+    hour = match.group(f"h{tag}")
+    if hour is None:
+        return None, 0
+    h = int(hour)
+    minute = int(match.group(f"min{tag}") or 0)
+    ampm = (match.group(f"ap{tag}") or match.group(f"ap2{tag}") or "").lower()
+    if ampm.startswith("p") and h < 12:
+        h += 12
+    elif ampm.startswith("a") and h == 12:
+        h = 0
+    return h, minute
+
+
+def _offset(text: str) -> timezone:
+    sign = -1 if text[0] == "-" else 1
+    digits = text[1:].replace(":", "")
+    hours = int(digits[:-2] or digits) if len(digits) > 2 else int(digits)
+    minutes = int(digits[-2:]) if len(digits) > 2 else 0
+    return timezone(sign * timedelta(hours=hours, minutes=minutes))
+
+
+def _point(match: re.Match[str], day_first: bool = False) -> _Point:
+    if match.group("iso"):
+        tz = match.group("itz")
+        hour = match.group("ih")
+        return _Point(
+            int(match.group("iy")),
+            int(match.group("im")),
+            int(match.group("id")),
+            int(hour) if hour is not None else None,
+            int(match.group("imin") or 0),
+            None if tz is None else timezone.utc if tz in "zZ" else _offset(tz),
+        )
+    if match.group("mdy"):
+        tag = "1"
+    elif match.group("dmy"):
+        tag = "2"
+    else:
+        first, second = int(match.group("n1")), int(match.group("n2"))
+        month_n, day_n = (second, first) if day_first else (first, second)
+        year = match.group("n3")
+        if year is not None and len(year) == 2:
+            year = "20" + year
+        hour, minute = _hour(match, "3")
+        return _Point(
+            int(year) if year else None, month_n, day_n, hour, minute, None
+        )
+    year = match.group(f"y{tag}")
+    hour, minute = _hour(match, tag)
+    return _Point(
+        int(year) if year else None,
+        _MONTHS[match.group(f"m{tag}")[:3].lower()],
+        int(match.group(f"d{tag}")),
+        hour,
+        minute,
+        None,
+    )
+
+
+def _zone(text: str) -> timezone:
+    match = _ZONE.search(text)
+    if match:
+        name = (match.group("name") or "").lower()
+        base = _ZONES.get(name)
+        off = match.group("off")
+        if base is not None:
+            tz = timedelta(minutes=base)
+            if off:
+                tz += _offset(off).utcoffset(None)  # type: ignore[operator]
+            return timezone(tz)
+    return timezone.utc
+
+
+def _epoch(point: _Point, year: int, tz: timezone, end: bool) -> int:
+    if point.hour is None:
+        hour, minute, second = (23, 59, 59) if end else (0, 0, 0)
+    else:
+        hour, minute, second = point.hour, point.minute, 0
+    stamp = datetime(
+        year, point.month, point.day, hour, minute, second, tzinfo=point.tz or tz
+    )
+    return int(stamp.timestamp())
+
+
+def _end_year(first: _Point, second: _Point, start_year: int) -> int:
+    """The year of ``second`` when it has none: the first one not before ``first``."""
+    if (second.month, second.day) < (first.month, first.day):
+        return start_year + 1
+    return start_year
+
+
+def _current_year(first: _Point, second: _Point | None, today: date) -> int:
+    """The start year of the yearless ``first``..``second`` as seen ``today``.
+
+    Drop pages list running and upcoming campaigns, plus ones that just
+    ended, so this is the earliest year whose range ended no more than
+    :data:`RECENTLY_ENDED` before ``today``.
+    """
+    last = second or first
+    for year in (today.year - 1, today.year, today.year + 1):
+        try:
+            end = date(_end_year(first, last, year), last.month, last.day)
+            date(year, first.month, first.day)
+        except ValueError:  # Feb 29 in a common year, or no such day
+            continue
+        if end >= today - RECENTLY_ENDED:
+            return year
+    return today.year
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse(text: str, today: date) -> Timeframe:
+    matches = list(_POINT.finditer(text))
+    if not matches:
+        return UNKNOWN
+    tz = _zone(text)
+    # Numeric dates are month first unless one of them cannot be.
+    day_first = any(m.group("num") and int(m.group("n1")) > 12 for m in matches)
+    first = _point(matches[0], day_first)
+    second: _Point | None = None
+    if len(matches) > 1:
+        second = _point(matches[1], day_first)
+    else:
+        rest = text[matches[0].end():]
+        bare = _BARE_DAY.match(rest)
+        if bare and not _BARE_TIME.match(rest):
+            second = first._replace(
+                year=int(bare.group("year")) if bare.group("year") else first.year,
+                day=int(bare.group("day")),
+                hour=None,
+                minute=0,
+            )
+        elif (bare_time := _BARE_TIME.match(rest)) is not None:
+            hour, minute = _hour(bare_time, "4")
+            second = first._replace(hour=hour, minute=minute)
+
+    try:
+        if second is None:
+            start_year = first.year or _current_year(first, None, today)
+            if _END_ONLY.match(text):
+                return Timeframe(None, _epoch(first, start_year, tz, end=True))
+            if _START_ONLY.match(text):
+                return Timeframe(_epoch(first, start_year, tz, end=False), None)
+            return Timeframe(
+                _epoch(first, start_year, tz, end=False),
+                _epoch(first, start_year, tz, end=True),
+            )
+        if first.year is not None:
+            start_year = first.year
+        elif second.year is not None:
+            start_year = second.year
+            if (first.month, first.day) > (second.month, second.day):
+                start_year -= 1
+        else:
+            start_year = _current_year(first, second, today)
+        end_year = second.year
+        if end_year is None:
+            end_year = _end_year(first, second, start_year)
+        return Timeframe(
+            _epoch(first, start_year, tz, end=False),
+            _epoch(second, end_year, tz, end=True),
+        )
+    except ValueError:  # e.g. "Feb 30"
+        return UNKNOWN
+
+
+def parse(text: str | None, today: date | None = None) -> Timeframe:
+    """Parse ``text`` into a :class:`Timeframe` (memoized per text and day).
+
+    ``today`` (default: the current UTC date) completes dates without a year.
+    """
+    if not text:
+        return UNKNOWN
+    text = normalize_space(text)
+    if not text or text == NO_TIMEFRAME:
+        return UNKNOWN
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+    return _parse(text, today)
+
+
+def is_unparseable(text: str | None, today: date | None = None) -> bool:
+    """True for a timeframe that is present but could not be parsed."""
+    if not text or normalize_space(text) in ("", NO_TIMEFRAME):
+        return False
+    return not parse(text, today).ok
+
+
+def scrape_date(scraped_at: str | None) -> date | None:
+    """The UTC day of a ``scraped_at`` stamp, used to complete short dates."""
+    if not scraped_at:
+        return None
+    try:
+        stamp = datetime.fromisoformat(scraped_at.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if stamp.tzinfo is not None:
+        stamp = stamp.astimezone(timezone.utc)
+    return stamp.date()
+
+
+cache_info = _parse.cache_info
+cache_clear = _parse.cache_clear
@@ -0,0 +1,63 @@
+import asyncio
+import math
+import threading
+
+import pytest
+
+from dropnoti.fakebot import FakeBotServer
+from dropnoti.ratelimit import RateLimiter
+from dropnoti.telegram import TelegramClient
+
+
+def unlimited():
+    return RateLimiter(global_rate=math.inf, per_chat_rate=math.inf)
+
+
+@pytest.fixture
+def bot():
+    """Run ``main(server, client)`` against a fake Bot API without rate limits.
+
+    Returns the server and what ``main`` returned; ``handler`` and other
+    options go to the :class:`FakeBotServer`.
+    """
+
+    def run(main, handler=None, **options):
+        async def session():
+            async with FakeBotServer(handler=handler, **options) as server:
+                limiter = unlimited()
+                async with TelegramClient("t", server.base_url, limiter=limiter) as c:
+                    return server, await main(server, c)
+
+        return asyncio.run(session())
+
+    return run
+
+
+@pytest.fixture
+def background():
+    """Start servers on an event loop in another thread, for blocking code.
+
+    Call it with an unstarted server; every server is stopped afterwards.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = []
+
+    def start(server):
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def live_bot(background):
+    """A fake Bot API for code that runs its own event loop, like the CLI."""
+    return background(FakeBotServer())
@@ -0,0 +1,61 @@
+import json
+import random
+
+import pytest
+
+from dropnoti import canonical
+
+CARDS = [
+    {"title": "Late  charm", "timeframe": "Jan 20 - Feb 2"},
+    {"timeframe": "Jan 6 - Jan 13", "title": "Early"},
+    {"title": "No end", "timeframe": "soon"},
+    {"title": "Explicit", "timeframe": "whenever", "ends_at": "2026-01-10T00:00:00Z"},
+    {"title": "Alpha", "timeframe": "Jan 6 - Jan 13"},
+]
+SNAPSHOT = {"scraped_at": "2026-01-06T12:00:00Z", "count": 5, "cards": CARDS}
+
+
+def titles(snapshot):
+    return [card["title"] for card in snapshot["cards"]]
+
+
+def test_cards_are_ordered_by_end_then_title():
+    result = canonical.canonicalize(SNAPSHOT)
+    assert titles(result) == ["Explicit", "Alpha", "Early", "Late charm", "No end"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dumps_ignores_input_order_and_is_idempotent(seed):
+    shuffled = dict(SNAPSHOT, cards=random.Random(seed).sample(CARDS, len(CARDS)))
+    data = canonical.dumps(shuffled)
+    assert data == canonical.dumps(SNAPSHOT)
+    assert canonical.dumps(json.loads(data)) == data
+    # One card per line, so a changed campaign is a one-line diff.
+    assert data.decode().count("\n    {") == len(CARDS)
+
+
+def test_read_verifies_the_canonical_form(tmp_path):
+    path = tmp_path / "latest.json"
+    written = canonical.write(SNAPSHOT, path)
+    assert path.read_bytes() == written
+    assert canonical.read(path) == json.loads(written)
+    assert canonical.is_canonical(path)
+
+    path.write_text(json.dumps(SNAPSHOT), encoding="utf-8")
+    with pytest.raises(canonical.NotCanonicalError):
+        canonical.read(path)
+    assert canonical.read(path, verify=False)["count"] == 5
+    assert not canonical.is_canonical(path)
+
+    path.write_text("[]", encoding="utf-8")
+    with pytest.raises(canonical.NotCanonicalError, match="not an object"):
+        canonical.read(path, verify=False)
+
+
+def test_same_content_compares_bytes(tmp_path):
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    canonical.write(SNAPSHOT, a)
+    canonical.write(dict(SNAPSHOT, cards=CARDS[::-1]), b)
+    assert canonical.same_content(a, b)
+    canonical.write(dict(SNAPSHOT, count=4), b)
+    assert not canonical.same_content(a, b)
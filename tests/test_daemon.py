@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+from dropnoti.daemon import Daemon
+from dropnoti.posts import PostStore
+from dropnoti.state import load_state
+
+
+class ScriptedSource:
+    """Hands out ``snapshots`` one per poll, then reports no change."""
+
+    name = "scripted"
+
+    def __init__(self, snapshots, stop, idle_polls=5):
+        self.snapshots = list(snapshots)
+        self.stop = stop
+        self.idle_polls = idle_polls
+
+    async def fetch(self):
+        if self.snapshots:
+            return self.snapshots.pop(0)
+        self.idle_polls -= 1
+        if self.idle_polls <= 0:
+            self.stop.set()
+        return None
+
+    async def close(self):
+        pass
+
+
+class Fast:
+    def next(self, changed):
+        return 0.02
+
+    def observe_release(self, ts=None):
+        pass
+
+
+def snapshot(*titles):
+    cards = [{"title": title, "timeframe": "Jan 6 - Jan 19"} for title in titles]
+    return json.dumps({"count": len(cards), "cards": cards}).encode()
+
+
+def fail_first_send():
+    failed = []
+
+    def handler(call):
+        if call.method == "sendMessage" and not failed:
+            failed.append(call)
+            return 500, {"ok": False, "description": "Internal Server Error"}
+        return None
+
+    return handler
+
+
+def run_daemon(bot, tmp_path, snapshots, handler, **options):
+    async def main(server, client):
+        stop = asyncio.Event()
+        daemon = Daemon(
+            ScriptedSource(snapshots, stop),
+            client,
+            ["1"],
+            snapshot_path=tmp_path / "latest.json",
+            state_path=tmp_path / "state.json",
+            interval=Fast(),
+            **options,
+        )
+        await asyncio.wait_for(daemon.run(stop), 10)
+        return daemon
+
+    return bot(main, handler)
+
+
+def test_failed_snapshot_is_not_replayed_after_a_newer_one(bot, tmp_path):
+    server, daemon = run_daemon(
+        bot, tmp_path, [snapshot("Alpha"), snapshot("Alpha", "Beta")], fail_first_send()
+    )
+    texts = [call.params["text"] for call in server.sent()]
+    assert not any("Ended" in text for text in texts)
+    assert "New: Beta" in texts[-1]
+    state = load_state(tmp_path / "state.json")
+    assert sorted(c.title for c in state.index) == ["Alpha", "Beta"]
+    written = json.loads((tmp_path / "latest.json").read_text())
+    assert [card["title"] for card in written["cards"]] == ["Alpha", "Beta"]
+    assert daemon.stats.failed_sends == 1
+
+
+def test_failed_send_is_retried_on_an_idle_poll(bot, tmp_path):
+    server, daemon = run_daemon(bot, tmp_path, [snapshot("Alpha")], fail_first_send())
+    first, retried = server.sent()
+    assert first.params["text"] == retried.params["text"]
+    assert daemon.stats.sends == 1
+    state = load_state(tmp_path / "state.json")
+    assert [c.title for c in state.index] == ["Alpha"]
+
+
+def test_snapshots_waiting_behind_a_slow_send_are_coalesced(bot, tmp_path):
+    async def slow(call):
+        if call.method == "sendMessage":
+            await asyncio.sleep(0.2)
+        return None
+
+    snapshots = [snapshot("Alpha"), snapshot("Alpha", "Beta"), snapshot("Gamma")]
+    server, daemon = run_daemon(bot, tmp_path, snapshots, slow)
+    texts = [call.params["text"] for call in server.sent()]
+    assert len(texts) == 2
+    assert "New: Alpha" in texts[0]
+    assert "New: Gamma" in texts[1] and "Ended: Alpha" in texts[1]
+    assert "Beta" not in texts[1]
+    state = load_state(tmp_path / "state.json")
+    assert [c.title for c in state.index] == ["Gamma"]
+
+
+def test_edited_post_is_not_rolled_back_after_a_failed_update(bot, tmp_path):
+    failed = []
+
+    async def slow_failure(call):
+        if call.method == "sendMessage" and not failed:
+            failed.append(call)
+            await asyncio.sleep(0.1)
+            return 500, {"ok": False, "description": "Internal Server Error"}
+        return None
+
+    server, daemon = run_daemon(
+        bot, tmp_path,
+        [snapshot("Alpha"), snapshot("Alpha", "Beta")],
+        slow_failure,
+        posts=PostStore(tmp_path / "posts.json"),
+    )
+    [text] = server.messages.values()
+    assert "Beta" in text
+    state = load_state(tmp_path / "state.json")
+    assert sorted(c.title for c in state.index) == ["Alpha", "Beta"]
@@ -0,0 +1,28 @@
+from dropnoti.dedupe import Deduper, dedupe, normalize_key
+
+
+class Colliding(str):
+    def __hash__(self):
+        return 1
+
+
+def test_near_duplicates_keep_the_first_spelling():
+    lines = [
+        "Siege Charm — Jan 6 - Jan 19",
+        "SIEGE  CHARM – Jan 6 – Jan 19",
+        "Ｓｉｅｇｅ Charm — Jan 6 − Jan 19",
+        "Other — Jan 6 - Jan 19",
+    ]
+    assert list(dedupe(lines)) == [lines[0], lines[3]]
+
+
+def test_normalize_key():
+    assert normalize_key("Ａ –  b") == normalize_key("a - B") == "a - b"
+
+
+def test_colliding_hashes_do_not_merge_distinct_lines():
+    deduper = Deduper(key=lambda line: line)
+    assert deduper.add(Colliding("alpha"))
+    assert deduper.add(Colliding("beta"))
+    assert not deduper.add(Colliding("alpha"))
+    assert len(deduper) == 2
@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from dropnoti.extract import HAVE_SELECTOLAX, CardExtractor, Selector
+
+FIXTURES = Path(__file__).parent.parent / "benchmarks" / "fixtures"
+PAGE = (FIXTURES / "drops_page.html").read_bytes()
+EXPECTED = json.loads((FIXTURES / "drops_page.json").read_text(encoding="utf-8"))
+
+BACKENDS = [
+    False,
+    pytest.param(
+        True,
+        marks=pytest.mark.skipif(
+            not HAVE_SELECTOLAX, reason="selectolax not installed"
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("use_selectolax", BACKENDS)
+def test_both_backends_extract_the_fixture_page(use_selectolax):
+    extractor = CardExtractor(use_selectolax=use_selectolax)
+    assert extractor(PAGE) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_the_fallback_streams_chunks_split_anywhere(size):
+    chunks = (PAGE[i : i + size] for i in range(0, len(PAGE), size))
+    assert list(CardExtractor(use_selectolax=False).iter_cards(chunks)) == EXPECTED
+
+
+def test_cards_are_yielded_before_the_page_ends():
+    head, tail = PAGE.split(b"</article>", 1)
+    cards = CardExtractor(use_selectolax=False).iter_cards(
+        iter((head + b"</article>", tail))
+    )
+    assert next(cards) == EXPECTED[0]
+
+
+@pytest.mark.parametrize("text", ["div > .title", "a.b c", ":hover", ""])
+def test_selectors_the_fallback_cannot_match_are_refused(text):
+    with pytest.raises(ValueError, match="unsupported selector"):
+        Selector.compile(text)
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from dropnoti.feeds import DEFAULT_FEEDS, Feed, load_feeds, prepare, prepare_all
+
+
+def feed(tmp_path, game="r6"):
+    return Feed.from_json(
+        {
+            "game": game,
+            "snapshot": str(tmp_path / f"latest_{game}.json"),
+            "state": str(tmp_path / game / "state.json"),
+            "history": str(tmp_path / game / "history"),
+        }
+    )
+
+
+def registry(tmp_path, data):
+    path = tmp_path / "feeds.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def write(feed, scraped_at, *titles):
+    cards = [{"title": title, "timeframe": "Jan 6 - Jan 19"} for title in titles]
+    snapshot = {"scraped_at": scraped_at, "count": len(cards), "cards": cards}
+    with open(feed.snapshot, "w", encoding="utf-8") as fh:
+        json.dump(snapshot, fh)
+
+
+@pytest.mark.parametrize("scraped_at", ["bogus", "2026-01-05T12:00:00Z"])
+def test_a_snapshot_the_history_refuses_is_still_sent(tmp_path, scraped_at):
+    r6 = feed(tmp_path)
+    write(r6, "2026-01-06T12:00:00Z", "Alpha")
+    first = prepare(r6, record_history=True)
+    assert first.error is None and first.pages
+    write(r6, scraped_at, "Alpha", "Beta")
+    second = prepare(r6, record_history=True)
+    assert second.error is None
+    assert "Beta" in second.pages[0]
+
+
+def test_without_a_registry_rainbow_six_is_the_only_feed(tmp_path):
+    assert load_feeds(tmp_path / "feeds.json") == list(DEFAULT_FEEDS)
+    [r6] = DEFAULT_FEEDS
+    assert (r6.game, r6.snapshot) == ("r6", "latest_r6.json")
+
+
+def test_paths_and_wording_default_from_the_game(tmp_path):
+    path = registry(tmp_path, {"version": 1, "feeds": [{"game": "apex"}]})
+    [apex] = load_feeds(path)
+    assert apex.snapshot == "latest_apex.json"
+    assert apex.state == os.path.join(".dropnoti", "apex", "state.json")
+    assert apex.history == os.path.join(".dropnoti", "apex", "history")
+    assert (apex.template.name, apex.template.short) == ("APEX", "APEX")
+
+
+@pytest.mark.parametrize(
+    "data, error",
+    [
+        ({"version": 2, "feeds": []}, "not a version 1 registry"),
+        ([], "not a version 1 registry"),
+        (
+            {"version": 1, "feeds": [{"game": "a"}, {"game": "b"}, {"game": "a"}]},
+            "duplicate games a",
+        ),
+        ({"version": 1, "feeds": [{"name": "Apex"}]}, "feed without a game"),
+    ],
+)
+def test_an_unusable_registry_is_refused(tmp_path, data, error):
+    with pytest.raises(ValueError, match=error):
+        load_feeds(registry(tmp_path, data))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_a_failing_feed_does_not_stop_the_others(tmp_path, workers):
+    feeds = [feed(tmp_path, game) for game in ("a", "b", "c")]
+    for each in feeds:
+        write(each, "2026-01-06T12:00:00Z", f"Drop {each.game}")
+    with open(feeds[1].snapshot, "w", encoding="utf-8") as fh:
+        fh.write("{not json")
+    plans = prepare_all(feeds, workers, processes=False, record_history=True)
+    assert [p.feed for p in plans] == feeds
+    assert plans[1].error.startswith("JSONDecodeError: ") and not plans[1].pages
+    for found in (plans[0], plans[2]):
+        assert found.error is None
+        assert f"Drop {found.feed.game}" in found.pages[0]
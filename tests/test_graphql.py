@@ -0,0 +1,118 @@
+import asyncio
+
+from dropnoti.fakegql import StubGraphQLServer
+from dropnoti.graphql import (
+    CAMPAIGN_QUERY,
+    GraphQLClient,
+    GraphQLError,
+    campaign_operation,
+    fetch_campaign_cards,
+)
+
+
+def recordings(count):
+    return [
+        {
+            "operationName": "DropCampaignDetails",
+            "variables": {"id": str(n)},
+            "query": CAMPAIGN_QUERY,
+            "response": {
+                "data": {
+                    "dropCampaign": {
+                        "id": str(n),
+                        "name": f"Charm #{n}",
+                        "startAt": "2026-01-06T17:00:00Z",
+                        "endAt": "2026-01-19T23:59:00Z",
+                    }
+                }
+            },
+        }
+        for n in range(count)
+    ]
+
+
+class RecordingServer(StubGraphQLServer):
+    """Also keeps every operation received, in order."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.received = []
+
+    def _execute(self, operation):
+        self.received.append(operation)
+        return super()._execute(operation)
+
+    @property
+    def full_queries(self):
+        return sum("query" in operation for operation in self.received)
+
+
+def fetch(ids, preload=False, count=10, **options):
+    async def main():
+        async with RecordingServer(recordings(count), preload=preload) as server:
+            async with GraphQLClient(server.url, **options) as client:
+                cards = await fetch_campaign_cards(client, ids)
+        return server, client, cards
+
+    return asyncio.run(main())
+
+
+def test_concurrent_operations_share_one_request():
+    ids = [str(n) for n in range(10)]
+    server, client, cards = fetch(ids, preload=True)
+    assert [card["title"] for card in cards] == [f"Charm #{n}" for n in range(10)]
+    assert cards[0]["timeframe"] == "2026-01-06T17:00:00Z - 2026-01-19T23:59:00Z"
+    assert server.batch_sizes == [10] and client.requests == 1
+
+
+def test_batches_are_split_at_max_batch():
+    ids = [str(n) for n in range(10)]
+    server, client, cards = fetch(ids, preload=True, max_batch=4)
+    assert len(cards) == 10
+    assert sorted(server.batch_sizes) == [2, 4, 4]
+
+
+def test_repeated_ids_are_sent_once():
+    server, client, cards = fetch(["1", "2", "1", "1"], preload=True)
+    titles = [card["title"] for card in cards]
+    assert titles == ["Charm #1", "Charm #2", "Charm #1", "Charm #1"]
+    assert server.operations == 2 and client.deduplicated == 2
+
+
+def test_unknown_persisted_query_is_sent_in_full_once():
+    ids = [str(n) for n in range(10)]
+    server, client, cards = fetch(ids, max_batch=4)
+    assert len(cards) == 10
+    # The first batch misses and is retried with the query text; the others
+    # wait for it to register the query and then send only the hash.
+    assert sorted(server.batch_sizes) == [2, 4, 4, 4]
+    assert server.full_queries == 4
+
+
+def test_a_known_persisted_query_never_sends_the_text():
+    server, client, cards = fetch([str(n) for n in range(10)], preload=True)
+    assert len(cards) == 10
+    assert server.requests == 1 and server.full_queries == 0
+
+
+def test_errors_without_data_raise():
+    async def main():
+        async with RecordingServer(recordings(1), preload=True) as server:
+            async with GraphQLClient(server.url) as client:
+                ok, missing = await asyncio.gather(
+                    client.execute(campaign_operation("0")),
+                    client.execute(campaign_operation("404")),
+                    return_exceptions=True,
+                )
+        return server, ok, missing
+
+    server, ok, missing = asyncio.run(main())
+    assert ok["dropCampaign"]["name"] == "Charm #0"
+    assert isinstance(missing, GraphQLError) and "no recording" in str(missing)
+    assert server.batch_sizes == [2]
+
+
+def test_unbatched_client_sends_full_queries():
+    server, client, cards = fetch(["1", "2"], max_batch=1, window=0, persisted=False)
+    assert len(cards) == 2 and server.batch_sizes == [1, 1]
+    assert server.full_queries == 2
@@ -0,0 +1,69 @@
+import pytest
+
+from dropnoti.history import INDEX_NAME, LOG_NAME, SnapshotHistory, to_epoch
+
+
+def snapshot(day, *titles):
+    cards = [{"title": title, "timeframe": "Jan 6 - Jan 19"} for title in titles]
+    return {"scraped_at": f"2026-01-{day:02d}T12:00:00Z", "cards": cards}
+
+
+@pytest.fixture
+def history(tmp_path):
+    with SnapshotHistory(tmp_path) as history:
+        history.append(snapshot(6, "Alpha"))
+        history.append(snapshot(7, "Alpha", "Beta"))
+        history.append(snapshot(9, "Beta"))
+        yield history
+
+
+def titles(found):
+    return [card["title"] for card in found["cards"]]
+
+
+def test_at_finds_the_newest_snapshot_not_after_a_time(history):
+    assert history.at("2026-01-05T00:00:00Z") is None
+    assert titles(history.at("2026-01-06T12:00:00Z")) == ["Alpha"]
+    assert titles(history.at("2026-01-08T00:00:00Z")) == ["Alpha", "Beta"]
+    assert titles(history.at(to_epoch("2026-02-01T00:00:00Z"))) == ["Beta"]
+
+
+def test_first_seen(history):
+    assert history.first_seen("Beta") == to_epoch("2026-01-07T12:00:00Z")
+    assert history.first_seen("  Alpha ", "Jan 6 -  Jan 19") == to_epoch(
+        "2026-01-06T12:00:00Z"
+    )
+    assert history.first_seen("Alpha", "Feb 1 - Feb 2") is None
+    assert history.first_seen("Gamma") is None
+
+
+def test_appending_the_newest_snapshot_again_is_a_no_op(history):
+    history.append(snapshot(9, "Beta"))
+    assert len(history) == 3
+    with pytest.raises(ValueError, match="older"):
+        history.append(snapshot(8, "Gamma"))
+
+
+def test_a_line_logged_but_not_indexed_is_recovered(history, tmp_path):
+    history.close()
+    index = tmp_path / INDEX_NAME
+    # The crash came after the log write but before the index write.
+    index.write_bytes(index.read_bytes()[:-24])
+    with SnapshotHistory(tmp_path) as recovered:
+        assert len(recovered) == 3
+        assert titles(recovered.load(2)) == ["Beta"]
+
+
+def test_torn_writes_are_cut_off(history, tmp_path):
+    history.close()
+    log, index = tmp_path / LOG_NAME, tmp_path / INDEX_NAME
+    with open(log, "ab") as fh:
+        fh.write(b'{"scraped_at":"2026-01-10T12:00:00Z","car')
+    with open(index, "ab") as fh:
+        fh.write(b"\x00" * 5)
+    size = log.stat().st_size
+    with SnapshotHistory(tmp_path) as recovered:
+        assert len(recovered) == 3
+        assert log.stat().st_size < size
+        recovered.append(snapshot(10, "Gamma"))
+        assert titles(recovered.at("2026-01-10T12:00:00Z")) == ["Gamma"]
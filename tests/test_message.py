@@ -0,0 +1,134 @@
+import json
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from dropnoti.message import (
+    Message,
+    build_message,
+    format_as_of,
+    paginate,
+    telegram_length,
+)
+
+HEADER = ("R6 Drops: 40 campaigns", "as of 01-06 (UTC)", "")
+
+
+def body(page, header=HEADER):
+    return page.split("\n")[len(header):]
+
+
+def test_length_counts_utf16_code_units():
+    assert telegram_length("abc") == 3
+    assert telegram_length("é") == 1
+    assert telegram_length("😀") == 2
+
+
+def test_a_message_that_fits_is_one_page_without_a_marker():
+    lines = ["• a", "• b"]
+    assert paginate(lines, HEADER) == ["\n".join((*HEADER, *lines))]
+    assert paginate([], HEADER) == ["\n".join(HEADER)]
+
+
+def test_the_single_page_check_counts_code_units():
+    # Five emoji are ten code units but only five characters.
+    assert paginate(["😀" * 5], limit=10) == ["😀" * 5]
+    [page] = paginate(["😀" * 6], limit=10)
+    assert telegram_length(page) <= 10 and page.endswith("…")
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("limit", [120, 500, 4096])
+def test_pages_fit_keep_order_and_are_numbered(seed, limit):
+    rng = random.Random(seed)
+    alphabet = "abc é😀"
+    lines = [
+        "• " + "".join(rng.choices(alphabet, k=rng.randint(1, 30)))
+        for _ in range(rng.randint(1, 400))
+    ]
+    pages = paginate(lines, HEADER, limit)
+    assert all(telegram_length(page) <= limit for page in pages)
+    assert [line for page in pages for line in body(page)] == lines
+    if len(pages) > 1:
+        for i, page in enumerate(pages, 1):
+            first, *rest = page.split("\n")
+            assert first == f"{HEADER[0]} ({i}/{len(pages)})"
+            assert rest[: len(HEADER) - 1] == list(HEADER[1:])
+
+
+def test_the_marker_has_room_on_every_page():
+    # Each page is filled to the limit minus the widest possible marker.
+    header = ("title",)
+    lines = ["x" * 9] * 30
+    pages = paginate(lines, header, limit=56)
+    assert len(pages) > 1
+    assert all(telegram_length(page) <= 56 for page in pages)
+
+
+def test_a_line_too_long_for_a_page_is_cut():
+    lines = ["short", "😀" * 100, "tail"]
+    pages = paginate(lines, ("head",), limit=50)
+    assert all(telegram_length(page) <= 50 for page in pages)
+    cut = [line for page in pages for line in body(page, ("head",))]
+    assert cut[0] == "short" and cut[-1] == "tail"
+    assert cut[1].endswith("…") and cut[1].startswith("😀")
+    # Cutting never leaves half of a surrogate pair.
+    assert "�" not in cut[1]
+
+
+def test_limited_preview_ends_with_a_footer():
+    lines = tuple(f"Campaign {n} — Jan 6 - Jan 19" for n in range(20))
+    message = Message(count=20, as_of="01-06", preview=lines[:8], total=20)
+    assert message.lines[-1] == "… and 12 more"
+    assert message.lines[:8] == [f"• {line}" for line in lines[:8]]
+    [page] = message.pages()
+    assert page == message.text
+    assert page.startswith("R6 Drops: 20 campaigns\nas of 01-06 (UTC)\n\n")
+
+
+def test_an_empty_message_has_only_the_header():
+    message = Message(count=0, as_of="01-06", preview=(), total=0)
+    assert message.pages() == ["No Rainbow Six drops today\nas of 01-06 (UTC)"]
+
+
+def write(tmp_path, text):
+    path = tmp_path / "latest.json"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_build_message_applies_the_workflow_fallbacks(tmp_path):
+    cards = [
+        {"title": "  Alpha \n charm ", "timeframe": None},
+        {"timeframe": "Jan 6 - Jan 13"},
+        {"title": "", "timeframe": False},
+        "not a card",
+    ]
+    snapshot = {"scraped_at": "2026-01-06T23:30:00-02:00", "count": 3, "cards": cards}
+    message = build_message(write(tmp_path, json.dumps(snapshot)), limit=None)
+    assert message.header == ("R6 Drops: 3 campaigns", "as of 01-07 (UTC)", "")
+    assert message.preview == (
+        "Alpha charm — Time N/A",
+        "Untitled — Jan 6 - Jan 13",
+        "Untitled — Time N/A",
+    )
+
+
+def test_missing_snapshot_is_an_empty_message(tmp_path):
+    now = datetime(2026, 1, 6, tzinfo=timezone.utc)
+    message = build_message(tmp_path / "missing.json", now=now)
+    assert message.text == "No Rainbow Six drops today\nas of 01-06 (UTC)"
+
+
+def test_unparseable_scraped_at_keeps_its_month_and_day():
+    assert format_as_of("2026-01-06 noon") == "01-06"
+
+
+def test_reading_stops_once_the_message_is_known(tmp_path):
+    # Anything after the cards would fail to parse if it were read.
+    done = '{"count": 1, "scraped_at": "2026-01-06T00:00:00Z",'
+    done += ' "cards": [{"title": "Alpha"}], "extra": [nonsense'
+    assert build_message(write(tmp_path, done)).preview == ("Alpha — Time N/A",)
+    empty = '{"count": 0, "scraped_at": "2026-01-06T00:00:00Z", "cards": [nonsense'
+    assert build_message(write(tmp_path, empty)).count == 0
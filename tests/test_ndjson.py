@@ -0,0 +1,55 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from dropnoti.fakesite import FixtureServer
+from dropnoti.message import build_message
+from dropnoti.ndjson import dumps, iter_ndjson, message_from_cards, scrape_and_build
+
+LATE = {"title": "Late", "timeframe": "Feb 1 - Feb 20"}
+EARLY = {"title": "Early", "timeframe": "Jan 6 - Jan 19"}
+
+
+def page(*cards):
+    return json.dumps(list(cards)).encode()
+
+
+def test_cards_round_trip_through_ndjson():
+    cards = [LATE, {"title": "Ｒ６ “Major”", "timeframe": None}]
+    assert list(iter_ndjson(io.StringIO(dumps(cards)))) == cards
+
+
+def test_blank_lines_and_non_objects_are_skipped():
+    stream = io.StringIO('\n{"title": "A"}\n  \n[1, 2]\n"text"\n{"title": "B"}\n')
+    assert [card["title"] for card in iter_ndjson(stream)] == ["A", "B"]
+
+
+def test_a_bad_line_is_reported_by_number():
+    cards = iter_ndjson(io.StringIO('{"title": "A"}\n\n{"title": \n'))
+    assert next(cards) == {"title": "A"}
+    with pytest.raises(ValueError, match=r"^line 3: "):
+        next(cards)
+
+
+def test_the_message_is_built_while_scraping(background, tmp_path):
+    server = background(
+        FixtureServer({"/a.json": page(LATE), "/b.json": page(EARLY, LATE)})
+    )
+    output = tmp_path / "latest.json"
+    stream = io.StringIO()
+
+    async def main():
+        urls = [server.url("/a.json"), server.url("/b.json")]
+        return await scrape_and_build(urls, output, ndjson=stream, queue_size=1)
+
+    result, message = asyncio.run(main())
+    assert list(iter_ndjson(io.StringIO(stream.getvalue()))) == result.cards
+    assert message == message_from_cards(result.cards, scraped_at=result.scraped_at)
+    assert (message.count, message.total) == (3, 2)
+    # Scrape order, where the snapshot is sorted by end time.
+    assert message.preview == ("Late — Feb 1 - Feb 20", "Early — Jan 6 - Jan 19")
+    built = build_message(output)
+    assert (built.count, built.total) == (message.count, message.total)
+    assert built.preview == message.preview[::-1]
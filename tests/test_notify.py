@@ -0,0 +1,61 @@
+import json
+
+from dropnoti.notify import NO_CHANGES, UNCHANGED, plan
+from dropnoti.state import load_state
+
+
+def write_snapshot(path, cards):
+    path.write_text(
+        json.dumps(
+            {"scraped_at": "2026-01-06T12:00:00Z", "count": len(cards), "cards": cards}
+        ),
+        encoding="utf-8",
+    )
+
+
+def card(title, timeframe="Jan 6 - Jan 19"):
+    return {"title": title, "timeframe": timeframe}
+
+
+def test_first_plan_lists_every_campaign(tmp_path):
+    snapshot, state = tmp_path / "latest.json", tmp_path / "state.json"
+    write_snapshot(snapshot, [card("Alpha"), card("Beta")])
+    result = plan(snapshot, state, limit=None)
+    assert result.message is not None
+    assert result.message.preview == (
+        "New: Alpha — Jan 6 - Jan 19",
+        "New: Beta — Jan 6 - Jan 19",
+    )
+    assert not state.exists()
+
+
+def test_every_campaign_ending_is_still_announced(tmp_path):
+    snapshot, state = tmp_path / "latest.json", tmp_path / "state.json"
+    write_snapshot(snapshot, [card("Alpha")])
+    first = plan(snapshot, state, limit=None)
+    write_snapshot(snapshot, [])
+    result = plan(snapshot, state, limit=None, previous=first.state)
+    assert result.message is not None
+    assert result.message.count == 1
+    assert "• Ended: Alpha — Jan 6 - Jan 19" in result.message.text
+
+
+def test_no_changes_saves_the_state(tmp_path):
+    snapshot, state = tmp_path / "latest.json", tmp_path / "state.json"
+    write_snapshot(snapshot, [card("Alpha")])
+    first = plan(snapshot, state)
+    write_snapshot(snapshot, [card("Alpha")] * 2)
+    result = plan(snapshot, state, previous=first.state)
+    assert result.skipped == NO_CHANGES
+    assert load_state(state).content_hash == result.digest
+    assert plan(snapshot, state).skipped == UNCHANGED
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    snapshot, state = tmp_path / "latest.json", tmp_path / "state.json"
+    write_snapshot(snapshot, [card("Alpha")])
+    first = plan(snapshot, state)
+    write_snapshot(snapshot, [card("Alpha")] * 2)
+    result = plan(snapshot, state, previous=first.state, dry_run=True)
+    assert result.skipped == NO_CHANGES
+    assert not state.exists()
@@ -0,0 +1,121 @@
+import json
+
+from dropnoti.cli import main
+from dropnoti.outbox import Outbox, backoff
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def pages(entries):
+    return [(e.chat_id, e.page) for e in entries]
+
+
+def deliver(bot, outbox, handler=None, **options):
+    async def main(server, client):
+        return await outbox.deliver(client, **options)
+
+    return bot(main, handler)
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    with Outbox(tmp_path / "outbox.sqlite3") as outbox:
+        assert outbox.enqueue("d1", ["1", "2"], ["a", "b"]) == 4
+        assert outbox.enqueue("d1", ["1", "2"], ["a", "b"]) == 0
+        assert outbox.enqueue("d1", ["3"], ["a", "b"]) == 2
+        assert outbox.report("d1").pending == 6
+
+
+def test_claim_follows_page_order_and_acks(tmp_path):
+    with Outbox(tmp_path / "outbox.sqlite3", clock=Clock()) as outbox:
+        outbox.enqueue("d1", ["1"], ["a", "b"])
+        [first] = outbox.claim()
+        assert pages([first]) == [("1", 0)]
+        assert outbox.claim() == []
+        outbox.mark_delivered(first.key, 7)
+        [second] = outbox.claim()
+        assert pages([second]) == [("1", 1)]
+        outbox.mark_delivered(second.key, 8)
+        assert outbox.report("d1").done
+
+
+def test_a_lease_keeps_other_runs_off_until_it_expires(tmp_path):
+    clock = Clock()
+    path = tmp_path / "outbox.sqlite3"
+    with Outbox(path, clock=clock, lease=60) as crashed:
+        crashed.enqueue("d1", ["1"], ["a"])
+        [entry] = crashed.claim()
+    # The first run died after claiming without marking anything.
+    with Outbox(path, clock=clock, lease=60) as other:
+        assert other.claim() == []
+        clock.now += 61
+        [replayed] = other.claim()
+        assert replayed.key == entry.key and replayed.attempts == 0
+
+
+def test_failures_back_off_and_permanent_ones_fail_later_pages(tmp_path):
+    clock = Clock()
+    with Outbox(tmp_path / "outbox.sqlite3", clock=clock) as outbox:
+        outbox.enqueue("d1", ["1", "2"], ["a", "b"])
+        first, other = outbox.claim()
+        outbox.mark_failed(first, "500 boom")
+        assert outbox.claim() == []
+        assert outbox.next_due() == clock.now + backoff(1)
+        clock.now += backoff(1)
+        [retried] = outbox.claim()
+        assert retried.key == first.key and retried.attempts == 1
+        outbox.mark_failed(other, "400 chat not found", permanent=True)
+        report = outbox.report("d1")
+        assert (report.failed, report.pending) == (2, 2)
+
+
+def test_deliver_sends_each_page_once(bot, tmp_path):
+    with Outbox(tmp_path / "outbox.sqlite3") as outbox:
+        outbox.enqueue("d1", ["1", "2"], ["a", "b"])
+        server, report = deliver(bot, outbox, digest="d1")
+        assert report.done and report.delivered == 4
+        sent = [(c.params["chat_id"], c.params["text"]) for c in server.sent()]
+        assert sorted(sent) == [("1", "a"), ("1", "b"), ("2", "a"), ("2", "b")]
+        # A rerun for the same snapshot plans nothing new and sends nothing.
+        assert outbox.enqueue("d1", ["1", "2"], ["a", "b"]) == 0
+        server, report = deliver(bot, outbox, digest="d1")
+        assert server.sent() == [] and report.delivered == 4
+
+
+def test_deliver_retries_within_wait(bot, tmp_path):
+    calls = []
+
+    def flaky(call):
+        calls.append(call)
+        if len(calls) == 1:
+            return 500, {"ok": False, "description": "Internal Server Error"}
+        return None
+
+    with Outbox(tmp_path / "outbox.sqlite3") as outbox:
+        outbox.enqueue("d1", ["1"], ["a", "b"])
+        server, report = deliver(bot, outbox, flaky, digest="d1", wait=backoff(1) + 2)
+        assert report.done
+        assert [c.params["text"] for c in server.sent()] == ["a", "a", "b"]
+
+
+def test_a_snapshot_that_comes_back_is_announced_again(
+    live_bot, tmp_path, monkeypatch
+):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "t")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "1")
+    snapshot = tmp_path / "latest.json"
+    options = ["--state", str(tmp_path / "state.json")]
+    options += ["--outbox", str(tmp_path / "outbox.sqlite3")]
+    options += ["--api-url", live_bot.base_url, "--max-wait", "0"]
+    for titles in (["X", "Y"], ["Y"], ["X", "Y"]):
+        cards = [{"title": t, "timeframe": "Jan 6 - Jan 19"} for t in titles]
+        snapshot.write_text(json.dumps({"count": len(cards), "cards": cards}))
+        assert main(["send", str(snapshot), *options]) == 0
+    texts = [call.params["text"] for call in live_bot.sent()]
+    assert len(texts) == 3
+    assert "Ended: X" in texts[1] and "New: X" in texts[2]
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from dropnoti.fakesite import FixtureServer
+from dropnoti.fingerprint import content_hash
+from dropnoti.message import Message
+from dropnoti.pipeline import NotifyOutcome, Pipeline, notify_stages
+from dropnoti.scrape import Scraper
+from dropnoti.state import SeenIndex, State
+
+
+def page(*titles):
+    cards = [{"title": title, "timeframe": "Jan 6 - Jan 19"} for title in titles]
+    return json.dumps(cards).encode()
+
+
+def run(snapshot, previous=None, chat_ids=("1", "2"), until=None):
+    outcome = NotifyOutcome()
+
+    async def main():
+        pages = {"/a.json": page("Alpha", "Beta"), "/b.json": page("Gamma")}
+        async with FixtureServer(pages) as server, Scraper() as scraper:
+            stages = notify_stages(
+                scraper, outcome, chat_ids, previous=previous, snapshot=snapshot
+            )
+            if until is not None:
+                names = [stage.name for stage in stages]
+                stages = stages[: names.index(until) + 1]
+            urls = [server.url("/a.json"), server.url("/b.json")]
+            return await Pipeline(stages).run(enumerate(urls))
+
+    return asyncio.run(main()), outcome
+
+
+def test_state_carries_the_snapshot_hash(tmp_path):
+    snapshot = tmp_path / "latest.json"
+    report, outcome = run(snapshot)
+    state = outcome.state()
+    assert state.content_hash == content_hash(snapshot)
+    assert sorted(c.title for c in state.index) == ["Alpha", "Beta", "Gamma"]
+    assert outcome.cards == 3
+
+
+def test_the_header_counts_changes_not_cards(tmp_path):
+    first = run(tmp_path / "first.json")[1].index
+    previous = SeenIndex(c for c in first if c.title == "Alpha")
+    # Stop after planning, so the plan stage's messages are the output.
+    report, outcome = run(tmp_path / "latest.json", State(previous), until="plan")
+    (chat, message), _ = report.outputs
+    assert outcome.cards == 3 and message.count == message.total == 2
+
+
+def test_equal_messages_are_rendered_once():
+    stages = notify_stages(Scraper(), NotifyOutcome(), ["1", "2"])
+    render = next(stage for stage in stages if stage.name == "render")
+    emitted = []
+
+    async def emit(item):
+        emitted.append(item)
+
+    async def main():
+        for chat_id in ("1", "2"):
+            message = Message(1, "Jan 6", ("New: Alpha",), 1)
+            await render.handle((chat_id, message), emit)
+
+    asyncio.run(main())
+    (_, first), (_, second) = emitted
+    assert first is second
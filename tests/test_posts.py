@@ -0,0 +1,50 @@
+from dropnoti.posts import DailyPost, PostStore, publish
+
+DAY = "2026-01-06"
+
+
+def updates(bot, store, *updates, forget=()):
+    """Publish each page list in ``updates`` in turn, returning every result."""
+
+    async def main(server, client):
+        results = []
+        for n, pages in enumerate(updates):
+            if n in forget:
+                # The chat deleted the post behind the bot's back.
+                server.messages.pop(("1", store.get("1").message_ids[0]))
+            results.append(await publish(client, store, ["1"], pages, DAY))
+        return results
+
+    return bot(main)
+
+
+def test_updates_edit_only_changed_pages(bot, tmp_path):
+    store = PostStore(tmp_path / "posts.json")
+    server, results = updates(bot, store, ["a", "b"], ["a", "B"], ["a", "B"], ["a"])
+    created, edited, unchanged, shrunk = (r for [r] in results)
+    assert (created.sent, edited.edited, edited.unchanged) == (2, 1, 1)
+    assert unchanged.calls == 0
+    assert shrunk.deleted == 1
+    assert list(server.messages.values()) == ["a"]
+
+
+def test_a_fresh_post_deletes_what_is_left_of_the_old_one(bot, tmp_path):
+    store = PostStore(tmp_path / "posts.json")
+    server, results = updates(bot, store, ["a", "b", "c"], ["x", "y", "z"], forget={1})
+    [restarted] = results[-1]
+    assert restarted.ok and restarted.sent == 3 and restarted.deleted == 2
+    assert sorted(server.messages.values()) == ["x", "y", "z"]
+    assert store.get("1").orphans == []
+
+
+def test_orphans_are_saved_and_deleted_on_the_next_update(bot, tmp_path):
+    path = tmp_path / "posts.json"
+    store = PostStore(path)
+    store.posts["1"] = DailyPost(DAY, orphans=[42])
+    store.save()
+    store = PostStore(path)
+    assert store.get("1").orphans == [42]
+    server, [[result]] = updates(bot, store, ["a"])
+    # Already gone is as good as deleted.
+    assert result.ok and result.sent == 1 and result.deleted == 1
+    assert store.get("1").orphans == []
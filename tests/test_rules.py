@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from dropnoti.rules import HAVE_NUMPY, RuleSet
+from dropnoti.subscribers import Subscriber, SubscriberIndex
+
+WORDS = "twitch drops charm skin pack Siège siege ÉCHO echo major finals".split()
+BACKENDS = [
+    False,
+    pytest.param(
+        True, marks=pytest.mark.skipif(not HAVE_NUMPY, reason="numpy not installed")
+    ),
+]
+
+
+def keyword(rng):
+    return " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+
+
+def subscribers(rng, count):
+    return [
+        Subscriber(
+            str(n),
+            tuple(keyword(rng) for _ in range(rng.randint(0, 3))),
+            rng.choice([(), ("r6",), ("apex",)]),
+            tuple(keyword(rng) for _ in range(rng.randint(0, 1))),
+        )
+        for n in range(count)
+    ]
+
+
+def titles(rng, count):
+    return [" ".join(rng.choices(WORDS, k=rng.randint(1, 5))) for _ in range(count)]
+
+
+def naive(subs, cards, game):
+    return {
+        s.chat_id: positions
+        for s in subs
+        if s.wants_game(game)
+        and (positions := [i for i, t in enumerate(cards) if s.matches(t)])
+    }
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+@pytest.mark.parametrize("seed", range(20))
+def test_every_matcher_agrees(seed, use_numpy):
+    rng = random.Random(seed)
+    subs = subscribers(rng, rng.randint(1, 60))
+    # 70 cards spans more than one 64-bit word.
+    cards = titles(rng, rng.choice([1, 7, 64, 70]))
+    game = rng.choice([None, "r6", "apex"])
+    expected = naive(subs, cards, game)
+    assert SubscriberIndex(subs, game).match(cards) == expected
+    assert RuleSet(subs, game, use_numpy=use_numpy).match(cards) == expected
+
+
+def test_python_integers_are_the_default():
+    assert not RuleSet([Subscriber("1", ("skin",))]).use_numpy
+
+
+def test_no_titles_or_subscribers_match_nothing():
+    subs = [Subscriber("1")]
+    assert RuleSet(subs).match([]) == {}
+    assert RuleSet([]).match(["skin"]) == {}
+    assert RuleSet(subs).match(["skin", "pack"]) == {"1": [0, 1]}
@@ -0,0 +1,82 @@
+from dropnoti.schedule import (
+    BUCKET,
+    LOOKAHEAD,
+    MAX_INTERVAL,
+    MIN_INTERVAL,
+    SIMULATION_START,
+    WEEK,
+    AdaptiveScheduler,
+    FakeClock,
+    FixedInterval,
+    ReleaseModel,
+    simulate,
+    synthetic_releases,
+)
+
+# Tuesday 17:00 UTC in the first simulated week.
+TUESDAY = SIMULATION_START + 24 * 3600 + 17 * 3600
+
+
+def trained(clock):
+    releases = [TUESDAY - week * WEEK for week in range(1, 5)]
+    return AdaptiveScheduler(ReleaseModel.from_releases(releases), clock=clock)
+
+
+def test_untrained_scheduler_polls_slowly():
+    clock = FakeClock(SIMULATION_START)
+    scheduler = AdaptiveScheduler(clock=clock)
+    assert scheduler.next(changed=False) == MAX_INTERVAL
+    assert scheduler.metrics.reasons == {"untrained": 1}
+
+
+def test_polls_fast_in_a_busy_bucket_and_slowly_elsewhere():
+    clock = FakeClock(TUESDAY)
+    scheduler = trained(clock)
+    assert scheduler.next(changed=False) == MIN_INTERVAL
+    clock.now = TUESDAY + 3 * 24 * 3600
+    assert scheduler.next(changed=False) == MAX_INTERVAL
+    assert scheduler.metrics.reasons == {"learned": 1, "idle": 1}
+
+
+def test_never_sleeps_past_the_start_of_a_busy_bucket():
+    # The busy window opens LOOKAHEAD buckets before the usual release.
+    opens = TUESDAY - LOOKAHEAD * BUCKET
+    clock = FakeClock(opens - 30)
+    scheduler = trained(clock)
+    assert scheduler.next(changed=False) == 30 + MIN_INTERVAL
+    assert scheduler.metrics.reasons == {"ahead": 1}
+
+
+def test_a_change_starts_a_burst_of_fast_polls():
+    clock = FakeClock(TUESDAY + 3 * 24 * 3600)
+    scheduler = trained(clock)
+    assert scheduler.next(changed=True) == MIN_INTERVAL
+    clock.now += scheduler.burst + 1
+    assert scheduler.next(changed=False) == MAX_INTERVAL
+    assert scheduler.metrics.reasons["burst"] == 1
+
+
+def test_observed_releases_train_the_model():
+    clock = FakeClock(TUESDAY)
+    scheduler = AdaptiveScheduler(clock=clock)
+    scheduler.observe_release()
+    assert scheduler.model.events == 1
+    clock.now += WEEK
+    assert scheduler.next(changed=False) == MIN_INTERVAL
+
+
+def test_adaptive_polling_beats_a_fixed_interval_on_the_simulation():
+    start = SIMULATION_START
+    history = synthetic_releases(8, start - 8 * WEEK, seed=1)
+    releases = synthetic_releases(4, start, seed=2)
+    end = start + 4 * WEEK
+
+    def adaptive(clock):
+        model = ReleaseModel.from_releases(history)
+        return AdaptiveScheduler(model, clock=clock)
+
+    fast = simulate("fixed", lambda clock: FixedInterval(60), releases, start, end)
+    learned = simulate("adaptive", adaptive, releases, start, end)
+    assert len(learned.latencies) == len(fast.latencies) == len(releases)
+    assert learned.polls < fast.polls / 2
+    assert learned.percentile(0.5) <= fast.percentile(0.5)
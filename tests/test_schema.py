@@ -0,0 +1,27 @@
+from dropnoti import schema
+
+
+def test_fallbacks_and_normalization():
+    snapshot = schema.loads(
+        b'{"scraped_at": "2026-01-06T12:00:00Z", "count": 3, "cards": ['
+        b'{"title": "  Siege\\u00a0Charm ", "timeframe": "Jan 6 - Jan 19"},'
+        b'{"title": null}, {"title": 5, "timeframe": ["x"]}, "not a card"]}'
+    )
+    assert snapshot.scraped_at == "2026-01-06T12:00:00Z"
+    assert snapshot.count == 3
+    assert [card.line for card in snapshot.cards] == [
+        "Siege Charm — Jan 6 - Jan 19",
+        "Untitled — Time N/A",
+        "5 — ['x']",
+    ]
+
+
+def test_identical_cards_are_shared():
+    snapshot = schema.loads(b'{"cards": [{"title": "A"}, {"title": "A"}]}')
+    first, second = snapshot.cards
+    assert first is second
+
+
+def test_missing_file(tmp_path):
+    snapshot = schema.load(tmp_path / "latest.json")
+    assert (snapshot.count, snapshot.cards) == (0, [])
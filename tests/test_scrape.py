@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from dropnoti import canonical
+from dropnoti.fakesite import FixtureServer
+from dropnoti.scrape import ScrapeError, Scraper, ValidatorCache, scrape_to
+
+
+def page(*titles):
+    cards = [{"title": title, "timeframe": "Jan 6 - Jan 19"} for title in titles]
+    return json.dumps(cards).encode()
+
+
+def scrape(server, cache, *paths, output=None):
+    async def main():
+        urls = [server.url(path) for path in paths]
+        if output is not None:
+            return await scrape_to(urls, output, cache)
+        async with Scraper(cache=cache) as scraper:
+            return await scraper.scrape(urls)
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def server(background):
+    return background(
+        FixtureServer({"/a.json": page("Alpha"), "/b.json": page("Beta")})
+    )
+
+
+def titles(result):
+    return [card["title"] for card in result.cards]
+
+
+def test_unchanged_pages_are_not_downloaded_again(server, tmp_path):
+    cache = ValidatorCache(tmp_path / "cache.json")
+    first = scrape(server, cache, "/a.json", "/b.json")
+    assert [p.status for p in first.pages] == [200, 200] and first.changed
+    cache.save()
+
+    cache = ValidatorCache(tmp_path / "cache.json")
+    second = scrape(server, cache, "/a.json", "/b.json")
+    assert [p.status for p in second.pages] == [304, 304] and not second.changed
+    assert titles(second) == ["Alpha", "Beta"]
+    sent = {r.path: r.headers for r in server.requests[-2:]}
+    for path, headers in sent.items():
+        assert headers["if-none-match"] == server.pages[path].etag
+        assert "if-modified-since" in headers
+
+
+def test_a_changed_page_is_fetched_with_its_new_etag(server, tmp_path):
+    cache = ValidatorCache(tmp_path / "cache.json")
+    scrape(server, cache, "/a.json", "/b.json")
+    server.set_page("/b.json", page("Beta", "Gamma"))
+    result = scrape(server, cache, "/a.json", "/b.json")
+    assert [p.status for p in result.pages] == [304, 200]
+    assert titles(result) == ["Alpha", "Beta", "Gamma"]
+    assert cache.get(server.url("/b.json")).etag == server.pages["/b.json"].etag
+
+
+def test_a_failed_page_falls_back_to_its_cached_cards(server, tmp_path):
+    cache = ValidatorCache(tmp_path / "cache.json")
+    scrape(server, cache, "/a.json", "/b.json")
+    del server.pages["/b.json"]
+    result = scrape(server, cache, "/a.json", "/b.json")
+    assert titles(result) == ["Alpha", "Beta"]
+    assert [p.url for p in result.failed] == [server.url("/b.json")]
+
+
+def test_a_failed_page_without_cached_cards_fails_the_scrape(server, tmp_path):
+    with pytest.raises(ScrapeError, match="missing.json"):
+        scrape(server, None, "/a.json", "/missing.json")
+
+
+def test_the_snapshot_is_canonical_and_kept_while_unchanged(server, tmp_path):
+    output = tmp_path / "latest.json"
+    cache = ValidatorCache(tmp_path / "cache.json")
+    scrape(server, cache, "/b.json", "/a.json", output=output)
+    assert canonical.is_canonical(output)
+    written = output.read_bytes()
+    scrape(server, cache, "/b.json", "/a.json", output=output)
+    assert output.read_bytes() == written
@@ -0,0 +1,35 @@
+import logging
+
+import pytest
+
+from dropnoti.state import Campaign, SeenIndex, State, load_state, save_state
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "state.json"
+    save_state(State(SeenIndex([Campaign("Alpha", "Jan 6 - Jan 19")]), "abc"), path)
+    state = load_state(path)
+    assert state is not None
+    assert list(state.index) == [Campaign("Alpha", "Jan 6 - Jan 19")]
+    assert state.content_hash == "abc"
+
+
+def test_missing_state(tmp_path):
+    assert load_state(tmp_path / "state.json") is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"version": 2, "campaigns": [["Alpha", "Jan',
+        "",
+        '{"version": 2, "campaigns": [5]}',
+        '{"version": 2, "campaigns": [[1, 2]]}',
+    ],
+)
+def test_unreadable_state_counts_as_missing(tmp_path, caplog, text):
+    path = tmp_path / "state.json"
+    path.write_text(text, encoding="utf-8")
+    with caplog.at_level(logging.WARNING, logger="dropnoti.state"):
+        assert load_state(path) is None
+    assert str(path) in caplog.text
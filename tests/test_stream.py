@@ -0,0 +1,55 @@
+import io
+import json
+
+import pytest
+
+from dropnoti.stream import CHUNK_SIZE, iter_cards, iter_events
+
+DOCUMENTS = [
+    '{"cards":[1.5, 2]}',
+    '{"cards":[-2.5e10,1]}',
+    '{"cards":[1E+3, -0.25, 12345678901234567890, 0]}',
+    '{"count": 3, "ok": true, "none": null, "cards": [{"t": "a"}, [], 7]}',
+    '{"scraped_at": "2026-01-06T14:52:40Z", "cards": []}',
+]
+
+
+def events(text, chunk_size):
+    return list(iter_events(io.StringIO(text), chunk_size=chunk_size))
+
+
+def expected(text):
+    result = []
+    for key, value in json.loads(text).items():
+        if key == "cards":
+            result += [("cards.item", card) for card in value]
+            result.append(("cards.end", len(value)))
+        else:
+            result.append((key, value))
+    return result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 16, CHUNK_SIZE])
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_numbers_split_across_chunks(text, chunk_size):
+    assert events(text, chunk_size) == expected(text)
+
+
+def test_number_straddling_the_default_chunk():
+    text = json.dumps(
+        {"note": "x" * 65499, "generated_ts": 1767571200.5, "cards": [{"t": 1}]}
+    )
+    assert events(text, CHUNK_SIZE) == expected(text)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, CHUNK_SIZE])
+def test_iter_cards(chunk_size):
+    text = '{"cards": [{"title": "A"}, {"title": "B", "n": 2.75e-1}]}'
+    cards = list(iter_cards(io.StringIO(text), chunk_size))
+    assert cards == json.loads(text)["cards"]
+
+
+@pytest.mark.parametrize("text", ['{"cards":[1,]}', '{"cards":[1.]}', '{"a" 1}'])
+def test_invalid_json_raises(text):
+    with pytest.raises(json.JSONDecodeError):
+        events(text, 2)
@@ -0,0 +1,120 @@
+import asyncio
+import math
+
+from dropnoti.fakebot import FakeBotServer
+from dropnoti.http import ConnectionPool
+from dropnoti.ratelimit import RateLimiter
+from dropnoti.telegram import TelegramClient
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_send_message():
+    async def main():
+        async with FakeBotServer() as server:
+            async with TelegramClient("123:abc", server.base_url) as client:
+                result = await client.send_message("42", "hello")
+        return server, result
+
+    server, result = run(main())
+    assert result.ok and result.message_id == 1
+    [call] = server.sent()
+    assert call.token == "123:abc"
+    assert call.params["chat_id"] == "42" and call.params["text"] == "hello"
+    assert server.messages == {("42", 1): "hello"}
+
+
+def test_send_pages_many_keeps_page_order_per_chat(bot):
+    async def main(server, client):
+        return await client.send_pages_many(["1", "2", "3"], ["a", "b"])
+
+    server, results = bot(main)
+    assert [r.chat_id for r in results] == ["1", "1", "2", "2", "3", "3"]
+    assert all(r.ok for r in results)
+    for chat_id in "123":
+        calls = [c for c in server.sent() if c.params["chat_id"] == chat_id]
+        assert [c.params["text"] for c in calls] == ["a", "b"]
+
+
+def test_error_reply_is_a_result():
+    async def main():
+        async with FakeBotServer() as server:
+            async with TelegramClient("t", server.base_url) as client:
+                return await client.send_message("1", "")
+
+    result = run(main())
+    assert not result.ok
+    assert result.status == 400
+    assert "message text is empty" in result.description
+
+
+def test_429_is_retried_after_retry_after(bot):
+    replied: list[str] = []
+
+    def flood_once(call):
+        if call.method == "sendMessage" and not replied:
+            replied.append(call.params["chat_id"])
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": "Too Many Requests: retry after 0.2",
+                "parameters": {"retry_after": 0.2},
+            }
+        return None
+
+    async def main(server, client):
+        return await client.send_message("7", "hi")
+
+    server, result = bot(main, flood_once)
+    assert result.ok
+    assert result.attempts == 2
+    first, second = server.sent()
+    assert second.received - first.received >= 0.2
+
+
+def test_429_only_delays_its_chat():
+    async def main():
+        async with FakeBotServer(per_chat_interval=0.5) as server:
+            async with TelegramClient(
+                "t",
+                server.base_url,
+                limiter=RateLimiter(global_rate=math.inf, per_chat_rate=100),
+                max_retries=0,
+            ) as client:
+                first = await client.send_message("1", "a")
+                flooded = await client.send_message("1", "b")
+                other = await client.send_message("2", "c")
+        return first, flooded, other
+
+    first, flooded, other = run(main())
+    assert first.ok and other.ok
+    assert flooded.status == 429 and flooded.retry_after == 1.0
+
+
+def test_keep_alive_connections_are_reused(bot):
+    async def main(server, client):
+        for n in range(5):
+            assert (await client.send_message("1", f"m{n}")).ok
+        return client.pool.connections_opened
+
+    server, opened = bot(main)
+    assert opened == 1
+    assert server.connections == 1
+    assert len(server.sent()) == 5
+
+
+def test_pool_bounds_concurrent_connections():
+    async def main():
+        async with FakeBotServer(delay=0.02) as server:
+            async with ConnectionPool(server.base_url, max_connections=3) as pool:
+                responses = await asyncio.gather(
+                    *(pool.request("POST", "/bott/getMe", b"") for _ in range(12))
+                )
+                opened = pool.connections_opened
+        return server, responses, opened
+
+    server, responses, opened = run(main())
+    assert [r.status for r in responses] == [200] * 12
+    assert opened == 3 and server.connections == 3
@@ -0,0 +1,64 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from dropnoti.timeframe import parse, scrape_date
+
+
+def day(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).date()
+
+
+def days(text, today):
+    parsed = parse(text, today)
+    return (
+        day(parsed.start) if parsed.start is not None else None,
+        day(parsed.end) if parsed.end is not None else None,
+    )
+
+
+@pytest.mark.parametrize(
+    "text, today, expected",
+    [
+        ("Jan 6 - Jan 13", date(2026, 1, 2), (date(2026, 1, 6), date(2026, 1, 13))),
+        ("Dec 28 - Jan 4", date(2026, 1, 2), (date(2025, 12, 28), date(2026, 1, 4))),
+        ("Dec 28 - Jan 4", date(2025, 12, 20), (date(2025, 12, 28), date(2026, 1, 4))),
+        ("Jan 2 - Jan 9", date(2025, 12, 30), (date(2026, 1, 2), date(2026, 1, 9))),
+        ("Dec 1 - Dec 15", date(2026, 1, 3), (date(2025, 12, 1), date(2025, 12, 15))),
+        ("Jul 1 - Jul 14", date(2026, 1, 3), (date(2026, 7, 1), date(2026, 7, 14))),
+        ("Ends Jan 13", date(2025, 12, 30), (None, date(2026, 1, 13))),
+        ("Dec 28 - Jan 4, 2027", date(2026, 1, 2),
+         (date(2026, 12, 28), date(2027, 1, 4))),
+        ("6 January 2026 – 13 January 2026", date(2030, 1, 1),
+         (date(2026, 1, 6), date(2026, 1, 13))),
+        ("Season 2 Jan 6 - Jan 13", date(2026, 1, 2),
+         (date(2026, 1, 6), date(2026, 1, 13))),
+        ("Season 2 6 Jan - 13 Jan", date(2026, 1, 2),
+         (date(2026, 1, 6), date(2026, 1, 13))),
+        ("6 Jan 6 PM - 8 Jan", date(2026, 1, 2), (date(2026, 1, 6), date(2026, 1, 8))),
+    ],
+)
+def test_years_are_inferred_around_the_scrape_date(text, today, expected):
+    assert days(text, today) == expected
+
+
+def test_times_and_zones():
+    parsed = parse(
+        "Fri, Jan 9, 6:00 PM - Sun, Jan 11, 2026, 11:59 PM UTC", date(2026, 1, 6)
+    )
+    assert datetime.fromtimestamp(parsed.start, timezone.utc) == datetime(
+        2026, 1, 9, 18, 0, tzinfo=timezone.utc
+    )
+    assert datetime.fromtimestamp(parsed.end, timezone.utc) == datetime(
+        2026, 1, 11, 23, 59, tzinfo=timezone.utc
+    )
+
+
+def test_unparseable():
+    assert not parse("sometime soon", date(2026, 1, 6)).ok
+    assert not parse("Feb 30 - Mar 2", date(2026, 1, 6)).ok
+
+
+def test_scrape_date():
+    assert scrape_date("2026-01-02T23:30:00-02:00") == date(2026, 1, 3)
+    assert scrape_date("not a date") is None